@@ -0,0 +1,126 @@
+"""
+Control automático de ganancia (AGC) en streaming
+Nivela el audio bloque a bloque en el callback de captura, de modo que
+los chunks llegan a Whisper ya normalizados y no hace falta recalcular
+RMS ni convertir dB a lineal en cada chunk.
+"""
+import numpy as np
+
+
+class StreamingGainControl:
+    """
+    AGC con envolvente suavizada (ataque rápido, liberación lenta).
+
+    Por cada bloque se calcula su RMS (un producto punto), se actualiza la
+    envolvente y la ganancia pasa en rampa lineal desde la del bloque
+    anterior, para evitar saltos audibles. Los bloques por debajo de la
+    puerta de ruido mantienen la ganancia actual (no se amplifica el silencio).
+    """
+
+    def __init__(self, target_rms_db=-20.0, sample_rate=16000, attack_time=0.01,
+                 release_time=0.4, max_gain_db=20.0, noise_gate_db=-50.0,
+                 initial_level=None):
+        """
+        Inicializa el AGC.
+
+        Args:
+            target_rms_db: Nivel RMS objetivo en dB
+            sample_rate: Frecuencia de muestreo
+            attack_time: Constante de tiempo cuando el nivel sube (segundos)
+            release_time: Constante de tiempo cuando el nivel baja (segundos)
+            max_gain_db: Ganancia máxima permitida en dB
+            noise_gate_db: Nivel bajo el cual no se adapta la ganancia
+            initial_level: Nivel RMS lineal inicial de la envolvente (None = objetivo)
+        """
+        self.sample_rate = sample_rate
+        self.attack_time = attack_time
+        self.release_time = release_time
+
+        # Conversiones dB -> lineal una sola vez
+        self.target_rms = 10 ** (target_rms_db / 20.0)
+        self.max_gain = 10 ** (max_gain_db / 20.0)
+        self.noise_gate = 10 ** (noise_gate_db / 20.0)
+
+        self.initial_level = initial_level if initial_level and initial_level > 0 else self.target_rms
+        self.reset()
+
+        # Coeficientes de suavizado y rampas por tamaño de bloque (normalmente uno solo)
+        self._coefficients = {}
+        self._ramps = {}
+
+    @classmethod
+    def from_profile(cls, profile, sample_rate=16000):
+        """
+        Crea un AGC sembrado con los valores de un perfil calibrado.
+
+        El nivel inicial sale de avg_energy (media de |x|; para voz el RMS
+        es ~1.25 veces mayor) y la ganancia máxima del rango dinámico.
+
+        Args:
+            profile: VoiceProfile o None
+            sample_rate: Frecuencia de muestreo
+
+        Returns:
+            StreamingGainControl
+        """
+        if not profile or not profile.is_calibrated:
+            return cls(sample_rate=sample_rate)
+
+        initial_level = profile.avg_energy * np.sqrt(np.pi / 2) if profile.avg_energy > 0 else None
+        max_gain_db = float(np.clip(profile.dynamic_range, 12.0, 30.0))
+
+        return cls(
+            target_rms_db=profile.target_rms_db,
+            sample_rate=sample_rate,
+            max_gain_db=max_gain_db,
+            initial_level=initial_level
+        )
+
+    def _block_constants(self, block_size):
+        """Coeficientes de ataque/liberación y rampa para un tamaño de bloque"""
+        if block_size not in self._coefficients:
+            block_duration = block_size / self.sample_rate
+            self._coefficients[block_size] = (
+                np.exp(-block_duration / self.attack_time),
+                np.exp(-block_duration / self.release_time)
+            )
+            self._ramps[block_size] = np.linspace(1.0 / block_size, 1.0, block_size, dtype=np.float32)
+        return self._coefficients[block_size], self._ramps[block_size]
+
+    def process(self, block):
+        """
+        Nivela un bloque de audio (en el lugar si ya es float32).
+
+        Args:
+            block: Array de audio 1D
+
+        Returns:
+            Array float32 nivelado y recortado a [-1, 1]
+        """
+        audio = np.asarray(block, dtype=np.float32)
+        block_size = len(audio)
+        if block_size == 0:
+            return audio
+
+        (attack, release), ramp = self._block_constants(block_size)
+
+        block_rms = np.sqrt(float(np.dot(audio, audio)) / block_size)
+        previous_gain = self.gain
+
+        if block_rms > self.noise_gate:
+            coefficient = attack if block_rms > self.level else release
+            self.level = coefficient * self.level + (1.0 - coefficient) * block_rms
+            self.gain = min(self.target_rms / self.level, self.max_gain)
+
+        if self.gain == previous_gain:
+            audio *= self.gain
+        else:
+            audio *= previous_gain + (self.gain - previous_gain) * ramp
+
+        np.clip(audio, -1.0, 1.0, out=audio)
+        return audio
+
+    def reset(self):
+        """Vuelve la envolvente al nivel inicial (ej: al iniciar una grabación)"""
+        self.level = self.initial_level
+        self.gain = min(self.target_rms / self.level, self.max_gain)
@@ -0,0 +1,273 @@
+"""
+Fuentes de audio intercambiables para el traductor
+Todas entregan bloques con la misma firma que el callback de
+sounddevice (indata, frames, time_info, status), así que
+RealtimeTranslator.audio_callback no distingue si el audio viene del
+micrófono, de un archivo o de un generador sintético. Permite ejecutar
+y medir el pipeline en máquinas sin micrófono.
+
+Uso:
+    source = create_audio_source("grabacion.wav", speed=4.0)
+    translator = RealtimeTranslator(..., audio_source=source)
+"""
+import threading
+import time
+import numpy as np
+from audio_stream import get_audio_duration, rebuffer, stream_audio_file
+
+
+class AudioSource:
+    """
+    Interfaz común de las fuentes de audio.
+
+    Subclases implementan _run() (o redefinen open/close). Las fuentes
+    finitas marcan finished=True al agotar el audio.
+    """
+
+    def __init__(self, sample_rate=16000, block_size=1600):
+        """
+        Args:
+            sample_rate: Frecuencia de muestreo entregada
+            block_size: Muestras por bloque (1600 = 100ms a 16kHz)
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.finished = False
+        self.blocks_delivered = 0
+        self._callback = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self, callback):
+        """
+        Empieza a entregar bloques a callback.
+
+        Args:
+            callback: Función (indata, frames, time_info, status)
+
+        Returns:
+            self (para usar con 'with')
+        """
+        self._callback = callback
+        self.finished = False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Detiene la entrega de bloques"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _deliver(self, block):
+        """Entrega un bloque 1D con la forma (frames, 1) de sounddevice"""
+        self._callback(block.reshape(-1, 1), len(block), None, None)
+        self.blocks_delivered += 1
+
+    def _run(self):
+        raise NotImplementedError
+
+    def _paced_blocks(self, blocks, speed):
+        """
+        Entrega bloques al ritmo de speed (1.0 = tiempo real, 0 = sin esperas).
+
+        Se programa contra un reloj absoluto para no acumular deriva.
+        """
+        block_duration = self.block_size / self.sample_rate
+        next_time = time.perf_counter()
+
+        for block in blocks:
+            if self._stop_event.is_set():
+                return
+            self._deliver(block)
+
+            if speed > 0:
+                next_time += block_duration / speed
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+
+        self.finished = True
+
+    def describe(self):
+        """Descripción corta para mostrar al iniciar"""
+        return self.__class__.__name__
+
+
+class MicrophoneSource(AudioSource):
+    """Micrófono en vivo (sounddevice.InputStream)"""
+
+    def __init__(self, sample_rate=16000, block_size=1600, device=None):
+        """
+        Args:
+            sample_rate: Frecuencia de muestreo
+            block_size: Muestras por bloque
+            device: Dispositivo de entrada (índice, nombre o None = por defecto)
+        """
+        super().__init__(sample_rate, block_size)
+        self.device = device
+        self._stream = None
+
+    def open(self, callback):
+        import sounddevice as sd  # Import diferido: las otras fuentes no requieren PortAudio
+
+        self._callback = callback
+        self.finished = False
+        self._stream = sd.InputStream(
+            channels=1,
+            samplerate=self.sample_rate,
+            callback=callback,
+            blocksize=self.block_size,
+            device=self.device
+        )
+        self._stream.start()
+        return self
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def describe(self):
+        return f"Micrófono ({self.device if self.device is not None else 'por defecto'})"
+
+
+class FileSource(AudioSource):
+    """Reproduce un WAV/FLAC/OGG como si fuera el micrófono"""
+
+    def __init__(self, file_path, sample_rate=16000, block_size=1600, speed=1.0, loop=False):
+        """
+        Args:
+            file_path: Ruta del archivo de audio
+            sample_rate: Frecuencia de muestreo entregada (se remuestrea si difiere)
+            block_size: Muestras por bloque
+            speed: 1.0 = tiempo real, 4.0 = 4x más rápido, 0 = lo más rápido posible
+            loop: Si True, repite el archivo hasta close()
+        """
+        super().__init__(sample_rate, block_size)
+        self.file_path = file_path
+        self.speed = speed
+        self.loop = loop
+        self.duration = get_audio_duration(file_path)  # Segundos (sin decodificar el archivo)
+
+    def _iter_blocks(self):
+        # Se decodifica por bloques: la memoria no depende de la duración del archivo
+        while True:
+            yield from rebuffer(stream_audio_file(self.file_path, self.sample_rate), self.block_size)
+            if not self.loop:
+                return
+
+    def _run(self):
+        self._paced_blocks(self._iter_blocks(), self.speed)
+
+    def describe(self):
+        speed = "máxima velocidad" if self.speed <= 0 else f"{self.speed:g}x"
+        return f"Archivo {self.file_path} ({self.duration:.1f}s, {speed})"
+
+
+class SyntheticSource(AudioSource):
+    """
+    Generador sintético: ráfagas tipo voz (armónicos con vibrato y
+    envolvente silábica) separadas por pausas, sobre ruido de fondo.
+    Reproducible con seed; útil para pruebas de carga sin archivos.
+    """
+
+    def __init__(self, sample_rate=16000, block_size=1600, duration=30.0, speed=1.0,
+                 burst_duration=2.5, pause_duration=1.5, pitch_hz=150.0,
+                 speech_level=0.1, noise_level=0.003, seed=0):
+        """
+        Args:
+            sample_rate: Frecuencia de muestreo
+            block_size: Muestras por bloque
+            duration: Segundos totales a generar (None = infinito)
+            speed: 1.0 = tiempo real, 0 = lo más rápido posible
+            burst_duration: Segundos de cada ráfaga de "voz"
+            pause_duration: Segundos de pausa entre ráfagas
+            pitch_hz: Frecuencia fundamental
+            speech_level: Amplitud de la voz
+            noise_level: Desviación estándar del ruido de fondo
+            seed: Semilla del ruido
+        """
+        super().__init__(sample_rate, block_size)
+        self.duration = duration
+        self.speed = speed
+        self.burst_duration = burst_duration
+        self.pause_duration = pause_duration
+        self.pitch_hz = pitch_hz
+        self.speech_level = speech_level
+        self.noise_level = noise_level
+        self.seed = seed
+
+    def generate_block(self, start_sample, rng):
+        """
+        Genera un bloque a partir de la muestra start_sample.
+
+        Args:
+            start_sample: Índice de la primera muestra
+            rng: numpy Generator para el ruido
+
+        Returns:
+            Array float32 de block_size muestras
+        """
+        t = (start_sample + np.arange(self.block_size)) / self.sample_rate
+        period = self.burst_duration + self.pause_duration
+        in_burst = (t % period) < self.burst_duration
+
+        # Armónicos con vibrato lento (f0 * (1 + 0.05 sin(pi t)), fase integrada
+        # analíticamente para que sea continua entre bloques) y ~4 sílabas por segundo
+        phase = 2 * np.pi * self.pitch_hz * (t - 0.05 / np.pi * np.cos(np.pi * t))
+        voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+
+        block = self.speech_level * voice * syllables * in_burst
+        block += rng.normal(0.0, self.noise_level, self.block_size)
+        return block.astype(np.float32)
+
+    def _iter_blocks(self):
+        rng = np.random.default_rng(self.seed)
+        total = None if self.duration is None else int(self.duration * self.sample_rate)
+        start = 0
+        while total is None or start < total:
+            yield self.generate_block(start, rng)
+            start += self.block_size
+
+    def _run(self):
+        self._paced_blocks(self._iter_blocks(), self.speed)
+
+    def describe(self):
+        duration = "∞" if self.duration is None else f"{self.duration:g}s"
+        return f"Sintético ({duration}, {'máxima velocidad' if self.speed <= 0 else f'{self.speed:g}x'})"
+
+
+def create_audio_source(source="mic", sample_rate=16000, block_size=1600, device=None, speed=1.0):
+    """
+    Crea una fuente a partir de una especificación de configuración.
+
+    Args:
+        source: "mic", "synthetic", "synthetic:SEGUNDOS" o ruta de archivo
+        sample_rate: Frecuencia de muestreo
+        block_size: Muestras por bloque
+        device: Dispositivo de entrada (solo micrófono)
+        speed: Velocidad de reproducción (archivo y sintético)
+
+    Returns:
+        AudioSource
+    """
+    if source in (None, "mic"):
+        return MicrophoneSource(sample_rate, block_size, device)
+    if source.startswith("synthetic"):
+        _, _, seconds = source.partition(":")
+        return SyntheticSource(sample_rate, block_size,
+                               duration=float(seconds) if seconds else 30.0, speed=speed)
+    return FileSource(source, sample_rate, block_size, speed=speed)
@@ -0,0 +1,203 @@
+"""
+Lectura de archivos de audio por bloques con remuestreo polifásico
+Decodifica con sf.blocks, mezcla a mono y remuestrea bloque a bloque
+conservando el estado del filtro entre bloques, así la memoria queda
+acotada e independiente de la duración del archivo (útil para
+grabaciones de varias horas).
+"""
+from math import gcd
+import numpy as np
+import soundfile as sf
+
+
+class PolyphaseResampler:
+    """
+    Remuestreador racional (up/down) en streaming.
+
+    Equivale a interpolar por up, filtrar con un FIR pasa-bajos (sinc con
+    ventana Kaiser, fase cero) y diezmar por down, pero solo calcula las
+    muestras de salida usando la fase del filtro que corresponde a cada una.
+    Entre llamadas a process() se guardan las últimas muestras de entrada
+    necesarias, por lo que el resultado no depende del tamaño de bloque.
+    """
+
+    def __init__(self, input_rate, output_rate, half_length=10, beta=5.0):
+        """
+        Args:
+            input_rate: Frecuencia de entrada (Hz)
+            output_rate: Frecuencia de salida (Hz)
+            half_length: Semi-longitud del filtro en ciclos de la frecuencia más baja
+            beta: Parámetro de la ventana Kaiser
+        """
+        g = gcd(int(input_rate), int(output_rate))
+        self.up = int(output_rate) // g
+        self.down = int(input_rate) // g
+
+        # Filtro pasa-bajos sobre la señal interpolada (corte en la Nyquist menor)
+        max_rate = max(self.up, self.down)
+        half = half_length * max_rate
+        n = np.arange(-half, half + 1)
+        cutoff = 0.5 / max_rate
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta)
+        h *= self.up / h.sum()
+
+        # Matriz polifásica: fila p = coeficientes h[p + k*up]
+        self.taps = int(np.ceil(len(h) / self.up))
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        self.phases = padded.reshape(self.taps, self.up).T.astype(np.float32)
+        self.delay = half  # Retardo del filtro en muestras interpoladas
+
+        self.reset()
+
+    def reset(self):
+        """Reinicia el estado (nuevo stream)"""
+        self._buffer = np.zeros(self.taps - 1, dtype=np.float32)  # Historia (ceros al inicio)
+        self._buffer_start = -(self.taps - 1)  # Índice absoluto de _buffer[0]
+        self._total_in = 0
+        self._next_out = 0
+
+    def _emit(self, available, limit=None):
+        """Calcula las salidas cuya entrada más reciente necesaria es < available"""
+        # Salida n necesita la entrada q = (n*down + delay) // up
+        last = (available * self.up - self.delay - 1) // self.down
+        if limit is not None:
+            last = min(last, limit - 1)
+        if last < self._next_out:
+            return np.zeros(0, dtype=np.float32)
+
+        n = np.arange(self._next_out, last + 1)
+        m = n * self.down + self.delay
+        q = m // self.up - self._buffer_start
+        p = m % self.up
+
+        # Ventanas de entrada (q, q-1, ..., q-taps+1) de cada salida
+        windows = self._buffer[q[:, None] - np.arange(self.taps)[None, :]]
+        out = np.einsum('ij,ij->i', windows, self.phases[p]).astype(np.float32)
+        self._next_out = last + 1
+
+        # Conservar solo la historia que necesitan las próximas salidas
+        next_q = (self._next_out * self.down + self.delay) // self.up
+        keep_from = next_q - (self.taps - 1) - self._buffer_start
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._buffer_start += keep_from
+        return out
+
+    def process(self, block):
+        """
+        Remuestrea un bloque.
+
+        Args:
+            block: Muestras float32 mono
+
+        Returns:
+            Muestras de salida disponibles (puede estar vacío)
+        """
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float32)
+        block = np.asarray(block, dtype=np.float32)
+        self._buffer = np.concatenate([self._buffer, block])
+        self._total_in += len(block)
+        return self._emit(self._total_in)
+
+    def flush(self):
+        """
+        Entrega las últimas muestras (completa el final con ceros).
+
+        Returns:
+            Muestras restantes
+        """
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self._total_in * self.up // self.down)  # ceil
+        lookahead = self.delay // self.up + 1
+        self._buffer = np.concatenate([self._buffer, np.zeros(lookahead, dtype=np.float32)])
+        return self._emit(self._total_in + lookahead, limit=expected)
+
+
+def get_audio_duration(file_path):
+    """
+    Duración de un archivo sin decodificarlo.
+
+    Returns:
+        Segundos
+    """
+    info = sf.info(file_path)
+    return info.frames / info.samplerate
+
+
+def stream_audio_file(file_path, sample_rate=16000, block_seconds=1.0):
+    """
+    Lee un archivo por bloques como float32 mono a la frecuencia indicada.
+
+    Args:
+        file_path: Ruta del archivo (WAV/FLAC/OGG)
+        sample_rate: Frecuencia de salida
+        block_seconds: Segundos del archivo decodificados por bloque
+
+    Yields:
+        Arrays float32 (tamaño variable según el remuestreo)
+    """
+    file_rate = sf.info(file_path).samplerate
+    resampler = PolyphaseResampler(file_rate, sample_rate)
+    blocksize = max(1, int(file_rate * block_seconds))
+
+    for block in sf.blocks(file_path, blocksize=blocksize, dtype='float32', always_2d=True):
+        out = resampler.process(block.mean(axis=1))
+        if len(out):
+            yield out
+
+    tail = resampler.flush()
+    if len(tail):
+        yield tail
+
+
+def load_audio_file(file_path, sample_rate=16000):
+    """
+    Carga un archivo completo como float32 mono a la frecuencia indicada.
+
+    El resultado se reserva de una vez a partir de la duración del archivo
+    (frames * up / down) y se llena bloque a bloque, así el pico de memoria
+    es el tamaño del audio decodificado y no el doble.
+
+    Args:
+        file_path: Ruta del archivo (WAV/FLAC/OGG)
+        sample_rate: Frecuencia de muestreo deseada
+
+    Returns:
+        Array numpy float32
+    """
+    info = sf.info(file_path)
+    g = gcd(int(info.samplerate), int(sample_rate))
+    expected = -(-info.frames * (int(sample_rate) // g) // (int(info.samplerate) // g))  # ceil
+
+    audio = np.empty(expected, dtype=np.float32)
+    filled = 0
+    for block in stream_audio_file(file_path, sample_rate):
+        if filled + len(block) > len(audio):  # frames inexacto en el encabezado
+            audio = np.resize(audio, max(filled + len(block), 2 * len(audio)))
+        audio[filled:filled + len(block)] = block
+        filled += len(block)
+    return audio[:filled]
+
+
+def rebuffer(blocks, block_size):
+    """
+    Reagrupa un stream de arrays en bloques de tamaño fijo (el último se completa con ceros).
+
+    Args:
+        blocks: Iterable de arrays
+        block_size: Muestras por bloque
+
+    Yields:
+        Arrays de block_size muestras
+    """
+    pending = np.zeros(0, dtype=np.float32)
+    for block in blocks:
+        pending = np.concatenate([pending, block])
+        while len(pending) >= block_size:
+            yield pending[:block_size].copy()
+            pending = pending[block_size:]
+    if len(pending):
+        yield np.pad(pending, (0, block_size - len(pending)))
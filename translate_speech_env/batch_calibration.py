@@ -0,0 +1,168 @@
+"""
+Calibración de perfiles de voz por lotes (sin GUI)
+Crea perfiles a partir de grabaciones de las 10 frases hechas de antemano,
+analizando todos los archivos en paralelo con un pool de procesos.
+
+Estructura esperada:
+    grabaciones/
+        marlon/            -> perfil "marlon"
+            frase_01.wav   -> frase 1 (el orden por nombre define la frase)
+            ...
+            frase_10.wav
+        ana/
+            ...
+
+Uso:
+    python batch_calibration.py grabaciones/            (un perfil por subdirectorio)
+    python batch_calibration.py grabaciones/marlon --user Marlon
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from profile_store import ProfileStore
+from audio_stream import load_audio_file
+from voice_profile import VoiceProfile
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg')
+
+
+def list_phrase_files(directory):
+    """
+    Lista las grabaciones de frases de un directorio, en orden de frase.
+
+    Args:
+        directory: Directorio con las grabaciones de un usuario
+
+    Returns:
+        Lista de rutas (máximo una por frase de calibración)
+    """
+    files = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    return files[:len(VoiceProfile.CALIBRATION_PHRASES)]
+
+
+def analyze_phrase_file(user_name, phrase_id, file_path, sample_rate=16000):
+    """
+    Analiza una grabación (se ejecuta en un proceso del pool).
+
+    Args:
+        user_name: Nombre del usuario (para el texto de la frase)
+        phrase_id: ID de la frase (0-9)
+        file_path: Ruta del archivo de audio
+        sample_rate: Frecuencia de análisis
+
+    Returns:
+        Tupla (user_name, phrase_id, características o None, error o None)
+    """
+    try:
+        audio = load_audio_file(file_path, sample_rate)
+        profile = VoiceProfile(user_name=user_name)
+        characteristics = profile.analyze_audio(audio, sample_rate, profile.get_phrase_text(phrase_id))
+        return user_name, phrase_id, characteristics, None
+    except Exception as e:
+        return user_name, phrase_id, None, f"{file_path}: {e}"
+
+
+def calibrate_users(users, output_dir=None, workers=None):
+    """
+    Calibra varios usuarios analizando todas sus frases en paralelo.
+
+    Args:
+        users: dict {user_name: [rutas de frases en orden]}
+        output_dir: Directorio de perfiles (None = voice_profiles/ por defecto)
+        workers: Número de procesos (None = núcleos disponibles)
+
+    Returns:
+        dict {user_name: ruta del perfil guardado o None si falló}
+    """
+    store = ProfileStore(output_dir)
+    samples = {user_name: {} for user_name in users}
+    errors = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(analyze_phrase_file, user_name, phrase_id, file_path)
+            for user_name, files in users.items()
+            for phrase_id, file_path in enumerate(files)
+        ]
+        for future in as_completed(futures):
+            user_name, phrase_id, characteristics, error = future.result()
+            if error:
+                errors.append(error)
+            elif characteristics:
+                samples[user_name][phrase_id] = characteristics
+
+    for error in errors:
+        print(f"⚠️  {error}")
+
+    results = {}
+    for user_name, by_phrase in samples.items():
+        print(f"\n👤 {user_name}: {len(by_phrase)} frases analizadas")
+
+        profile = VoiceProfile(user_name=user_name)
+        for phrase_id in sorted(by_phrase):
+            characteristics = by_phrase[phrase_id]
+            if characteristics["quality_score"] < 0.5:
+                print(f"   ⚠️  Frase {phrase_id + 1}: calidad baja ({characteristics['quality_score']*100:.0f}%)")
+            profile.add_calibration_characteristics(characteristics, phrase_id)
+
+        if not profile.finalize_calibration():
+            results[user_name] = None
+            continue
+
+        results[user_name] = store.save_profile(profile)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibración de perfiles de voz por lotes")
+    parser.add_argument("directory", help="Directorio de grabaciones (un subdirectorio por usuario)")
+    parser.add_argument("--user", help="Nombre del usuario si el directorio contiene sus frases directamente")
+    parser.add_argument("--output-dir", help="Directorio donde guardar los perfiles (default: voice_profiles/)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (default: núcleos)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ No existe el directorio: {args.directory}")
+        sys.exit(1)
+
+    if args.user:
+        users = {args.user: list_phrase_files(args.directory)}
+    else:
+        users = {
+            entry.name: list_phrase_files(entry.path)
+            for entry in sorted(os.scandir(args.directory), key=lambda e: e.name)
+            if entry.is_dir()
+        }
+    users = {name: files for name, files in users.items() if files}
+
+    if not users:
+        print("❌ No se encontraron grabaciones")
+        sys.exit(1)
+
+    total_files = sum(len(files) for files in users.values())
+    print(f"Calibrando {len(users)} perfil(es), {total_files} grabaciones...")
+
+    start = time.perf_counter()
+    results = calibrate_users(users, args.output_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    ok = [name for name, path in results.items() if path]
+    failed = [name for name, path in results.items() if not path]
+
+    print("\n" + "="*60)
+    print(f"Perfiles creados: {len(ok)} | Fallidos: {len(failed)} | Tiempo: {elapsed:.1f}s")
+    if failed:
+        print(f"Fallidos: {', '.join(failed)}")
+    print("="*60)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark de latencia end-to-end
+Reproduce un corpus de WAVs en español a través del pipeline real
+(RealtimeTranslator con FileSource, sin micrófono) para cada preset y
+modelo, y guarda los resultados en JSON para comparar versiones. La
+caché de traducciones, el historial y los subtítulos se desactivan para
+que cada ejecución haga toda la inferencia.
+
+Métricas por combinación preset/modelo:
+    - fin de voz → texto (p50/p90/p99): desde el fin de la última voz que
+      el VAD detectó en el chunk hasta que Whisper devuelve la traducción
+      (sin VAD, desde que el chunk queda capturado)
+    - fin de voz → inicio de TTS (p50/p90/p99)
+    - RTF: tiempo de procesamiento (prep + Whisper) / segundos de audio
+    - chunks descartados por cola llena
+
+Uso:
+    python benchmark_latency.py corpus/ --presets balanced,low-latency --models tiny,base
+    python benchmark_latency.py corpus/ --output antes.json
+    python benchmark_latency.py corpus/ --output despues.json --compare antes.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from audio_sources import FileSource
+from batch_calibration import AUDIO_EXTENSIONS
+from realtime_config import DEFAULT_CONFIG, load_preset, validate_config
+from translate_realtime import create_translator
+
+PERCENTILES = (50, 90, 99)
+
+
+def list_corpus(paths):
+    """
+    Expande archivos y directorios a la lista de grabaciones del corpus.
+
+    Args:
+        paths: Lista de archivos o directorios
+
+    Returns:
+        Lista ordenada de rutas de audio
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(AUDIO_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def latency_stats(values):
+    """
+    Percentiles de una lista de latencias en segundos.
+
+    Returns:
+        dict {"p50_ms", "p90_ms", "p99_ms", "n"} (None si no hay datos)
+    """
+    stats = {"n": len(values)}
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = float(np.percentile(values, p) * 1000) if values else None
+    return stats
+
+
+def run_config(config, corpus, speed):
+    """
+    Pasa el corpus completo por un traductor con la configuración dada.
+
+    Args:
+        config: dict de configuración (realtime_config)
+        corpus: Lista de rutas de audio
+        speed: Velocidad de reproducción (1.0 = tiempo real)
+
+    Returns:
+        dict de métricas
+    """
+    translator = create_translator(config)
+
+    wall_start = time.perf_counter()
+    corpus_seconds = 0.0
+    for path in corpus:
+        source = FileSource(path, translator.sample_rate, int(translator.sample_rate * 0.1), speed=speed)
+        corpus_seconds += source.duration
+        translator.audio_source = source
+        translator.buffer.clear()
+        translator.start(wait_for_enter=False)
+    wall_seconds = time.perf_counter() - wall_start
+
+    timings = list(translator.chunk_timings)
+    to_text = [t["text_at"] - translator.speech_end(t) for t in timings if t["text_at"] is not None]
+    to_tts = [t["tts_at"] - translator.speech_end(t) for t in timings if t["tts_at"] is not None]
+    audio_seconds = sum(t["audio_seconds"] for t in timings)
+    processing_seconds = sum(t["prep_seconds"] + t["whisper_seconds"] for t in timings)
+
+    return {
+        "corpus_seconds": corpus_seconds,
+        "wall_seconds": wall_seconds,
+        "chunks": len(timings),
+        "chunks_with_text": len(to_text),
+        "dropped_chunks": translator.dropped_chunks,
+        "dropped_audio_seconds": translator.dropped_audio_seconds,
+        "speech_to_text": latency_stats(to_text),
+        "speech_to_tts": latency_stats(to_tts),
+        "rtf": processing_seconds / audio_seconds if audio_seconds else None
+    }
+
+
+def print_results(runs):
+    """Tabla resumen de las ejecuciones"""
+    print("\n" + "="*96)
+    print("RESULTADOS (latencias en ms)")
+    print("="*96)
+    print(f"{'Preset':<14}{'Modelo':<8}{'Texto p50':>10}{'p90':>8}{'p99':>8}"
+          f"{'TTS p50':>10}{'p90':>8}{'RTF':>7}{'Chunks':>8}{'Desc.':>7}")
+
+    def fmt(value, width):
+        return f"{value:>{width}.0f}" if value is not None else f"{'-':>{width}}"
+
+    for run in runs:
+        m = run["metrics"]
+        text, tts = m["speech_to_text"], m["speech_to_tts"]
+        rtf = f"{m['rtf']:>7.2f}" if m["rtf"] is not None else f"{'-':>7}"
+        print(f"{run['preset']:<14}{run['model']:<8}{fmt(text['p50_ms'], 10)}{fmt(text['p90_ms'], 8)}"
+              f"{fmt(text['p99_ms'], 8)}{fmt(tts['p50_ms'], 10)}{fmt(tts['p90_ms'], 8)}"
+              f"{rtf}{m['chunks']:>8}{m['dropped_chunks']:>7}")
+
+
+def compare_results(runs, previous_path):
+    """
+    Muestra la diferencia de p50/p90 (fin de voz → texto) y RTF contra
+    un JSON anterior, emparejando por preset y modelo.
+    """
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r["preset"], r["model"]): r["metrics"] for r in json.load(f)["runs"]}
+
+    print(f"\nComparación con {previous_path}:")
+    for run in runs:
+        old = previous.get((run["preset"], run["model"]))
+        if not old:
+            print(f"  {run['preset']}/{run['model']}: sin datos previos")
+            continue
+
+        parts = []
+        for key in ("p50_ms", "p90_ms"):
+            new_value, old_value = run["metrics"]["speech_to_text"][key], old["speech_to_text"][key]
+            if new_value is not None and old_value:
+                parts.append(f"{key[:3]} {(new_value - old_value) / old_value * 100:+.1f}%")
+        if run["metrics"]["rtf"] and old["rtf"]:
+            parts.append(f"RTF {(run['metrics']['rtf'] - old['rtf']) / old['rtf'] * 100:+.1f}%")
+        print(f"  {run['preset']}/{run['model']}: {' | '.join(parts) or 'sin métricas comparables'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latencia end-to-end del traductor")
+    parser.add_argument("corpus", nargs="+", help="Archivos WAV/FLAC o directorios del corpus")
+    parser.add_argument("--presets", default="balanced", help="Presets separados por coma")
+    parser.add_argument("--models", default=None,
+                        help="Modelos separados por coma (default: el de cada preset)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Velocidad de reproducción (1 = tiempo real; >1 mide throughput)")
+    parser.add_argument("--tts", action="store_true", help="Reproducir TTS (mide fin de voz → TTS)")
+    parser.add_argument("--output", default="latency_results.json", help="Archivo JSON de salida")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    corpus = list_corpus(args.corpus)
+    if not corpus:
+        print("❌ No se encontraron grabaciones")
+        sys.exit(1)
+
+    runs = []
+    for preset in args.presets.split(","):
+        preset_config = dict(DEFAULT_CONFIG)
+        preset_config.update(load_preset(preset))
+        models = args.models.split(",") if args.models else [preset_config["model"]]
+
+        for model in models:
+            # Sin caché ni salidas persistentes: cada ejecución mide la inferencia completa
+            config = dict(preset_config, model=model, tts=args.tts, push_to_talk=False, cache=False,
+                          transcript_db=None, subtitles=None, subtitle_port=None)
+            validate_config(config)
+            print(f"\n▶ Preset {preset} | modelo {model} | {len(corpus)} archivos")
+            runs.append({
+                "preset": preset,
+                "model": model,
+                "config": config,
+                "metrics": run_config(config, corpus, args.speed)
+            })
+
+    results = {
+        "created": datetime.now().isoformat(),
+        "corpus": corpus,
+        "speed": args.speed,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor()
+        },
+        "runs": runs
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print_results(runs)
+    if args.compare:
+        compare_results(runs, args.compare)
+    print(f"\n✅ Resultados guardados en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Micro-benchmarks del preprocesamiento de audio y del análisis de perfil
+Mide tiempo por llamada y pico de memoria asignada (tracemalloc) de las
+funciones del camino caliente y de calibración, con entradas fijas de
+1s, 3s y 30s, y falla si alguna empeora respecto a la línea base guardada.
+
+Funciones medidas:
+    trim_silence, normalize_audio_rms, load_audio_from_array,
+    VoiceProfile.analyze_audio, VoiceProfile._estimate_pitch
+
+Uso:
+    python benchmark_micro.py --save-baseline          (crear/actualizar línea base)
+    python benchmark_micro.py                          (comparar; exit 1 si hay regresión)
+    python benchmark_micro.py --recorded frase.wav     (agregar entradas grabadas)
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+from audio_sources import SyntheticSource
+from translate_realtime import trim_silence, normalize_audio_rms, load_audio_from_array
+from audio_stream import load_audio_file
+from voice_profile import VoiceProfile
+
+SAMPLE_RATE = 16000
+DURATIONS = (1, 3, 30)
+
+
+def get_default_baseline_path():
+    """
+    Ruta por defecto de la línea base.
+
+    Returns:
+        Path a benchmarks/micro_baseline.json
+    """
+    return Path(__file__).parent / "benchmarks" / "micro_baseline.json"
+
+
+def make_inputs(recorded_files=()):
+    """
+    Construye las entradas fijas del benchmark.
+
+    Las sintéticas salen de SyntheticSource con semilla fija (voz con
+    pausas sobre ruido). Las grabadas se repiten o recortan a cada duración.
+
+    Args:
+        recorded_files: Rutas de audio opcionales
+
+    Returns:
+        dict {nombre: array float32}
+    """
+    inputs = {}
+    generator = SyntheticSource(SAMPLE_RATE, block_size=SAMPLE_RATE, seed=1234)
+    rng = np.random.default_rng(generator.seed)
+    synthetic = np.concatenate([generator.generate_block(i * SAMPLE_RATE, rng) for i in range(max(DURATIONS))])
+    for seconds in DURATIONS:
+        inputs[f"synthetic_{seconds}s"] = synthetic[:seconds * SAMPLE_RATE].copy()
+
+    for path in recorded_files:
+        audio = load_audio_file(path, SAMPLE_RATE)
+        for seconds in DURATIONS:
+            samples = seconds * SAMPLE_RATE
+            repeats = int(np.ceil(samples / len(audio)))
+            inputs[f"{Path(path).stem}_{seconds}s"] = np.tile(audio, repeats)[:samples].copy()
+
+    return inputs
+
+
+def get_functions():
+    """
+    Funciones a medir (cada una recibe el array de audio).
+
+    Returns:
+        dict {nombre: callable}
+    """
+    profile = VoiceProfile(user_name="benchmark")
+    return {
+        "trim_silence": lambda audio: trim_silence(audio, SAMPLE_RATE),
+        "normalize_audio_rms": lambda audio: normalize_audio_rms(audio, -20),
+        "load_audio_from_array": lambda audio: load_audio_from_array(audio, SAMPLE_RATE),
+        "analyze_audio": lambda audio: profile.analyze_audio(audio, SAMPLE_RATE),
+        "_estimate_pitch": lambda audio: profile._estimate_pitch(audio, SAMPLE_RATE)
+    }
+
+
+def measure(func, audio, min_time=0.5, min_runs=5, max_runs=200):
+    """
+    Mide una función con una entrada.
+
+    Args:
+        func: Función a medir
+        audio: Entrada (no se modifica: cada llamada recibe una copia)
+        min_time: Segundos mínimos de medición
+        min_runs: Llamadas mínimas
+        max_runs: Llamadas máximas
+
+    Returns:
+        dict {"median_ms", "min_ms", "runs", "peak_kb"}
+    """
+    func(audio.copy())  # Calentamiento
+
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_runs and (len(times) < min_runs or time.perf_counter() - start < min_time):
+        data = audio.copy()
+        t0 = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - t0)
+
+    # Pico de memoria en una pasada aparte (tracemalloc ralentiza la ejecución)
+    data = audio.copy()
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": float(np.median(times) * 1000),
+        "min_ms": float(np.min(times) * 1000),
+        "runs": len(times),
+        "peak_kb": peak / 1024
+    }
+
+
+def check_regressions(results, baseline, time_tolerance, memory_tolerance, min_delta_ms=0.05):
+    """
+    Compara resultados con la línea base.
+
+    Args:
+        results: dict {clave: medición}
+        baseline: dict {clave: medición} de la línea base
+        time_tolerance: Aumento relativo de tiempo permitido (0.25 = +25%)
+        memory_tolerance: Aumento relativo de memoria permitido
+        min_delta_ms: Diferencias absolutas menores se ignoran (ruido)
+
+    Returns:
+        Lista de strings describiendo cada regresión
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+
+        time_delta = current["median_ms"] - reference["median_ms"]
+        if time_delta > min_delta_ms and current["median_ms"] > reference["median_ms"] * (1 + time_tolerance):
+            regressions.append(f"{key}: tiempo {reference['median_ms']:.2f} → {current['median_ms']:.2f} ms "
+                               f"({time_delta / reference['median_ms'] * 100:+.0f}%)")
+
+        if current["peak_kb"] > reference["peak_kb"] * (1 + memory_tolerance) + 1:
+            regressions.append(f"{key}: memoria {reference['peak_kb']:.0f} → {current['peak_kb']:.0f} KB")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de preprocesamiento y perfil de voz")
+    parser.add_argument("--recorded", nargs="*", default=[], help="Grabaciones adicionales como entrada")
+    parser.add_argument("--baseline", default=str(get_default_baseline_path()), help="Archivo de línea base")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar resultados como línea base")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Aumento de tiempo permitido (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Aumento de memoria permitido")
+    parser.add_argument("--filter", help="Solo funciones cuyo nombre contenga este texto")
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.recorded)
+    functions = get_functions()
+
+    results = {}
+    print(f"{'Función/entrada':<42}{'Mediana':>10}{'Mín':>10}{'Pico':>11}{'Runs':>6}")
+    for func_name, func in functions.items():
+        if args.filter and args.filter not in func_name:
+            continue
+        for input_name, audio in inputs.items():
+            key = f"{func_name}/{input_name}"
+            results[key] = measure(func, audio)
+            r = results[key]
+            print(f"{key:<42}{r['median_ms']:>8.2f}ms{r['min_ms']:>8.2f}ms{r['peak_kb']:>8.0f} KB{r['runs']:>6}")
+
+    baseline_path = Path(args.baseline)
+
+    if args.save_baseline:
+        baseline = {}
+        if baseline_path.exists():
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "results": baseline
+            }, f, indent=2)
+        print(f"\n✅ Línea base guardada en: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\n⚠️  No hay línea base ({baseline_path}); créala con --save-baseline")
+        return
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get("platform") != platform.platform():
+        print(f"\n⚠️  Línea base tomada en otra máquina ({baseline.get('platform')}); los tiempos pueden no ser comparables")
+
+    regressions = check_regressions(results, baseline["results"], args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresión(es) respecto a la línea base:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+
+    print("\n✅ Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark de decodificación especulativa
+Compara greedy decoding del modelo objetivo contra decodificación
+especulativa (tiny como borrador) en tokens/s y latencia por chunk.
+También compara el texto con el de model.transcribe() (la ruta sin
+borrador del traductor, con timestamps): mientras difieran, el borrador
+no se activa en los presets.
+"""
+import argparse
+import time
+import numpy as np
+import whisper
+from speculative_decoding import SpeculativeDecoder
+from audio_stream import load_audio_file
+
+
+def transcribe_text(model, audio, language):
+    """Texto de la ruta sin borrador del traductor (model.transcribe greedy)"""
+    result = model.transcribe(audio, task="translate", language=language, fp16=False,
+                              verbose=None, beam_size=1, best_of=1, temperature=0)
+    return result["text"].strip()
+
+
+def run_pair(target_size, draft_size, clips, language, num_draft_tokens, repeats):
+    """
+    Ejecuta el benchmark para un par (objetivo, borrador).
+
+    Returns:
+        dict con métricas agregadas del par
+    """
+    print(f"\nCargando modelos: objetivo={target_size}, borrador={draft_size}...")
+    target_model = whisper.load_model(target_size)
+    draft_model = whisper.load_model(draft_size)
+    decoder = SpeculativeDecoder(target_model, draft_model, language=language,
+                                 task="translate", num_draft_tokens=num_draft_tokens)
+
+    # Calentamiento (primera pasada incluye inicialización de kernels)
+    decoder.decode_greedy(clips[0][1])
+    decoder.decode(clips[0][1])
+    decoder.rounds = decoder.proposed_tokens = decoder.accepted_tokens = 0
+
+    greedy_times, spec_times = [], []
+    greedy_tokens = spec_tokens = 0
+    mismatches = []
+    transcribe_mismatches = []
+
+    for name, audio in clips:
+        if decoder.decode(audio)["text"].strip() != transcribe_text(target_model, audio, language):
+            transcribe_mismatches.append(name)
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            reference = decoder.decode_greedy(audio)
+            greedy_times.append(time.perf_counter() - start)
+            greedy_tokens += len(reference["tokens"])
+
+            start = time.perf_counter()
+            result = decoder.decode(audio)
+            spec_times.append(time.perf_counter() - start)
+            spec_tokens += len(result["tokens"])
+
+            if result["tokens"] != reference["tokens"]:
+                mismatches.append(name)
+
+    return {
+        "pair": f"{draft_size}→{target_size}",
+        "greedy_tok_s": greedy_tokens / sum(greedy_times),
+        "spec_tok_s": spec_tokens / sum(spec_times),
+        "greedy_p50_ms": np.percentile(greedy_times, 50) * 1000,
+        "spec_p50_ms": np.percentile(spec_times, 50) * 1000,
+        "greedy_p90_ms": np.percentile(greedy_times, 90) * 1000,
+        "spec_p90_ms": np.percentile(spec_times, 90) * 1000,
+        "speedup": sum(greedy_times) / sum(spec_times),
+        "acceptance": decoder.acceptance_rate,
+        "mismatches": sorted(set(mismatches)),
+        "transcribe_mismatches": transcribe_mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de decodificación especulativa")
+    parser.add_argument("files", nargs="+", help="Archivos de audio (chunks de hasta 30s)")
+    parser.add_argument("--pairs", default="base:tiny,small:tiny",
+                        help="Pares objetivo:borrador separados por coma")
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--k", type=int, default=4, help="Tokens propuestos por ronda")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    clips = [(path, load_audio_file(path)) for path in args.files]
+    results = []
+    for pair in args.pairs.split(","):
+        target_size, draft_size = pair.split(":")
+        results.append(run_pair(target_size, draft_size, clips,
+                                args.language, args.k, args.repeats))
+
+    print("\n" + "="*92)
+    print("RESULTADOS (end-to-end por chunk, incluye encoder)")
+    print("="*92)
+    print(f"{'Par':<14}{'Greedy tok/s':>13}{'Spec tok/s':>12}{'Greedy p50':>12}{'Spec p50':>10}"
+          f"{'Greedy p90':>12}{'Spec p90':>10}{'Speedup':>9}{'Acept.':>8}")
+    for r in results:
+        print(f"{r['pair']:<14}{r['greedy_tok_s']:>13.1f}{r['spec_tok_s']:>12.1f}"
+              f"{r['greedy_p50_ms']:>10.0f}ms{r['spec_p50_ms']:>8.0f}ms"
+              f"{r['greedy_p90_ms']:>10.0f}ms{r['spec_p90_ms']:>8.0f}ms"
+              f"{r['speedup']:>8.2f}x{r['acceptance']*100:>7.0f}%")
+
+    for r in results:
+        if r["mismatches"]:
+            print(f"\n⚠️  {r['pair']}: salida distinta a greedy en {', '.join(r['mismatches'])}")
+        else:
+            print(f"\n✓ {r['pair']}: salida idéntica a greedy en todos los chunks")
+        if r["transcribe_mismatches"]:
+            print(f"⚠️  {r['pair']}: texto distinto a model.transcribe() en "
+                  f"{', '.join(r['transcribe_mismatches'])}")
+        else:
+            print(f"✓ {r['pair']}: texto idéntico a model.transcribe() en todos los chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,18 @@ import sounddevice as sd
 import numpy as np
 import threading
 import time
-import queue
-from voice_profile import VoiceProfile, get_default_profile_path
+from voice_profile import VoiceProfile, AudioFeatureAccumulator
+from profile_store import ProfileStore
+from ui_events import UIEventQueue
 
 
 class CalibrationWindow:
     """Ventana modal para calibración de voz"""
 
-    def __init__(self, parent, user_name="Usuario"):
+    def __init__(self, parent, user_name="Usuario", profile_store=None):
         self.parent = parent
         self.user_name = user_name
+        self.profile_store = profile_store or ProfileStore()
 
         # Crear ventana modal
         self.window = tk.Toplevel(parent)
@@ -30,20 +32,18 @@ class CalibrationWindow:
         self.voice_profile = VoiceProfile(user_name=user_name)
         self.current_phrase = 0
         self.is_recording = False
-        self.recorded_audio = None
+        self.feature_accumulator = None  # Análisis incremental de la grabación actual
         self.sample_rate = 16000
 
         # Estado
         self.calibration_complete = False
 
-        # Cola para comunicación thread-safe con UI
-        self.ui_queue = queue.Queue()
-
         # Crear widgets
         self.create_widgets()
 
-        # Iniciar procesamiento de cola UI
-        self.process_ui_queue()
+        # Cola thread-safe hacia la UI: los threads despiertan al loop al publicar
+        # (del nivel de audio solo interesa el último valor de cada lote)
+        self.ui_events = UIEventQueue(self.window, self.handle_ui_events, coalesce=('level',))
 
         # Centrar ventana
         self.center_window()
@@ -134,7 +134,31 @@ class CalibrationWindow:
                                        cursor='hand2',
                                        height=3,
                                        width=30)
-        self.record_button.pack(pady=20)
+        self.record_button.pack(pady=(20, 5))
+
+        # Medidor de calidad en vivo (se actualiza mientras se graba)
+        meter_frame = tk.Frame(content_frame, bg='white')
+        meter_frame.pack(pady=(0, 10))
+
+        tk.Label(meter_frame,
+                text="Calidad:",
+                font=('Segoe UI', 9),
+                bg='white',
+                fg='#757575').pack(side='left', padx=(0, 5))
+
+        self.quality_meter = ttk.Progressbar(meter_frame,
+                                             length=250,
+                                             mode='determinate',
+                                             maximum=100)
+        self.quality_meter.pack(side='left')
+
+        self.level_label = tk.Label(meter_frame,
+                                    text="-- dB",
+                                    font=('Segoe UI', 9),
+                                    bg='white',
+                                    fg='#757575',
+                                    width=8)
+        self.level_label.pack(side='left', padx=(5, 0))
 
         # Estado
         self.status_label = tk.Label(content_frame,
@@ -211,7 +235,8 @@ class CalibrationWindow:
             return
 
         self.is_recording = True
-        self.recorded_audio = []
+        self.feature_accumulator = AudioFeatureAccumulator(self.voice_profile, self.sample_rate)
+        self.quality_meter['value'] = 0
 
         # Actualizar UI
         self.record_button.config(
@@ -234,7 +259,12 @@ class CalibrationWindow:
             # Grabar hasta que se detenga
             def callback(indata, frames, time_info, status):
                 if self.is_recording:
-                    self.recorded_audio.append(indata.copy())
+                    # Analizar cada bloque de 100ms mientras se graba
+                    self.feature_accumulator.update(indata)
+                    self.ui_events.put('level', (
+                        self.feature_accumulator.quality_score(),
+                        20 * np.log10(self.feature_accumulator.rms + 1e-10)
+                    ))
 
             with sd.InputStream(channels=1,
                               samplerate=self.sample_rate,
@@ -244,7 +274,7 @@ class CalibrationWindow:
                     time.sleep(0.1)
 
         except Exception as e:
-            self.window.after(0, lambda: self.show_error(f"Error al grabar: {e}"))
+            self.ui_events.put('error', f"Error al grabar: {e}")
 
     def stop_recording(self):
         """Detiene la grabación"""
@@ -270,59 +300,56 @@ class CalibrationWindow:
     def _process_recording(self):
         """Procesa la grabación y la analiza"""
         try:
-            if not self.recorded_audio:
-                self.ui_queue.put(('error', "No se grabó audio"))
-                return
+            # Esperar a que el stream entregue el último bloque
+            self.recording_thread.join(timeout=1.0)
 
-            # Concatenar chunks de audio
-            audio_array = np.concatenate(self.recorded_audio, axis=0).flatten()
+            accumulator = self.feature_accumulator
+            if accumulator is None or accumulator.num_samples == 0:
+                self.ui_events.put('error', "No se grabó audio")
+                return
 
             # Verificar duración mínima (1 segundo)
-            duration = len(audio_array) / self.sample_rate
-            if duration < 1.0:
-                self.ui_queue.put(('error', "Audio muy corto. Necesitas al menos 1 segundo."))
+            if accumulator.duration < 1.0:
+                self.ui_events.put('error', "Audio muy corto. Necesitas al menos 1 segundo.")
                 return
 
-            # Analizar audio con VoiceProfile
-            characteristics = self.voice_profile.add_calibration_sample(
-                audio_array,
-                self.sample_rate,
+            # Las características ya se calcularon durante la grabación
+            characteristics = self.voice_profile.add_calibration_characteristics(
+                accumulator.characteristics(self.voice_profile.get_phrase_text(self.current_phrase)),
                 self.current_phrase
             )
 
             # Enviar resultado a UI
             quality = characteristics['quality_score']
             if quality >= 0.7:
-                self.ui_queue.put(('success', quality))
+                self.ui_events.put('success', quality)
             elif quality >= 0.5:
-                self.ui_queue.put(('ok', quality))
+                self.ui_events.put('ok', quality)
             else:
-                self.ui_queue.put(('poor', quality))
+                self.ui_events.put('poor', quality)
 
         except Exception as e:
-            self.ui_queue.put(('error', f"Error al procesar: {e}"))
-
-    def process_ui_queue(self):
-        """Procesa mensajes de la cola para actualizar UI de forma thread-safe"""
-        try:
-            while True:
-                msg_type, data = self.ui_queue.get_nowait()
-
-                if msg_type == 'success':
-                    self._on_recording_success(data)
-                elif msg_type == 'ok':
-                    self._on_recording_ok(data)
-                elif msg_type == 'poor':
-                    self._on_recording_poor(data)
-                elif msg_type == 'error':
-                    self.show_error(data)
-                    self._reset_record_button()
-
-        except queue.Empty:
-            pass
-
-        # Volver a verificar en 100ms
-        self.window.after(100, self.process_ui_queue)
+            self.ui_events.put('error', f"Error al procesar: {e}")
+
+    def handle_ui_events(self, events):
+        """Procesa en el thread de Tk un lote de mensajes de los threads de grabación"""
+        for msg_type, data in events:
+            if msg_type == 'level':
+                self._update_quality_meter(*data)
+            elif msg_type == 'success':
+                self._on_recording_success(data)
+            elif msg_type == 'ok':
+                self._on_recording_ok(data)
+            elif msg_type == 'poor':
+                self._on_recording_poor(data)
+            elif msg_type == 'error':
+                self.show_error(data)
+                self._reset_record_button()
+
+    def _update_quality_meter(self, quality, rms_db):
+        """Actualiza el medidor de calidad en vivo"""
+        self.quality_meter['value'] = quality * 100
+        self.level_label.config(text=f"{rms_db:.0f} dB")
 
     def _on_recording_success(self, quality):
         """Grabación de buena calidad"""
@@ -357,8 +384,7 @@ class CalibrationWindow:
                 fg='#f44336'
             )
             # Eliminar última muestra
-            if self.voice_profile.calibration_data:
-                self.voice_profile.calibration_data.pop()
+            self.voice_profile.remove_last_calibration_sample()
         else:  # No, continuar
             self.next_button.config(state='normal')
 
@@ -378,7 +404,8 @@ class CalibrationWindow:
 
         # Resetear estado
         self.next_button.config(state='disabled')
-        self.recorded_audio = None
+        self.feature_accumulator = None
+        self.quality_meter['value'] = 0
 
         if self.current_phrase >= 10:
             # Calibración completa
@@ -402,8 +429,7 @@ class CalibrationWindow:
 
         # Guardar perfil
         try:
-            profile_path = get_default_profile_path(self.user_name)
-            self.voice_profile.save(str(profile_path))
+            self.profile_store.save_profile(self.voice_profile)
 
             # Mostrar resumen
             summary = self.voice_profile.get_summary()
@@ -415,6 +441,7 @@ class CalibrationWindow:
             )
 
             self.calibration_complete = True
+            self.ui_events.close()
             self.window.destroy()
 
         except Exception as e:
@@ -432,6 +459,7 @@ class CalibrationWindow:
 
         if result:
             self.calibration_complete = False
+            self.ui_events.close()
             self.window.destroy()
 
     def show_error(self, message):
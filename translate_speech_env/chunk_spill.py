@@ -0,0 +1,91 @@
+"""
+Desborde a disco de chunks de audio
+Cuando audio_queue está llena y la política de desborde es "spill", los
+chunks con voz se guardan como .npy en un directorio temporal en vez de
+descartarse, y se devuelven a la cola en orden (FIFO) a medida que los
+workers la liberan.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from collections import deque
+import numpy as np
+
+
+class ChunkSpill:
+    """Cola FIFO de chunks respaldada en disco (thread-safe)"""
+
+    def __init__(self, directory=None):
+        """
+        Inicializa el almacén de desborde.
+
+        Args:
+            directory: Directorio para los archivos (None = temporal, se borra en close())
+        """
+        self.owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="translator_spill_")
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._pending = deque()  # (ruta, timing)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.total_spilled = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, chunk, timing):
+        """
+        Guarda un chunk al final de la cola de desborde.
+
+        Args:
+            chunk: Array de audio
+            timing: Registro de tiempos del chunk (viaja en memoria)
+        """
+        with self._lock:
+            self._counter += 1
+            path = os.path.join(self.directory, f"chunk_{self._counter:08d}.npy")
+            np.save(path, chunk)
+            self._pending.append((path, timing))
+            self.total_spilled += 1
+
+    def pop(self):
+        """
+        Recupera el chunk más antiguo.
+
+        Returns:
+            (chunk, timing) o None si no hay chunks pendientes
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+            path, timing = self._pending.popleft()
+
+        chunk = np.load(path)
+        os.remove(path)
+        return chunk, timing
+
+    def clear(self):
+        """
+        Descarta los chunks pendientes.
+
+        Returns:
+            Número de chunks descartados
+        """
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+
+        for path, _ in pending:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(pending)
+
+    def close(self):
+        """Descarta lo pendiente y borra el directorio temporal"""
+        self.clear()
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,138 @@
+"""
+Trazas del ciclo de vida de cada chunk (formato Chrome trace / Perfetto)
+Registra spans por etapa (captura, VAD, colas, prep, Whisper, TTS) y por
+thread, y los guarda como trace-event JSON para abrirlos en
+chrome://tracing o https://ui.perfetto.dev y ver dónde se atasca un chunk.
+
+Las esperas en audio_queue y tts_queue se emiten como spans asíncronos
+(pueden solaparse entre chunks) y cada chunk se enlaza entre threads con
+eventos de flujo usando su ID.
+"""
+import json
+import os
+import threading
+import time
+
+
+class ChunkTracer:
+    """
+    Colector de eventos trace-event en memoria (thread-safe).
+
+    Los timestamps se pasan como time.perf_counter() y se guardan en
+    microsegundos relativos al inicio del tracer.
+    """
+
+    def __init__(self, trace_path, max_events=500000):
+        """
+        Inicializa el tracer.
+
+        Args:
+            trace_path: Archivo JSON de salida
+            max_events: Eventos máximos en memoria (los siguientes se descartan)
+        """
+        self.trace_path = trace_path
+        self.max_events = max_events
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+
+        self.events = []
+        self.dropped_events = 0
+        self._named_threads = set()
+        self._lock = threading.Lock()
+
+    def _ts(self, timestamp):
+        """perf_counter -> microsegundos desde el inicio"""
+        return (timestamp - self.origin) * 1e6
+
+    def _add(self, event):
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped_events += 1
+                return
+            self.events.append(event)
+
+    def _thread_id(self):
+        """ID del thread actual (registra su nombre la primera vez)"""
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._named_threads:
+            self._named_threads.add(tid)
+            self._add({"ph": "M", "name": "thread_name", "pid": self.pid, "tid": tid,
+                       "args": {"name": thread.name}})
+        return tid
+
+    def span(self, name, chunk_id, start, end=None, **args):
+        """
+        Span completo en el thread actual.
+
+        Args:
+            name: Etapa (ej: "whisper")
+            chunk_id: ID del chunk
+            start: perf_counter de inicio
+            end: perf_counter de fin (None = ahora)
+            **args: Datos extra a mostrar en el visor
+        """
+        end = time.perf_counter() if end is None else end
+        self._add({
+            "ph": "X", "name": name, "cat": "chunk", "pid": self.pid, "tid": self._thread_id(),
+            "ts": self._ts(start), "dur": max(0.0, (end - start) * 1e6),
+            "args": dict(args, chunk=chunk_id)
+        })
+
+    def instant(self, name, chunk_id, **args):
+        """Evento instantáneo en el thread actual (ej: chunk descartado)"""
+        self._add({
+            "ph": "i", "s": "t", "name": name, "cat": "chunk", "pid": self.pid,
+            "tid": self._thread_id(), "ts": self._ts(time.perf_counter()),
+            "args": dict(args, chunk=chunk_id)
+        })
+
+    def queue_span(self, queue_name, chunk_id, start, end=None):
+        """
+        Espera de un chunk en una cola (span asíncrono, pueden solaparse).
+
+        Args:
+            queue_name: "audio_queue" o "tts_queue"
+            chunk_id: ID del chunk
+            start: perf_counter al encolar
+            end: perf_counter al desencolar (None = ahora)
+        """
+        end = time.perf_counter() if end is None else end
+        common = {"name": queue_name, "cat": "queue", "pid": self.pid, "tid": self._thread_id(),
+                  "id": f"{queue_name}-{chunk_id}"}
+        self._add(dict(common, ph="b", ts=self._ts(start), args={"chunk": chunk_id}))
+        self._add(dict(common, ph="e", ts=self._ts(end)))
+
+    def flow(self, chunk_id, step, timestamp=None):
+        """
+        Eslabón del flujo de un chunk entre threads.
+
+        Args:
+            chunk_id: ID del chunk
+            step: "start", "step" o "end"
+            timestamp: perf_counter (None = ahora)
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        phase = {"start": "s", "step": "t", "end": "f"}[step]
+        event = {"ph": phase, "name": "chunk", "cat": "flow", "pid": self.pid,
+                 "tid": self._thread_id(), "ts": self._ts(timestamp), "id": chunk_id}
+        if phase == "f":
+            event["bp"] = "e"
+        self._add(event)
+
+    def save(self):
+        """
+        Escribe el archivo de traza.
+
+        Returns:
+            Número de eventos guardados
+        """
+        with self._lock:
+            events = list(self.events)
+
+        tmp_path = f"{self.trace_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"dropped_events": self.dropped_events}}, f)
+        os.replace(tmp_path, self.trace_path)
+        return len(events)
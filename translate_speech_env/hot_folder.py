@@ -0,0 +1,318 @@
+"""
+Traducción por lotes de una carpeta vigilada ("hot folder")
+Vigila un directorio y traduce cada grabación nueva que aparece en él,
+escribiendo los resultados junto al archivo (reunion.wav -> reunion.wav.txt,
+reunion.wav.srt). Todos los archivos comparten un único pool de procesos con
+los modelos ya cargados; si un proceso muere, el pool se vuelve a crear.
+
+Los resultados se guardan en una caché por hash del contenido (SHA-256)
+dentro de <directorio>/.translation_cache/, así un archivo sin cambios
+nunca se vuelve a traducir: ni al reiniciar el daemon, ni si se copia o
+renombra (en ese caso solo se reescriben las salidas desde la caché).
+
+Uso:
+    python translate_basic.py --watch /mnt/grabaciones --workers 8
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from translate_basic import create_segment_pool, save_translation, translate_file_parallel
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg')
+OUTPUT_FORMATS = ('txt', 'srt', 'vtt')
+CACHE_DIR_NAME = ".translation_cache"
+
+
+def hash_file(path, block_size=1024 * 1024):
+    """
+    SHA-256 del contenido de un archivo (leído por bloques).
+
+    Returns:
+        Hash en hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileResultCache:
+    """
+    Caché de traducciones por hash de contenido.
+
+    index.json recuerda (tamaño, mtime, hash) de cada archivo visto para no
+    recalcular el hash en cada pasada; los resultados se guardan en un JSON
+    por (hash, modelo, idioma).
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Directorio de la caché (se crea si no existe)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.json"
+        self._lock = threading.Lock()
+
+        self.files = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.files = json.load(f).get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Índice de caché ilegible, se reconstruye: {e}")
+
+    def _result_path(self, file_hash, model_size, language):
+        return self.directory / f"{file_hash}_{model_size}_{language}.json"
+
+    def known_hash(self, name, size, mtime):
+        """
+        Hash registrado de un archivo si no cambió desde la última vez.
+
+        Returns:
+            Hash o None (archivo nuevo o modificado)
+        """
+        with self._lock:
+            entry = self.files.get(name)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            return entry["sha256"]
+        return None
+
+    def remember(self, name, size, mtime, file_hash):
+        """Registra el hash de un archivo y guarda el índice"""
+        with self._lock:
+            self.files[name] = {"size": size, "mtime": mtime, "sha256": file_hash}
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"files": self.files}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.index_path)
+
+    def get(self, file_hash, model_size, language):
+        """
+        Resultado guardado de una traducción.
+
+        Returns:
+            dict de translate_file_parallel() o None
+        """
+        path = self._result_path(file_hash, model_size, language)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, file_hash, model_size, language, result):
+        """Guarda el resultado de una traducción"""
+        path = self._result_path(file_hash, model_size, language)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class HotFolderDaemon:
+    """
+    Vigila un directorio y traduce los archivos de audio nuevos o modificados.
+
+    El directorio se revisa cada poll_interval segundos (sin dependencias
+    de notificaciones del sistema, funciona igual en carpetas de red). Un
+    archivo se procesa cuando su tamaño y fecha no cambiaron durante
+    settle_seconds (la copia terminó). Hasta `workers` archivos se
+    traducen a la vez, todos sobre el mismo pool de procesos.
+    """
+
+    def __init__(self, directory, model_size="base", language="es", workers=None,
+                 formats=("txt", "srt"), poll_interval=2.0, settle_seconds=2.0):
+        """
+        Args:
+            directory: Directorio a vigilar
+            model_size: Modelo Whisper
+            language: Idioma de origen
+            workers: Procesos de traducción (None = núcleos disponibles)
+            formats: Salidas a escribir junto a cada archivo ("txt", "srt", "vtt")
+            poll_interval: Segundos entre revisiones del directorio
+            settle_seconds: Segundos sin cambios antes de procesar un archivo
+        """
+        for fmt in formats:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"Formato no soportado: {fmt} (usa {', '.join(OUTPUT_FORMATS)})")
+
+        self.directory = Path(directory)
+        self.model_size = model_size
+        self.language = language
+        self.workers = workers or os.cpu_count() or 1
+        self.formats = tuple(formats)
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+
+        self.cache = FileResultCache(self.directory / CACHE_DIR_NAME)
+        self._candidates = {}  # nombre -> (tamaño, mtime, primera vez visto así)
+        self._active = set()   # Archivos en proceso
+        self._failed = {}      # nombre -> (tamaño, mtime) del intento fallido
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = None  # Pool de procesos compartido (se crea en run())
+
+        self.files_translated = 0
+        self.files_from_cache = 0
+        self.files_failed = 0
+
+    def output_paths(self, audio_path):
+        """
+        Rutas de salida de un archivo (nombre completo + extensión de salida).
+
+        Se conserva la extensión del audio (x.wav -> x.wav.txt) para que x.wav
+        y x.flac en la misma carpeta no se pisen las salidas.
+        """
+        return [audio_path.with_name(f"{audio_path.name}.{fmt}") for fmt in self.formats]
+
+    def scan(self):
+        """
+        Revisa el directorio.
+
+        Returns:
+            Lista de (ruta, tamaño, mtime) listos para procesar
+        """
+        ready = []
+        seen = set()
+        now = time.monotonic()
+
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            stat = entry.stat()
+            size, mtime = stat.st_size, stat.st_mtime
+            seen.add(entry.name)
+
+            with self._lock:
+                if entry.name in self._active or self._failed.get(entry.name) == (size, mtime):
+                    continue
+
+            file_hash = self.cache.known_hash(entry.name, size, mtime)
+            if file_hash and all(p.exists() for p in self.output_paths(Path(entry.path))):
+                continue  # Ya traducido y sin cambios
+
+            previous = self._candidates.get(entry.name)
+            if previous is None or previous[:2] != (size, mtime):
+                self._candidates[entry.name] = (size, mtime, now)
+            elif size > 0 and now - previous[2] >= self.settle_seconds:
+                del self._candidates[entry.name]
+                ready.append((Path(entry.path), size, mtime))
+
+        # Olvidar archivos que desaparecieron
+        for name in set(self._candidates) - seen:
+            del self._candidates[name]
+        return ready
+
+    def _replace_pool(self, broken):
+        """
+        Reemplaza el pool de procesos si un proceso murió (BrokenProcessPool).
+
+        Args:
+            broken: Pool que falló (si otro hilo ya lo reemplazó, no se hace nada)
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+            print("⚠️  Un proceso de traducción terminó inesperadamente: se recrea el pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = create_segment_pool(self.model_size, self.workers)
+
+    def translate(self, path):
+        """
+        Traduce un archivo en el pool compartido, reintentando una vez si el
+        pool se rompe durante la traducción.
+
+        Returns:
+            dict de translate_file_parallel()
+        """
+        for attempt in range(2):
+            with self._lock:
+                executor = self._executor
+            try:
+                return translate_file_parallel(str(path), self.model_size, self.language,
+                                               self.workers, executor=executor, max_in_flight=2,
+                                               verbose=False)
+            except BrokenProcessPool:
+                self._replace_pool(executor)
+                if attempt:
+                    raise
+
+    def process_file(self, path, size, mtime):
+        """
+        Traduce un archivo (o reutiliza la caché) y escribe sus salidas.
+
+        Si falla algún segmento no se guarda nada (ni caché ni salidas) y el
+        archivo cuenta como fallido.
+
+        Args:
+            path: Ruta del archivo de audio
+            size: Tamaño visto en scan()
+            mtime: Fecha de modificación vista en scan()
+        """
+        try:
+            file_hash = self.cache.known_hash(path.name, size, mtime) or hash_file(path)
+            result = self.cache.get(file_hash, self.model_size, self.language)
+
+            if result is None:
+                start_time = time.perf_counter()
+                print(f"🎧 Traduciendo {path.name}...")
+                result = self.translate(path)
+                if result["errors"]:
+                    raise RuntimeError(f"{len(result['errors'])} segmentos fallaron "
+                                       f"({'; '.join(result['errors'][:3])})")
+                self.cache.put(file_hash, self.model_size, self.language, result)
+                print(f"✅ {path.name}: {len(result['segments'])} segmentos en "
+                      f"{time.perf_counter() - start_time:.1f}s")
+                with self._lock:
+                    self.files_translated += 1
+            else:
+                print(f"♻️  {path.name}: contenido ya traducido, se usa la caché")
+                with self._lock:
+                    self.files_from_cache += 1
+
+            for output_path in self.output_paths(path):
+                save_translation(result, str(output_path))
+            self.cache.remember(path.name, size, mtime, file_hash)
+
+        except Exception as e:
+            print(f"❌ {path.name}: {type(e).__name__}: {e}")
+            with self._lock:
+                self.files_failed += 1
+                self._failed[path.name] = (size, mtime)  # Reintentar solo si el archivo cambia
+        finally:
+            with self._lock:
+                self._active.discard(path.name)
+
+    def run(self):
+        """Vigila el directorio hasta Ctrl+C o stop()"""
+        print(f"👀 Vigilando {self.directory.resolve()} | modelo {self.model_size} | "
+              f"{self.workers} procesos | salidas: {', '.join(self.formats)}")
+        print("Presiona Ctrl+C para detener\n")
+
+        self._executor = create_segment_pool(self.model_size, self.workers)
+        file_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hot-folder")
+        try:
+            while not self._stop.is_set():
+                for path, size, mtime in self.scan():
+                    with self._lock:
+                        self._active.add(path.name)
+                    file_pool.submit(self.process_file, path, size, mtime)
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n⏹️  Deteniendo: se terminan los archivos en curso...")
+        finally:
+            file_pool.shutdown(wait=True, cancel_futures=True)
+            self._executor.shutdown()
+            print(f"📊 Traducidos: {self.files_translated} | desde caché: {self.files_from_cache} | "
+                  f"con error: {self.files_failed}")
+
+    def stop(self):
+        """Detiene run() al terminar la pasada actual"""
+        self._stop.set()
@@ -0,0 +1,211 @@
+"""
+Registro de métricas en vivo con endpoint local en formato Prometheus
+Contadores, gauges e histogramas ligeros (sin dependencias) que el
+traductor actualiza en el camino caliente; un servidor HTTP opcional en
+localhost los expone en /metrics para que el monitoreo pueda leerlos.
+
+Uso:
+    registry = MetricsRegistry()
+    chunks = registry.counter("translator_chunks_captured_total", "Chunks capturados")
+    chunks.inc()
+    MetricsServer(registry, port=9464).start()   # curl localhost:9464/metrics
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Contador monótono"""
+
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labels=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Incrementa el contador"""
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+
+class Gauge:
+    """Valor instantáneo; puede calcularse al momento de leerlo (función)"""
+
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labels=None, function=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.function = function
+        self.value = 0.0
+
+    def set(self, value):
+        """Fija el valor"""
+        self.value = value
+
+    def samples(self):
+        value = self.function() if self.function else self.value
+        return [(self.name, self.labels, value)]
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos (como Prometheus)"""
+
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labels=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Registra una observación"""
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def samples(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            samples.append((f"{self.name}_bucket", dict(self.labels, le=_format_value(bound)), cumulative))
+        samples.append((f"{self.name}_sum", self.labels, total))
+        samples.append((f"{self.name}_count", self.labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas con nombre (+ etiquetas) único.
+
+    counter()/gauge()/histogram() devuelven la métrica existente si ya
+    se registró con el mismo nombre y etiquetas.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labels, **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = cls(name, help_text, labels, **kwargs)
+                self._metrics[key] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"La métrica {name} ya existe con otro tipo")
+            return metric
+
+    def counter(self, name, help_text, labels=None):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=None, function=None):
+        return self._get_or_create(Gauge, name, help_text, labels, function=function)
+
+    def histogram(self, name, help_text, labels=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render(self):
+        """
+        Exporta todas las métricas en formato de texto Prometheus (0.0.4).
+
+        Returns:
+            String con HELP/TYPE por nombre y una línea por muestra
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+
+        lines = []
+        last_name = None
+        for metric in metrics:
+            if metric.name != last_name:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.type_name}")
+                last_name = metric.name
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Servidor HTTP en un thread daemon que sirve /metrics"""
+
+    def __init__(self, registry, host="127.0.0.1", port=9464):
+        """
+        Args:
+            registry: MetricsRegistry a exponer
+            host: Interfaz (localhost por defecto)
+            port: Puerto TCP
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        """Arranca el servidor (no bloquea)"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Sin logs por cada scrape
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el servidor"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,131 @@
+"""
+Seguimiento adaptativo del piso de ruido
+Estima el ruido de fondo sobre los bloques sin voz del stream de captura
+y ajusta en tiempo de ejecución el umbral de Silero VAD y el umbral del
+fallback por energía, en lugar de fijarlos una sola vez al calibrar.
+"""
+import numpy as np
+
+
+class NoiseFloorTracker:
+    """
+    Estimador del piso de ruido (energía media |x|) por bloques.
+
+    Un bloque se considera ruido si su energía no supera speech_ratio veces
+    el piso actual. El piso baja rápido (sigue al mínimo) y sube despacio;
+    si el nivel se mantiene alto durante más de max_speech_duration
+    segundos se asume que cambió el ruido de la sala y se adapta igual.
+    """
+
+    def __init__(self, sample_rate=16000, initial_floor=0.002, base_vad_threshold=0.5,
+                 fall_time=0.5, rise_time=5.0, speech_ratio=2.0, snr_factor=3.0,
+                 max_speech_duration=10.0):
+        """
+        Inicializa el estimador.
+
+        Args:
+            sample_rate: Frecuencia de muestreo
+            initial_floor: Piso de ruido inicial (energía media |x|)
+            base_vad_threshold: Umbral Silero para una sala silenciosa (del perfil)
+            fall_time: Constante de tiempo cuando el ruido baja (segundos)
+            rise_time: Constante de tiempo cuando el ruido sube (segundos)
+            speech_ratio: Múltiplo del piso a partir del cual un bloque es voz
+            snr_factor: Múltiplo del piso usado como umbral del fallback por energía
+            max_speech_duration: Segundos de nivel alto continuo tras los que se adapta igual
+        """
+        self.sample_rate = sample_rate
+        self.base_vad_threshold = base_vad_threshold
+        self.fall_time = fall_time
+        self.rise_time = rise_time
+        self.speech_ratio = speech_ratio
+        self.snr_factor = snr_factor
+        self.max_speech_duration = max_speech_duration
+
+        self.floor = initial_floor
+        self.speech_time = 0.0  # Segundos consecutivos por encima del umbral de voz
+        self.noise_blocks = 0
+        self.speech_blocks = 0
+
+    @classmethod
+    def from_profile(cls, profile, sample_rate=16000, vad_threshold=0.5):
+        """
+        Crea un estimador tomando el umbral Silero base del perfil.
+
+        Args:
+            profile: VoiceProfile o None
+            sample_rate: Frecuencia de muestreo
+            vad_threshold: Umbral base si no hay perfil calibrado
+
+        Returns:
+            NoiseFloorTracker
+        """
+        if profile and profile.is_calibrated:
+            vad_threshold = profile.vad_threshold
+        return cls(sample_rate=sample_rate, base_vad_threshold=vad_threshold)
+
+    def update(self, block):
+        """
+        Actualiza el piso de ruido con un bloque del stream (antes del AGC).
+
+        Args:
+            block: Array de audio 1D
+
+        Returns:
+            True si el bloque se consideró ruido
+        """
+        if len(block) == 0:
+            return False
+
+        energy = float(np.abs(block).mean())
+        block_duration = len(block) / self.sample_rate
+
+        if energy > self.floor * self.speech_ratio:
+            self.speech_blocks += 1
+            self.speech_time += block_duration
+            if self.speech_time < self.max_speech_duration:
+                return False
+            # Nivel alto sostenido: el ruido de fondo cambió, adaptarse
+        else:
+            self.noise_blocks += 1
+            self.speech_time = 0.0
+
+        time_constant = self.fall_time if energy < self.floor else self.rise_time
+        coefficient = np.exp(-block_duration / time_constant)
+        self.floor = coefficient * self.floor + (1.0 - coefficient) * max(energy, 1e-6)
+        return True
+
+    @property
+    def floor_db(self):
+        """Piso de ruido en dB"""
+        return 20 * np.log10(self.floor + 1e-10)
+
+    @property
+    def gate_rms(self):
+        """Nivel RMS bajo el cual un bloque es ruido (para la puerta del AGC)"""
+        return self.floor * self.speech_ratio * np.sqrt(np.pi / 2)
+
+    @property
+    def energy_threshold(self):
+        """Umbral de energía media |x| para el fallback de has_speech (sin AGC)"""
+        return max(self.floor * self.snr_factor, 0.002)
+
+    @property
+    def vad_threshold(self):
+        """
+        Umbral Silero adaptado al ruido: +0.05 por cada 10 dB de piso por
+        encima de -60 dB sobre el umbral base (más estricto en salas ruidosas).
+        """
+        adjustment = 0.05 * (self.floor_db + 60.0) / 10.0
+        return float(np.clip(self.base_vad_threshold + adjustment, 0.2, 0.85))
+
+    def get_summary(self):
+        """
+        Resumen del estado del estimador.
+
+        Returns:
+            String con piso de ruido y umbrales actuales
+        """
+        total_blocks = self.noise_blocks + self.speech_blocks
+        noise_pct = self.noise_blocks / total_blocks * 100 if total_blocks else 0.0
+        return (f"Piso de ruido: {self.floor_db:.1f} dB | VAD: {self.vad_threshold:.2f} | "
+                f"Fallback energía: {self.energy_threshold:.4f} | Bloques de ruido: {noise_pct:.0f}%")
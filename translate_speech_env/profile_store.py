@@ -0,0 +1,245 @@
+"""
+Almacén de perfiles de voz con índice
+Permite listar y seleccionar entre cientos de perfiles sin abrir y
+parsear cada JSON: un índice pequeño guarda nombre, calidad de
+calibración y último uso, y se revalida por mtime.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from voice_profile import VoiceProfile, get_profiles_dir, get_safe_profile_name
+
+PROFILE_SUFFIX = "_profile.json"
+INDEX_FILE = "index.json"
+
+
+class ProfileStore:
+    """
+    Índice de perfiles de un directorio (voice_profiles/ por defecto).
+
+    El índice se guarda en index.json y se mantiene en memoria. Se recarga
+    si otro proceso lo modifica (cambio de mtime) y cada entrada se vuelve
+    a leer solo si el mtime de su archivo de perfil cambió.
+    """
+
+    def __init__(self, directory=None, scan_interval=2.0):
+        """
+        Inicializa el almacén.
+
+        Args:
+            directory: Directorio de perfiles (None = voice_profiles/)
+            scan_interval: Segundos mínimos entre escaneos del directorio
+        """
+        self.directory = Path(directory) if directory else get_profiles_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / INDEX_FILE
+        self.scan_interval = scan_interval
+
+        self._lock = threading.RLock()
+        self._entries = {}  # safe_name -> dict
+        self._index_mtime = None
+        self._last_scan = 0.0
+        self._profiles = {}  # safe_name -> (mtime, VoiceProfile)
+
+    def get_profile_path(self, user_name):
+        """
+        Ruta del archivo de perfil de un usuario.
+
+        Args:
+            user_name: Nombre del usuario
+
+        Returns:
+            Path al JSON del perfil
+        """
+        return self.directory / f"{get_safe_profile_name(user_name)}{PROFILE_SUFFIX}"
+
+    def _read_index(self):
+        """Recarga index.json si cambió su mtime"""
+        try:
+            mtime = self.index_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime == self._index_mtime:
+            return
+
+        entries = {}
+        if mtime is not None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get("profiles", {})
+            except Exception as e:
+                print(f"⚠️  Índice de perfiles inválido, se reconstruye: {e}")
+
+        self._entries = entries
+        self._index_mtime = mtime
+        self._last_scan = 0.0  # Forzar validación contra el directorio
+
+    def _write_index(self):
+        """Guarda el índice (escritura atómica)"""
+        tmp_path = self.index_path.with_name(INDEX_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "profiles": self._entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = self.index_path.stat().st_mtime
+
+    @staticmethod
+    def _entry_from_data(data, file_name, mtime):
+        """Construye una entrada del índice a partir del JSON de un perfil"""
+        cal_meta = data.get("calibration_metadata", {})
+        stats = data.get("usage_stats", {})
+        return {
+            "user_name": data.get("user_name", "Usuario"),
+            "file": file_name,
+            "is_calibrated": data.get("is_calibrated", False),
+            "calibration_quality": cal_meta.get("quality_score", 0.0),
+            "sessions": stats.get("sessions", 0),
+            "last_used": stats.get("last_used"),
+            "mtime": mtime
+        }
+
+    def refresh(self, force=False):
+        """
+        Sincroniza el índice con el directorio.
+
+        Solo se parsean los perfiles nuevos o con mtime distinto al
+        registrado; si algo cambió se reescribe index.json.
+
+        Args:
+            force: Si True, escanea aunque no haya pasado scan_interval
+        """
+        with self._lock:
+            self._read_index()
+
+            now = time.monotonic()
+            if not force and now - self._last_scan < self.scan_interval:
+                return
+            self._last_scan = now
+
+            changed = False
+            seen = set()
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(PROFILE_SUFFIX):
+                    continue
+
+                key = entry.name[:-len(PROFILE_SUFFIX)]
+                seen.add(key)
+                mtime = entry.stat().st_mtime
+                cached = self._entries.get(key)
+                if cached and cached.get("mtime") == mtime:
+                    continue
+
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    print(f"⚠️  No se pudo indexar {entry.name}: {e}")
+                    continue
+
+                self._entries[key] = self._entry_from_data(data, entry.name, mtime)
+                changed = True
+
+            for key in set(self._entries) - seen:
+                del self._entries[key]
+                self._profiles.pop(key, None)
+                changed = True
+
+            if changed:
+                self._write_index()
+
+    def list_profiles(self, sort_by="last_used"):
+        """
+        Lista los perfiles del índice.
+
+        Args:
+            sort_by: "last_used" (más reciente primero), "user_name" o "calibration_quality"
+
+        Returns:
+            Lista de dicts con user_name, is_calibrated, calibration_quality,
+            sessions y last_used
+        """
+        self.refresh()
+        with self._lock:
+            entries = [dict(e) for e in self._entries.values()]
+
+        if sort_by == "user_name":
+            entries.sort(key=lambda e: e["user_name"].lower())
+        elif sort_by == "calibration_quality":
+            entries.sort(key=lambda e: e["calibration_quality"], reverse=True)
+        else:
+            entries.sort(key=lambda e: e["last_used"] or "", reverse=True)
+        return entries
+
+    def get_entry(self, user_name):
+        """
+        Busca la entrada del índice de un usuario.
+
+        Args:
+            user_name: Nombre del usuario
+
+        Returns:
+            dict de la entrada o None si no existe perfil
+        """
+        self.refresh()
+        with self._lock:
+            entry = self._entries.get(get_safe_profile_name(user_name))
+            return dict(entry) if entry else None
+
+    def load_profile(self, user_name):
+        """
+        Carga el perfil de un usuario (cacheado mientras no cambie su mtime).
+
+        Args:
+            user_name: Nombre del usuario
+
+        Returns:
+            VoiceProfile o None si no existe
+        """
+        key = get_safe_profile_name(user_name)
+        path = self.get_profile_path(user_name)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._profiles.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            profile = VoiceProfile(user_name=user_name, profile_path=str(path))
+            self._profiles[key] = (mtime, profile)
+            return profile
+
+    def save_profile(self, profile):
+        """
+        Guarda un perfil y actualiza su entrada del índice.
+
+        Args:
+            profile: VoiceProfile
+
+        Returns:
+            Path del archivo guardado
+        """
+        path = self.get_profile_path(profile.user_name)
+        profile.save(str(path))
+
+        with self._lock:
+            self._read_index()
+            key = get_safe_profile_name(profile.user_name)
+            mtime = path.stat().st_mtime
+            self._entries[key] = {
+                "user_name": profile.user_name,
+                "file": path.name,
+                "is_calibrated": profile.is_calibrated,
+                "calibration_quality": float(profile.calibration_quality),
+                "sessions": int(profile.sessions),
+                "last_used": profile.last_used,
+                "mtime": mtime
+            }
+            self._profiles[key] = (mtime, profile)
+            self._write_index()
+
+        return path
@@ -0,0 +1,262 @@
+"""
+Configuración del traductor en tiempo real
+Front end no interactivo (argparse + archivo JSON + presets) para
+RealtimeTranslator, pensado para ejecuciones desatendidas y benchmarks.
+
+Prioridad (de menor a mayor):
+    valores por defecto < preset < --config archivo.json < flags de la línea de comandos
+
+Uso:
+    python translate_realtime.py --preset low-latency
+    python translate_realtime.py --config mi_config.json --device 2
+    python translate_realtime.py --model small --chunk-duration 4 --workers 2
+    python translate_realtime.py --preset balanced --source reunion.wav --replay-speed 4
+"""
+import argparse
+import json
+from pathlib import Path
+
+DEFAULT_CONFIG = {
+    "model": "base",               # Modelo Whisper objetivo
+    "draft_model": None,           # Modelo borrador para decodificación especulativa
+    "language": "es",              # Idioma de origen ("auto" para detectarlo)
+    "push_to_talk": False,
+    "chunk_duration": 3.0,         # Segundos por chunk (modo continuo)
+    "overlap": 0.25,               # Fracción del chunk que se solapa con el siguiente
+    "vad": True,                   # Silero VAD (False = solo fallback por energía)
+    "vad_threshold": 0.5,          # Umbral base (sin perfil calibrado)
+    "quantization": None,          # None o "int8" (cuantización dinámica, solo CPU)
+    "workers": 1,                  # Threads de procesamiento (Whisper)
+    "threads": None,               # Threads de PyTorch por inferencia (None = automático)
+    "queue_size": 10,              # Chunks pendientes máximos en audio_queue
+    "overflow_policy": "drop-oldest",  # Cola llena: drop-oldest, drop-newest, block o spill
+    "overflow_timeout": 0.5,       # Espera máxima (s) con la política "block"
+    "spill_dir": None,             # Directorio de desborde para "spill" (None = temporal)
+    "tts": True,                   # Reproducir la traducción con TTS
+    "tts_rate": 185,               # Velocidad de voz (palabras por minuto)
+    "device": None,                # Dispositivo de entrada (índice o nombre; None = por defecto)
+    "source": "mic",               # "mic", "synthetic[:SEGUNDOS]" o ruta de un WAV/FLAC
+    "replay_speed": 1.0,           # Velocidad de archivo/sintético (1.0 = tiempo real, 0 = máxima)
+    "profile": None,               # Nombre de usuario del perfil de voz a cargar
+    "cache": False,                # Caché de traducciones
+    "show_timings": False,
+    "transcript_db": None,         # Base SQLite donde guardar las traducciones (None = no guardar)
+    "subtitles": None,             # Archivo .srt/.vtt de subtítulos en vivo (None = no escribir)
+    "subtitle_port": None,         # Puerto local del feed de subtítulos (SSE + overlay); None = desactivado
+    "partial_interval": None,      # Segundos entre resultados parciales (None = solo finales)
+    "partial_model": "tiny",       # Modelo barato para los parciales
+    "partial_budget": 0.25,        # Fracción máxima del tiempo dedicada a los parciales
+    "trace": None,                 # Archivo JSON de traza por chunk (Chrome trace / Perfetto)
+    "metrics_port": None           # Puerto local de /metrics (Prometheus); None = desactivado
+}
+
+MODEL_CHOICES = ["tiny", "base", "small", "medium", "large"]
+QUANTIZATION_CHOICES = ["none", "int8"]
+OVERFLOW_POLICIES = ["drop-oldest", "drop-newest", "block", "spill"]
+
+
+def get_presets_dir():
+    """
+    Directorio de presets de rendimiento.
+
+    Returns:
+        Path al directorio presets/
+    """
+    return Path(__file__).parent / "presets"
+
+
+def list_presets():
+    """
+    Lista los presets disponibles.
+
+    Returns:
+        Lista de nombres (sin extensión)
+    """
+    return sorted(path.stem for path in get_presets_dir().glob("*.json"))
+
+
+def get_preset_description(name):
+    """
+    Descripción de un preset (campo "description" del JSON).
+
+    Args:
+        name: Nombre del preset
+
+    Returns:
+        String con la descripción (vacío si no tiene)
+    """
+    with open(get_presets_dir() / f"{name}.json", 'r', encoding='utf-8') as f:
+        return json.load(f).get("description", "")
+
+
+def load_config_file(path):
+    """
+    Carga un archivo de configuración JSON.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        dict con las claves reconocidas
+
+    Raises:
+        ValueError: Si el archivo contiene claves desconocidas
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    data.pop("description", None)
+    unknown = set(data) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Claves desconocidas en {path}: {', '.join(sorted(unknown))}")
+    return data
+
+
+def load_preset(name):
+    """
+    Carga un preset por nombre (o ruta a un archivo JSON).
+
+    Args:
+        name: "low-latency", "balanced", "throughput" o ruta
+
+    Returns:
+        dict de configuración del preset
+    """
+    path = Path(name)
+    if not path.suffix:
+        path = get_presets_dir() / f"{name}.json"
+    if not path.exists():
+        raise ValueError(f"Preset no encontrado: {name} (disponibles: {', '.join(list_presets())})")
+    return load_config_file(path)
+
+
+def build_arg_parser():
+    """
+    Construye el parser de la línea de comandos.
+
+    Todos los flags usan default=None para poder distinguir los que el
+    usuario pasó explícitamente de los que vienen del preset o del archivo.
+
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Traductor de voz en tiempo real (Español → Inglés)",
+        epilog="Sin argumentos se muestra el menú interactivo."
+    )
+    parser.add_argument("--preset", help=f"Preset de rendimiento ({', '.join(list_presets())}) o ruta JSON")
+    parser.add_argument("--config", help="Archivo de configuración JSON")
+    parser.add_argument("--model", choices=MODEL_CHOICES, help="Modelo Whisper")
+    parser.add_argument("--draft-model", choices=MODEL_CHOICES, help="Modelo borrador (decodificación especulativa)")
+    parser.add_argument("--language", help="Idioma de origen (es, en, ... o auto)")
+    parser.add_argument("--push-to-talk", action="store_const", const=True, help="Modo Push-to-Talk")
+    parser.add_argument("--continuous", dest="push_to_talk", action="store_const", const=False,
+                        help="Modo continuo")
+    parser.add_argument("--chunk-duration", type=float, help="Segundos por chunk")
+    parser.add_argument("--overlap", type=float, help="Fracción de solapamiento entre chunks (0-0.9)")
+    parser.add_argument("--no-vad", dest="vad", action="store_const", const=False, help="Desactivar Silero VAD")
+    parser.add_argument("--vad-threshold", type=float, help="Umbral base de Silero VAD (0-1)")
+    parser.add_argument("--quantization", choices=QUANTIZATION_CHOICES, help="Cuantización del modelo (CPU)")
+    parser.add_argument("--workers", type=int, help="Threads de procesamiento")
+    parser.add_argument("--threads", type=int, help="Threads de PyTorch")
+    parser.add_argument("--queue-size", type=int, help="Chunks pendientes máximos")
+    parser.add_argument("--overflow-policy", choices=OVERFLOW_POLICIES,
+                        help="Qué hacer con la cola llena (drop-oldest, drop-newest, block, spill)")
+    parser.add_argument("--overflow-timeout", type=float, help="Espera máxima con --overflow-policy block")
+    parser.add_argument("--spill-dir", help="Directorio de desborde con --overflow-policy spill")
+    parser.add_argument("--no-tts", dest="tts", action="store_const", const=False,
+                        help="No reproducir la traducción (solo texto)")
+    parser.add_argument("--tts-rate", type=int, help="Velocidad de voz TTS")
+    parser.add_argument("--device", help="Dispositivo de entrada (índice o nombre)")
+    parser.add_argument("--source", help="Fuente de audio: mic, synthetic[:SEGUNDOS] o archivo WAV/FLAC")
+    parser.add_argument("--replay-speed", type=float,
+                        help="Velocidad de reproducción de archivo/sintético (1 = tiempo real, 0 = máxima)")
+    parser.add_argument("--profile", help="Perfil de voz (nombre de usuario)")
+    parser.add_argument("--cache", action="store_const", const=True, help="Usar caché de traducciones")
+    parser.add_argument("--show-timings", action="store_const", const=True, help="Mostrar tiempos por chunk")
+    parser.add_argument("--transcript-db",
+                        help="Guardar traducciones en esta base SQLite (ver transcript_store.py)")
+    parser.add_argument("--partial-interval", type=float,
+                        help="Mostrar resultados parciales cada N segundos mientras se habla")
+    parser.add_argument("--partial-model", choices=MODEL_CHOICES, help="Modelo para los resultados parciales")
+    parser.add_argument("--partial-budget", type=float,
+                        help="Fracción máxima del tiempo para decodificar parciales (0-1, default: 0.25)")
+    parser.add_argument("--subtitles", help="Escribir subtítulos en vivo en este archivo .srt o .vtt")
+    parser.add_argument("--subtitle-port", type=int,
+                        help="Servir subtítulos en 127.0.0.1:PUERTO (overlay en / y feed SSE en /events)")
+    parser.add_argument("--metrics-port", type=int, help="Exponer métricas Prometheus en 127.0.0.1:PUERTO/metrics")
+    parser.add_argument("--trace", help="Guardar traza por chunk (abrir en ui.perfetto.dev o chrome://tracing)")
+    parser.add_argument("--list-presets", action="store_true", help="Listar presets y salir")
+    parser.add_argument("--print-config", action="store_true", help="Mostrar la configuración resuelta y salir")
+    return parser
+
+
+def resolve_config(args):
+    """
+    Combina valores por defecto, preset, archivo y flags.
+
+    Args:
+        args: argparse.Namespace de build_arg_parser()
+
+    Returns:
+        dict de configuración completo y validado
+    """
+    config = dict(DEFAULT_CONFIG)
+
+    if args.preset:
+        config.update(load_preset(args.preset))
+    if args.config:
+        config.update(load_config_file(args.config))
+
+    for key in DEFAULT_CONFIG:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+
+    if config["quantization"] == "none":
+        config["quantization"] = None
+    if isinstance(config["device"], str) and config["device"].isdigit():
+        config["device"] = int(config["device"])
+
+    validate_config(config)
+    return config
+
+
+def validate_config(config):
+    """
+    Valida rangos de la configuración.
+
+    Args:
+        config: dict de configuración
+
+    Raises:
+        ValueError: Si algún valor está fuera de rango
+    """
+    if config["model"] not in MODEL_CHOICES:
+        raise ValueError(f"Modelo inválido: {config['model']}")
+    if config["chunk_duration"] <= 0:
+        raise ValueError("chunk_duration debe ser mayor que 0")
+    if not 0 <= config["overlap"] < 0.9:
+        raise ValueError("overlap debe estar entre 0 y 0.9")
+    if not 0 < config["vad_threshold"] < 1:
+        raise ValueError("vad_threshold debe estar entre 0 y 1")
+    if config["workers"] < 1:
+        raise ValueError("workers debe ser al menos 1")
+    if config["queue_size"] < 1:
+        raise ValueError("queue_size debe ser al menos 1")
+    if config["overflow_policy"] not in OVERFLOW_POLICIES:
+        raise ValueError(f"Política de desborde inválida: {config['overflow_policy']}")
+    if config["overflow_timeout"] < 0:
+        raise ValueError("overflow_timeout no puede ser negativo")
+    if config["partial_interval"] is not None and config["partial_interval"] <= 0:
+        raise ValueError("partial_interval debe ser mayor que 0")
+    if config["partial_model"] not in MODEL_CHOICES:
+        raise ValueError(f"Modelo de parciales inválido: {config['partial_model']}")
+    if not 0 < config["partial_budget"] <= 1:
+        raise ValueError("partial_budget debe estar entre 0 (excluido) y 1")
+    if config["subtitles"] and Path(config["subtitles"]).suffix.lower() not in (".srt", ".vtt"):
+        raise ValueError("subtitles debe ser un archivo .srt o .vtt")
+    if config["replay_speed"] < 0:
+        raise ValueError("replay_speed no puede ser negativo")
+    if config["quantization"] not in (None, "int8"):
+        raise ValueError(f"Cuantización no soportada: {config['quantization']}")
@@ -0,0 +1,326 @@
+"""
+Decodificación especulativa para Whisper
+Un modelo pequeño (borrador, ej: tiny) propone k tokens y el modelo
+objetivo (base/small) los verifica en una sola pasada del decoder.
+El resultado es idéntico al greedy decoding sin timestamps del modelo
+objetivo (decode_greedy), no al de model.transcribe(): este último
+predice timestamps y puede elegir otros tokens.
+"""
+import torch
+import whisper
+from whisper.audio import N_SAMPLES
+from whisper.tokenizer import get_tokenizer
+
+
+class SpeculativeDecoder:
+    """
+    Decoder greedy acelerado con un modelo borrador.
+
+    Ambos modelos deben compartir vocabulario (tiny/base/small multilingües
+    usan el mismo tokenizer). Se decodifica sin timestamps y con los mismos
+    filtros de logits que Whisper aplica por defecto (suppress_blank y
+    suppress_tokens="-1"), por lo que la secuencia aceptada coincide token
+    a token con la que produciría el modelo objetivo en modo greedy.
+    """
+
+    def __init__(self, target_model, draft_model, language="es", task="translate",
+                 num_draft_tokens=4):
+        """
+        Inicializa el decoder especulativo.
+
+        Args:
+            target_model: Modelo Whisper que define la salida (base, small...)
+            draft_model: Modelo Whisper rápido que propone tokens (tiny)
+            language: Idioma de origen
+            task: "translate" o "transcribe"
+            num_draft_tokens: Tokens propuestos por ronda (k)
+        """
+        if target_model.dims.n_vocab != draft_model.dims.n_vocab:
+            raise ValueError("El modelo borrador y el objetivo no comparten vocabulario")
+
+        self.target_model = target_model
+        self.draft_model = draft_model
+        self.task = task
+        self.num_draft_tokens = num_draft_tokens
+        self.sample_len = target_model.dims.n_text_ctx // 2
+
+        self.language = None
+        if language is not None:
+            self._set_language(language)
+
+        # Estadísticas de aceptación (acumuladas)
+        self.rounds = 0
+        self.proposed_tokens = 0
+        self.accepted_tokens = 0
+
+    def _set_language(self, language):
+        """Reconstruye tokenizer y secuencia inicial si cambia el idioma"""
+        if language is None:
+            raise ValueError("Idioma no definido: indica el idioma o usa _resolve_language()")
+        if language == self.language:
+            return
+
+        self.language = language
+        self.tokenizer = get_tokenizer(
+            self.target_model.is_multilingual,
+            num_languages=self.target_model.num_languages,
+            language=language,
+            task=self.task
+        )
+        self.initial_tokens = list(self.tokenizer.sot_sequence_including_notimestamps)
+        self.sample_begin = len(self.initial_tokens)
+
+        # Mismos tokens suprimidos que DecodingTask con suppress_tokens="-1"
+        suppress = set(self.tokenizer.non_speech_tokens)
+        suppress.update([
+            self.tokenizer.transcribe,
+            self.tokenizer.translate,
+            self.tokenizer.sot,
+            self.tokenizer.sot_prev,
+            self.tokenizer.sot_lm
+        ])
+        if self.tokenizer.no_speech is not None:
+            suppress.add(self.tokenizer.no_speech)
+        self.suppress_tokens = sorted(suppress)
+        self.blank_tokens = self.tokenizer.encode(" ") + [self.tokenizer.eot]
+
+    @property
+    def acceptance_rate(self):
+        """Fracción de tokens propuestos por el borrador que fueron aceptados"""
+        if self.proposed_tokens == 0:
+            return 0.0
+        return self.accepted_tokens / self.proposed_tokens
+
+    @staticmethod
+    def _mel(model, audio):
+        """Log-mel del chunk (ventana de 30s) con los parámetros del modelo"""
+        return whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio, N_SAMPLES),
+            n_mels=model.dims.n_mels
+        ).to(model.device)
+
+    def _resolve_language(self, language, mel):
+        """
+        Fija el idioma del chunk: el indicado, el configurado o, si no hay
+        ninguno, el detectado por el modelo objetivo.
+        """
+        language = language or self.language
+        if language is None:
+            _, probs = self.target_model.detect_language(mel)
+            language = max(probs, key=probs.get)
+        self._set_language(language)
+
+    def _filter_logits(self, logits, position):
+        """
+        Aplica los filtros de Whisper a los logits de una posición.
+
+        Args:
+            logits: Tensor (n_vocab,) con los logits
+            position: Índice del token que se va a predecir
+        """
+        logits[self.suppress_tokens] = -float("inf")
+        if position == self.sample_begin:
+            logits[self.blank_tokens] = -float("inf")
+        return logits
+
+    @staticmethod
+    def _cache_length(model, cache):
+        """Número de tokens con keys/values en el kv-cache del decoder"""
+        key = model.decoder.blocks[0].attn.key
+        return cache[key].shape[1] if key in cache else 0
+
+    @staticmethod
+    def _truncate_cache(model, cache, length):
+        """Descarta del kv-cache (self-attention) los tokens posteriores a length"""
+        for block in model.decoder.blocks:
+            for module in (block.attn.key, block.attn.value):
+                if module not in cache:
+                    continue
+                if length == 0:
+                    del cache[module]
+                else:
+                    cache[module] = cache[module][:, :length]
+
+    @staticmethod
+    def _self_attention(attn, x, mask, cache):
+        """
+        Self-attention causal de un bloque del decoder sobre el kv-cache.
+
+        Los hooks de install_kv_cache_hooks() devuelven keys/values de
+        todos los tokens (cacheados + nuevos). Se calcula aquí en vez de
+        usar MultiHeadAttention porque su máscara (o is_causal en la ruta
+        SDPA) asume que no hay tokens cacheados cuando llega más de uno.
+        """
+        q = attn.query(x)
+        k = attn.key(x)
+        v = attn.value(x)
+
+        n_batch, n_ctx, n_state = q.shape
+        scale = (n_state // attn.n_head) ** -0.25
+        q = q.view(n_batch, n_ctx, attn.n_head, -1).permute(0, 2, 1, 3)
+        k = k.view(n_batch, k.shape[1], attn.n_head, -1).permute(0, 2, 3, 1)
+        v = v.view(n_batch, v.shape[1], attn.n_head, -1).permute(0, 2, 1, 3)
+
+        qk = (q * scale) @ (k * scale) + mask
+        w = torch.softmax(qk.float(), dim=-1).to(q.dtype)
+        return attn.out((w @ v).permute(0, 2, 1, 3).flatten(start_dim=2))
+
+    def _forward(self, model, cache, tokens, audio_features):
+        """
+        Avanza el decoder con kv-cache sobre los tokens aún no cacheados
+        (uno o varios) en una sola pasada.
+
+        Returns:
+            Logits (tokens nuevos, n_vocab): la fila i predice el token
+            siguiente al i-ésimo token nuevo
+        """
+        decoder = model.decoder
+        offset = self._cache_length(model, cache)
+        new_tokens = tokens[offset:]
+        n = len(new_tokens)
+
+        x = torch.tensor([new_tokens], device=audio_features.device)
+        x = decoder.token_embedding(x) + decoder.positional_embedding[offset:offset + n]
+        x = x.to(audio_features.dtype)
+
+        # Máscara causal con offset: el token nuevo i ve los cacheados y los nuevos <= i
+        mask = torch.full((n, offset + n), -float("inf"), device=x.device).triu_(offset + 1)
+
+        for block in decoder.blocks:
+            x = x + self._self_attention(block.attn, block.attn_ln(x), mask, cache)
+            x = x + block.cross_attn(block.cross_attn_ln(x), audio_features, kv_cache=cache)[0]
+            x = x + block.mlp(block.mlp_ln(x))
+
+        x = decoder.ln(x)
+        return (x @ torch.transpose(decoder.token_embedding.weight.to(x.dtype), 0, 1)).float()[0]
+
+    def _result(self, tokens, sum_logprob):
+        """Construye un resultado compatible con model.transcribe()"""
+        generated = tokens[self.sample_begin:]
+        if self.tokenizer.eot in generated:
+            generated = generated[:generated.index(self.tokenizer.eot)]
+        return {
+            "text": self.tokenizer.decode(generated),
+            "tokens": generated,
+            "language": self.language,
+            # Misma definición que DecodingResult.avg_logprob de Whisper
+            "avg_logprob": sum_logprob / (len(generated) + 1)
+        }
+
+    @torch.no_grad()
+    def decode_greedy(self, audio, language=None):
+        """
+        Greedy decoding convencional con el modelo objetivo (referencia).
+
+        Args:
+            audio: Array de audio 16kHz mono (máximo 30 segundos)
+            language: Idioma de origen (None = el configurado o, sin él, detectado)
+
+        Returns:
+            dict con "text", "tokens", "language" y "avg_logprob"
+        """
+        model = self.target_model
+        mel = self._mel(model, audio)
+        self._resolve_language(language, mel)
+        audio_features = model.embed_audio(mel.unsqueeze(0))
+
+        cache, hooks = model.install_kv_cache_hooks()
+        tokens = list(self.initial_tokens)
+        sum_logprob = 0.0
+        try:
+            while len(tokens) - self.sample_begin < self.sample_len:
+                logits = self._forward(model, cache, tokens, audio_features)[-1]
+                logits = self._filter_logits(logits, len(tokens))
+                token = int(logits.argmax())
+                sum_logprob += float(torch.log_softmax(logits.float(), dim=-1)[token])
+                tokens.append(token)
+                if token == self.tokenizer.eot:
+                    break
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        return self._result(tokens, sum_logprob)
+
+    @torch.no_grad()
+    def decode(self, audio, language=None):
+        """
+        Decodificación especulativa de un chunk de audio.
+
+        En cada ronda el borrador propone k tokens de forma greedy y el
+        modelo objetivo calcula los logits de las posiciones nuevas en una
+        única pasada (con kv-cache, así el costo por ronda no crece con el
+        largo de la salida). Se aceptan los tokens propuestos mientras
+        coincidan con el argmax del objetivo, y se añade el token del
+        objetivo en la primera discrepancia (o uno extra si se aceptaron todos).
+
+        Args:
+            audio: Array de audio 16kHz mono (máximo 30 segundos)
+            language: Idioma de origen (None = el configurado o, sin él, detectado)
+
+        Returns:
+            dict con "text", "tokens", "language" y "avg_logprob"
+        """
+        target_mel = self._mel(self.target_model, audio)
+        self._resolve_language(language, target_mel)
+        eot = self.tokenizer.eot
+
+        target_features = self.target_model.embed_audio(target_mel.unsqueeze(0))
+        draft_features = self.draft_model.embed_audio(self._mel(self.draft_model, audio).unsqueeze(0))
+
+        draft_cache, draft_hooks = self.draft_model.install_kv_cache_hooks()
+        target_cache, target_hooks = self.target_model.install_kv_cache_hooks()
+        hooks = draft_hooks + target_hooks
+        tokens = list(self.initial_tokens)
+        sum_logprob = 0.0
+        try:
+            while len(tokens) - self.sample_begin < self.sample_len:
+                remaining = self.sample_len - (len(tokens) - self.sample_begin)
+                k = min(self.num_draft_tokens, remaining)
+
+                # 1. El borrador propone k tokens (greedy, con kv-cache)
+                proposal = []
+                for _ in range(k):
+                    logits = self._forward(
+                        self.draft_model, draft_cache, tokens + proposal, draft_features
+                    )[-1]
+                    position = len(tokens) + len(proposal)
+                    token = int(self._filter_logits(logits, position).argmax())
+                    proposal.append(token)
+                    if token == eot:
+                        break
+
+                # 2. El objetivo verifica las posiciones nuevas en una pasada
+                target_cached = self._cache_length(self.target_model, target_cache)
+                target_logits = self._forward(
+                    self.target_model, target_cache, tokens + proposal, target_features
+                )
+
+                accepted = []
+                for i in range(len(proposal) + 1):
+                    position = len(tokens) + i
+                    logits = self._filter_logits(target_logits[position - 1 - target_cached], position)
+                    token = int(logits.argmax())
+                    sum_logprob += float(torch.log_softmax(logits.float(), dim=-1)[token])
+                    accepted.append(token)
+                    if i == len(proposal) or token != proposal[i] or token == eot:
+                        break
+
+                self.rounds += 1
+                self.proposed_tokens += len(proposal)
+                self.accepted_tokens += sum(1 for a, p in zip(accepted, proposal) if a == p)
+
+                tokens.extend(accepted)
+                tokens = tokens[:self.sample_begin + self.sample_len]
+                if eot in accepted:
+                    break
+
+                # 3. Los caches solo son válidos hasta el prefijo común
+                for model, cache in ((self.draft_model, draft_cache), (self.target_model, target_cache)):
+                    valid = min(self._cache_length(model, cache), len(tokens) - 1)
+                    self._truncate_cache(model, cache, valid)
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        return self._result(tokens, sum_logprob)
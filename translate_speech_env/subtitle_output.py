@@ -0,0 +1,375 @@
+"""
+Subtítulos en vivo: archivo SRT/WebVTT incremental y feed local para overlays
+Cada traducción confirmada se escribe como un cue con tiempos relativos al
+inicio de la sesión (del audio del chunk) y se publica por Server-Sent
+Events en http://127.0.0.1:<puerto>/events. En / se sirve una página de
+overlay mínima (fondo transparente, para OBS u otro navegador) que
+consume el feed y confirma cada cue mostrado, para medir la latencia de
+entrega de punta a punta.
+
+Uso:
+    sink = SubtitleSink("sesion.vtt", port=8765)
+    sink.emit("Hello everyone", start=12.0, end=15.0)
+"""
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+
+SUBTITLE_FORMATS = ("srt", "vtt")
+
+OVERLAY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Subtítulos</title>
+<style>
+  html, body { margin: 0; height: 100%; background: transparent; overflow: hidden; }
+  #cue { position: absolute; bottom: 6%; width: 100%; text-align: center;
+         font: bold 42px 'Segoe UI', sans-serif; color: #fff;
+         text-shadow: 0 0 6px #000, 2px 2px 4px #000; transition: opacity 0.4s; }
+</style>
+</head>
+<body>
+<div id="cue"></div>
+<script>
+  const cue = document.getElementById('cue');
+  let hideTimer = null;
+  const source = new EventSource('/events');
+  source.addEventListener('subtitle', (event) => {
+    const data = JSON.parse(event.data);
+    cue.textContent = data.text;
+    cue.style.opacity = 1;
+    clearTimeout(hideTimer);
+    hideTimer = setTimeout(() => { cue.style.opacity = 0; }, Math.max(3000, data.duration * 1000 + 2000));
+    requestAnimationFrame(() => fetch('/ack?id=' + data.id, {method: 'POST'}));
+  });
+</script>
+</body>
+</html>
+"""
+
+
+def format_timestamp(seconds, fmt="srt"):
+    """
+    Segundos -> marca de tiempo de subtítulo.
+
+    Args:
+        seconds: Tiempo en segundos
+        fmt: "srt" (HH:MM:SS,mmm) o "vtt" (HH:MM:SS.mmm)
+
+    Returns:
+        String con la marca de tiempo
+    """
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    separator = "," if fmt == "srt" else "."
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class SubtitleWriter:
+    """Escritor incremental de SRT/WebVTT (cada cue queda en disco al escribirlo)"""
+
+    def __init__(self, path, fmt=None):
+        """
+        Abre el archivo (lo sobrescribe).
+
+        Args:
+            path: Archivo de salida
+            fmt: "srt" o "vtt" (None = según la extensión)
+        """
+        self.path = Path(path)
+        self.fmt = fmt or self.path.suffix.lstrip(".").lower()
+        if self.fmt not in SUBTITLE_FORMATS:
+            raise ValueError(f"Formato de subtítulos no soportado: {self.fmt} (usa .srt o .vtt)")
+
+        self._file = open(self.path, 'w', encoding='utf-8')
+        if self.fmt == "vtt":
+            self._file.write("WEBVTT\n\n")
+            self._file.flush()
+        self.cues = 0
+        self.last_end = 0.0
+        self._lock = threading.Lock()
+
+    def write_cue(self, start, end, text):
+        """
+        Agrega un cue.
+
+        Con overlap entre chunks los intervalos se solapan; el inicio se
+        recorta al fin del cue anterior para que los reproductores no
+        muestren dos líneas a la vez.
+
+        Args:
+            start: Inicio en segundos
+            end: Fin en segundos
+            text: Texto del cue
+        """
+        with self._lock:
+            start = max(start, self.last_end)
+            end = max(end, start + 0.5)
+            self.cues += 1
+            self.last_end = end
+
+            if self.fmt == "srt":
+                self._file.write(f"{self.cues}\n")
+            self._file.write(f"{format_timestamp(start, self.fmt)} --> {format_timestamp(end, self.fmt)}\n"
+                             f"{text}\n\n")
+            self._file.flush()
+            return start, end
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class SubtitleFeedServer:
+    """
+    Servidor HTTP local con el feed SSE (/events), la página de overlay (/)
+    y el endpoint de confirmación de cues mostrados (/ack).
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, on_ack=None):
+        """
+        Args:
+            host: Interfaz (localhost por defecto)
+            port: Puerto TCP
+            on_ack: Función llamada con el ID de cada cue confirmado por un overlay
+        """
+        self.host = host
+        self.port = port
+        self.on_ack = on_ack
+        self.on_sent = None  # Función (cue_id) llamada al terminar de enviar un cue a un cliente
+
+        self._clients = set()
+        self._clients_lock = threading.Lock()
+        self._last_event = None
+        self._server = None
+        self._stopped = threading.Event()
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def publish(self, cue_id, payload):
+        """
+        Envía un evento a todos los clientes conectados.
+
+        Args:
+            cue_id: ID del cue
+            payload: dict serializable a JSON
+        """
+        event = (cue_id, f"id: {cue_id}\nevent: subtitle\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n")
+        self._last_event = event
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.put(event)
+
+    def start(self):
+        """Arranca el servidor en un thread daemon (no bloquea)"""
+        feed = self
+        self._stopped.clear()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/events":
+                    self._stream_events()
+                elif path in ("/", "/overlay"):
+                    body = OVERLAY_PAGE.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                if parsed.path != "/ack":
+                    self.send_error(404)
+                    return
+                cue_id = parse_qs(parsed.query).get("id", [None])[0]
+                if cue_id and cue_id.isdigit() and feed.on_ack:
+                    feed.on_ack(int(cue_id))
+                self.send_response(204)
+                self.end_headers()
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+
+                client = queue.Queue()
+                with feed._clients_lock:
+                    feed._clients.add(client)
+                    if feed._stopped.is_set():
+                        client.put(None)  # Conectó mientras se detenía el servidor
+                try:
+                    # Al conectarse, mostrar el último subtítulo
+                    if feed._last_event:
+                        self.wfile.write(feed._last_event[1].encode("utf-8"))
+                        self.wfile.flush()
+                    while True:
+                        try:
+                            item = client.get(timeout=15)
+                        except queue.Empty:
+                            self.wfile.write(b": keepalive\n\n")
+                            self.wfile.flush()
+                            continue
+                        if item is None:
+                            break  # Servidor detenido: cerrar el stream (el overlay se reconecta)
+                        cue_id, event = item
+                        self.wfile.write(event.encode("utf-8"))
+                        self.wfile.flush()
+                        if feed.on_sent:
+                            feed.on_sent(cue_id)
+                except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                    pass
+                finally:
+                    with feed._clients_lock:
+                        feed._clients.discard(client)
+
+            def log_message(self, format, *args):
+                pass  # Sin logs por cada request
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, name="subtitle-feed", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el servidor y cierra los streams de los clientes conectados"""
+        if self._server:
+            self._server.shutdown()
+            with self._clients_lock:
+                self._stopped.set()
+                for client in self._clients:
+                    client.put(None)
+            self._server.server_close()
+            self._server = None
+
+
+class SubtitleSink:
+    """
+    Salida de subtítulos del traductor: archivo y/o feed en vivo, con
+    medición de la latencia de entrega.
+
+    Latencias medidas (desde que Whisper produjo el texto):
+        - sent: hasta terminar de escribir el evento a un cliente SSE
+        - displayed: hasta que el overlay confirma que lo mostró (/ack)
+    """
+
+    def __init__(self, path=None, port=None, host="127.0.0.1", registry=None, max_pending=1000):
+        """
+        Args:
+            path: Archivo .srt/.vtt o None
+            port: Puerto del feed SSE/overlay o None
+            host: Interfaz del feed
+            registry: MetricsRegistry donde registrar histogramas de entrega (opcional)
+            max_pending: Cues recientes cuyo timestamp se recuerda para medir /ack
+        """
+        self.writer = SubtitleWriter(path) if path else None
+        self.feed = None
+        if port:
+            self.feed = SubtitleFeedServer(host, port, on_ack=self._on_ack)
+            self.feed.on_sent = self._on_sent
+            self.feed.start()
+
+        self._produced_at = OrderedDict()  # cue_id -> perf_counter del texto
+        self._lock = threading.Lock()
+        self.max_pending = max_pending
+        self.cue_ids = 0
+        self.latencies = {"sent": deque(maxlen=10000), "displayed": deque(maxlen=10000)}
+
+        self._histograms = {}
+        if registry is not None:
+            for stage in self.latencies:
+                self._histograms[stage] = registry.histogram(
+                    "translator_subtitle_delivery_seconds",
+                    "Latencia desde el texto hasta la entrega del subtítulo", {"stage": stage}
+                )
+
+    @property
+    def url(self):
+        """URL de la página de overlay (o None sin feed)"""
+        if self.feed is None:
+            return None
+        return f"http://{self.feed.host}:{self.feed.port}/"
+
+    def emit(self, text, start, end, produced_at=None):
+        """
+        Publica un subtítulo.
+
+        Args:
+            text: Texto traducido
+            start: Inicio del audio en segundos desde el comienzo de la sesión
+            end: Fin del audio en segundos desde el comienzo de la sesión
+            produced_at: perf_counter en que Whisper devolvió el texto (None = ahora)
+        """
+        produced_at = time.perf_counter() if produced_at is None else produced_at
+
+        if self.writer:
+            start, end = self.writer.write_cue(start, end, text)
+
+        if self.feed:
+            with self._lock:
+                self.cue_ids += 1
+                cue_id = self.cue_ids
+                self._produced_at[cue_id] = produced_at
+                while len(self._produced_at) > self.max_pending:
+                    self._produced_at.popitem(last=False)
+            self.feed.publish(cue_id, {"id": cue_id, "text": text, "start": round(start, 3),
+                                       "end": round(end, 3), "duration": round(end - start, 3)})
+
+    def _record(self, stage, cue_id):
+        with self._lock:
+            produced_at = self._produced_at.get(cue_id)
+        if produced_at is None:
+            return
+        latency = time.perf_counter() - produced_at
+        self.latencies[stage].append(latency)
+        if stage in self._histograms:
+            self._histograms[stage].observe(latency)
+
+    def _on_sent(self, cue_id):
+        self._record("sent", cue_id)
+
+    def _on_ack(self, cue_id):
+        self._record("displayed", cue_id)
+
+    def get_summary(self):
+        """
+        Resumen de la salida de subtítulos.
+
+        Returns:
+            String con cues escritos y latencias p50/p90 de entrega
+        """
+        parts = []
+        if self.writer:
+            parts.append(f"{self.writer.cues} cues en {self.writer.path}")
+        if self.feed:
+            parts.append(f"feed {self.url} ({self.feed.client_count} cliente(s))")
+            for stage, values in self.latencies.items():
+                if values:
+                    p50, p90 = np.percentile(list(values), [50, 90]) * 1000
+                    parts.append(f"{stage} p50 {p50:.0f}ms / p90 {p90:.0f}ms")
+        return "Subtítulos: " + " | ".join(parts)
+
+    def close(self):
+        """Cierra el archivo y detiene el feed"""
+        if self.writer:
+            self.writer.close()
+        if self.feed:
+            self.feed.stop()
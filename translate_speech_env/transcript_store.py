@@ -0,0 +1,338 @@
+"""
+Almacén persistente de transcripciones (SQLite + búsqueda de texto completo)
+Cada traducción confirmada se guarda con su sesión, perfil, modelo,
+tiempos, latencia y confianza. Las escrituras se agrupan en un thread en
+segundo plano para no frenar al worker de Whisper, y un índice FTS5
+permite buscar lo que se dijo en sesiones anteriores sin volver a
+procesar el audio.
+
+Uso:
+    python transcript_store.py sessions
+    python transcript_store.py search "presupuesto"
+    python transcript_store.py export 12 --format srt --output sesion12.srt
+"""
+import argparse
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from subtitle_output import format_timestamp
+
+EXPORT_FORMATS = ("txt", "srt", "jsonl")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    profile TEXT,
+    model TEXT,
+    language TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS translations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    created_at REAL NOT NULL,
+    start_offset REAL,
+    end_offset REAL,
+    chunk_id INTEGER,
+    language TEXT,
+    text TEXT NOT NULL,
+    latency REAL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS translations_session ON translations(session_id, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts USING fts5(
+    text, content='translations', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS translations_ai AFTER INSERT ON translations BEGIN
+    INSERT INTO translations_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS translations_ad AFTER DELETE ON translations BEGIN
+    INSERT INTO translations_fts(translations_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+TRANSLATION_COLUMNS = ("session_id", "created_at", "start_offset", "end_offset", "chunk_id",
+                       "language", "text", "latency", "confidence")
+
+
+def get_default_transcript_db_path():
+    """
+    Retorna ruta por defecto de la base de transcripciones.
+
+    Returns:
+        Path al archivo SQLite
+    """
+    transcripts_dir = Path(__file__).parent / "transcripts"
+    transcripts_dir.mkdir(exist_ok=True)
+    return transcripts_dir / "transcripts.db"
+
+
+class TranscriptStore:
+    """
+    Base SQLite de transcripciones con escritura por lotes.
+
+    add_translation() solo encola; un thread daemon inserta lo pendiente
+    en una transacción cada flush_interval segundos (o al juntar
+    batch_size filas). Las consultas usan su propia conexión.
+    """
+
+    def __init__(self, db_path=None, batch_size=100, flush_interval=0.5):
+        """
+        Abre (o crea) la base.
+
+        Args:
+            db_path: Archivo SQLite (None = transcripts/transcripts.db)
+            batch_size: Filas máximas por transacción
+            flush_interval: Segundos máximos que una fila espera en memoria
+        """
+        self.db_path = str(db_path or get_default_transcript_db_path())
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.commit()
+        self._conn_lock = threading.Lock()
+
+        self._pending = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()  # Un solo thread escritor aunque escriban varios threads
+        self._stop = threading.Event()
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stop.clear()
+                self._writer = threading.Thread(target=self._writer_loop, name="transcript-writer",
+                                                daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        while not self._stop.is_set() or not self._pending.empty():
+            try:
+                rows = [self._pending.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._write_rows(rows)
+
+    def _write_rows(self, rows):
+        placeholders = ", ".join("?" * len(TRANSLATION_COLUMNS))
+        try:
+            with self._conn_lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO translations ({', '.join(TRANSLATION_COLUMNS)}) VALUES ({placeholders})",
+                    rows
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  No se pudieron guardar {len(rows)} traducciones: {e}")
+        finally:
+            for _ in rows:
+                self._pending.task_done()
+
+    def start_session(self, profile=None, model=None, language=None, source=None):
+        """
+        Registra una sesión nueva.
+
+        Args:
+            profile: Nombre del perfil de voz
+            model: Modelo Whisper
+            language: Idioma de origen
+            source: Descripción de la fuente de audio
+
+        Returns:
+            ID de la sesión
+        """
+        with self._conn_lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (started_at, profile, model, language, source) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), profile, model, language, source)
+            )
+        self._ensure_writer()
+        return cursor.lastrowid
+
+    def end_session(self, session_id):
+        """Marca el fin de una sesión (escribe antes lo pendiente)"""
+        self.flush()
+        with self._conn_lock, self._conn:
+            self._conn.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", (time.time(), session_id))
+
+    def add_translation(self, session_id, text, start_offset=None, end_offset=None, chunk_id=None,
+                        language=None, latency=None, confidence=None):
+        """
+        Encola una traducción confirmada (no bloquea).
+
+        Args:
+            session_id: ID de start_session()
+            text: Texto traducido
+            start_offset: Inicio del audio en segundos desde el comienzo de la sesión
+            end_offset: Fin del audio en segundos desde el comienzo de la sesión
+            chunk_id: ID del chunk en el traductor
+            language: Idioma de origen del chunk
+            latency: Segundos desde el fin del audio hasta el texto
+            confidence: Confianza de Whisper (0-1) o None
+        """
+        self._pending.put((session_id, time.time(), start_offset, end_offset, chunk_id,
+                           language, text, latency, confidence))
+        self._ensure_writer()
+
+    def flush(self):
+        """Espera a que se escriban las traducciones encoladas"""
+        if self._writer is not None and self._writer.is_alive():
+            self._pending.join()
+
+    def close(self):
+        """Escribe lo pendiente y cierra la base"""
+        with self._writer_lock:
+            self._stop.set()
+            writer = self._writer
+        if writer is not None:
+            writer.join()
+        self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._conn_lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def list_sessions(self, limit=50):
+        """
+        Sesiones más recientes con su número de traducciones.
+
+        Returns:
+            Lista de dicts
+        """
+        return self._query(
+            "SELECT s.*, COUNT(t.id) AS translations FROM sessions s "
+            "LEFT JOIN translations t ON t.session_id = s.id "
+            "GROUP BY s.id ORDER BY s.id DESC LIMIT ?", (limit,)
+        )
+
+    def get_translations(self, session_id):
+        """
+        Traducciones de una sesión en orden.
+
+        Returns:
+            Lista de dicts (columnas de translations)
+        """
+        return self._query("SELECT * FROM translations WHERE session_id = ? ORDER BY id", (session_id,))
+
+    def search(self, query, session_id=None, limit=50):
+        """
+        Búsqueda de texto completo (sintaxis FTS5: palabras, "frases", prefijo*).
+
+        Args:
+            query: Texto a buscar
+            session_id: Limitar a una sesión (None = todas)
+            limit: Resultados máximos
+
+        Returns:
+            Lista de dicts con la traducción, su sesión y un fragmento resaltado
+        """
+        sql = ("SELECT t.*, s.profile, s.model, snippet(translations_fts, 0, '[', ']', '…', 12) AS snippet "
+               "FROM translations_fts JOIN translations t ON t.id = translations_fts.rowid "
+               "JOIN sessions s ON s.id = t.session_id WHERE translations_fts MATCH ?")
+        params = [query]
+        if session_id is not None:
+            sql += " AND t.session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def export(self, session_id, path, fmt="txt"):
+        """
+        Exporta una sesión.
+
+        Args:
+            session_id: ID de la sesión
+            path: Archivo de salida
+            fmt: "txt", "srt" o "jsonl"
+
+        Returns:
+            Número de traducciones exportadas
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt} (usa {', '.join(EXPORT_FORMATS)})")
+
+        self.flush()
+        rows = self.get_translations(session_id)
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == "jsonl":
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            elif fmt == "srt":
+                for i, row in enumerate(rows, 1):
+                    start = row["start_offset"] or 0.0
+                    end = row["end_offset"] if row["end_offset"] is not None else start + 3.0
+                    f.write(f"{i}\n{format_timestamp(start, 'srt')} --> {format_timestamp(end, 'srt')}\n{row['text']}\n\n")
+            else:
+                for row in rows:
+                    stamp = datetime.fromtimestamp(row["created_at"]).strftime('%H:%M:%S')
+                    f.write(f"[{stamp}] {row['text']}\n")
+        return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buscar y exportar transcripciones guardadas")
+    parser.add_argument("--db", help="Base SQLite (default: transcripts/transcripts.db)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sessions_parser = subparsers.add_parser("sessions", help="Listar sesiones")
+    sessions_parser.add_argument("--limit", type=int, default=20)
+
+    search_parser = subparsers.add_parser("search", help="Buscar texto en las traducciones")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--session", type=int, help="Limitar a una sesión")
+    search_parser.add_argument("--limit", type=int, default=50)
+
+    export_parser = subparsers.add_parser("export", help="Exportar una sesión")
+    export_parser.add_argument("session", type=int)
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="txt")
+    export_parser.add_argument("--output", help="Archivo de salida (default: sesion_<id>.<formato>)")
+    args = parser.parse_args()
+
+    store = TranscriptStore(args.db)
+    try:
+        if args.command == "sessions":
+            for s in store.list_sessions(args.limit):
+                started = datetime.fromtimestamp(s["started_at"]).strftime('%Y-%m-%d %H:%M')
+                print(f"#{s['id']:<5} {started}  {s['translations']:>5} traducciones  "
+                      f"perfil={s['profile'] or '-'}  modelo={s['model'] or '-'}")
+
+        elif args.command == "search":
+            try:
+                results = store.search(args.query, args.session, args.limit)
+            except sqlite3.OperationalError as e:
+                print(f"❌ Búsqueda inválida: {e}")
+                sys.exit(1)
+            for r in results:
+                stamp = datetime.fromtimestamp(r["created_at"]).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"#{r['session_id']:<5} {stamp}  {r['snippet']}")
+            print(f"\n{len(results)} resultado(s)")
+
+        else:
+            output = args.output or f"sesion_{args.session}.{args.format}"
+            count = store.export(args.session, output, args.format)
+            print(f"✅ {count} traducciones exportadas a {output}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Transcripción acotada para sesiones largas
+La GUI solo mantiene en el widget de texto una ventana de las últimas
+líneas; todas las líneas se escriben en un log de sesión en disco (JSONL)
+y las anteriores se vuelven a cargar al hacer scroll hacia arriba. Así la
+memoria y el costo de cada inserción no crecen con la duración de la sesión.
+"""
+import json
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+
+def get_default_transcripts_dir():
+    """
+    Retorna el directorio por defecto de los logs de sesión.
+
+    Returns:
+        Path al directorio (se crea si no existe)
+    """
+    transcripts_dir = Path(__file__).parent / "transcripts"
+    transcripts_dir.mkdir(exist_ok=True)
+    return transcripts_dir
+
+
+class TranscriptLog:
+    """Log de sesión append-only con acceso por número de línea"""
+
+    def __init__(self, path):
+        """
+        Abre (o crea) el log.
+
+        Args:
+            path: Archivo JSONL de la sesión
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        self._offsets = array('q')  # Offset en bytes de cada línea (8 bytes por línea)
+
+        # Indexar líneas existentes (sesión reabierta)
+        self._file.seek(0)
+        offset = 0
+        for raw in self._file:
+            self._offsets.append(offset)
+            offset += len(raw)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def append(self, text, tag=None):
+        """
+        Agrega una línea al final del log.
+
+        Args:
+            text: Texto de la línea
+            tag: Tag de estilo del widget (o None)
+        """
+        self._file.seek(0, 2)
+        self._offsets.append(self._file.tell())
+        record = {"time": datetime.now().isoformat(timespec='seconds'), "text": text, "tag": tag}
+        self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._file.flush()
+
+    def read(self, start, end):
+        """
+        Lee un rango de líneas.
+
+        Args:
+            start: Índice de la primera línea
+            end: Índice de fin (exclusivo)
+
+        Returns:
+            Lista de (text, tag)
+        """
+        start, end = max(0, start), min(end, len(self._offsets))
+        if start >= end:
+            return []
+
+        self._file.seek(self._offsets[start])
+        lines = []
+        for _ in range(end - start):
+            record = json.loads(self._file.readline())
+            lines.append((record["text"], record["tag"]))
+        return lines
+
+    def close(self):
+        self._file.close()
+
+
+class TranscriptView:
+    """
+    Ventana acotada de un TranscriptLog sobre un widget Text.
+
+    Las líneas nuevas se insertan por lotes (como máximo una vez cada
+    flush_interval_ms). Mientras el usuario está al final, la vista sigue
+    las líneas nuevas y descarta las más viejas del widget; si sube hasta
+    el principio de la ventana se cargan páginas anteriores desde el log,
+    y al volver al final se cargan las posteriores.
+    """
+
+    def __init__(self, text_widget, max_lines=500, page_lines=200, flush_interval_ms=50):
+        """
+        Args:
+            text_widget: Widget Text/ScrolledText (en estado 'disabled')
+            max_lines: Líneas máximas dentro del widget
+            page_lines: Líneas cargadas del log por cada scroll al borde
+            flush_interval_ms: Demora máxima antes de insertar un lote
+        """
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.page_lines = min(page_lines, max_lines)
+        self.flush_interval_ms = flush_interval_ms
+
+        self.log = None
+        self.first_index = 0   # Línea del log que está en la primera fila del widget
+        self.last_index = 0    # Línea del log siguiente a la última del widget
+        self.following = True  # La vista sigue las líneas nuevas
+        self._pending = 0
+        self._flush_scheduled = False
+        self._edge_check_scheduled = False
+        self.partial_text = None  # Línea provisional al final (no va al log)
+
+        # Interceptar el scroll para detectar los bordes de la ventana
+        scrollbar = getattr(text_widget, 'vbar', None)  # ScrolledText
+        self._scrollbar_set = scrollbar.set if scrollbar else None
+        self.text.config(yscrollcommand=self._on_yscroll)
+
+    def start_session(self, path=None):
+        """
+        Empieza un log de sesión nuevo y limpia el widget.
+
+        Args:
+            path: Archivo del log (None = transcripts/session_<fecha>.jsonl)
+        """
+        if self.log:
+            self.log.close()
+        if path is None:
+            path = get_default_transcripts_dir() / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.log = TranscriptLog(path)
+
+        self.partial_text = None
+        self._set_lines([], 0)
+        self.following = True
+        self._pending = 0
+        return self.log.path
+
+    def append(self, text, tag=None):
+        """
+        Agrega una línea (llamar desde el thread de Tk).
+
+        Args:
+            text: Texto de la línea
+            tag: Tag de estilo (o None)
+        """
+        if self.log is None:
+            self.start_session()
+        self.log.append(text, tag)
+        self._pending += 1
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.text.after(self.flush_interval_ms, self._flush)
+
+    def set_partial(self, text):
+        """
+        Muestra (o reemplaza) la línea provisional al final del widget.
+
+        Args:
+            text: Texto provisional (None = quitar la línea)
+        """
+        self.partial_text = text
+        self.text.config(state='normal')
+        self._remove_partial()
+        self._show_partial()
+        self.text.config(state='disabled')
+        if self.following and text:
+            self.text.see('end')
+
+    def _remove_partial(self):
+        ranges = self.text.tag_ranges('partial')
+        if ranges:
+            self.text.delete(ranges[0], ranges[-1])
+
+    def _show_partial(self):
+        if self.partial_text and self.following:
+            self.text.insert('end', self.partial_text + '\n', 'partial')
+
+    def close(self):
+        """Cierra el log de sesión"""
+        if self.log:
+            self.log.close()
+            self.log = None
+
+    def _insert(self, index, lines):
+        """Inserta varias líneas con una sola llamada a Tk"""
+        args = []
+        for text, tag in lines:
+            args.extend((text + '\n', tag or ()))
+        if args:
+            self.text.insert(index, *args)
+
+    def _set_lines(self, lines, first_index):
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+        self._insert('end', lines)
+        self.text.config(state='disabled')
+        self.first_index = first_index
+        self.last_index = first_index + len(lines)
+
+    def _flush(self):
+        """Inserta el lote pendiente (solo si la vista sigue el final)"""
+        self._flush_scheduled = False
+        if self.log is None or not self.following or not self._pending:
+            return
+
+        new_lines = self.log.read(self.last_index, len(self.log))
+        self._pending = 0
+
+        self.text.config(state='normal')
+        self._remove_partial()
+        self._insert('end', new_lines)
+        self.last_index += len(new_lines)
+        self._trim_top()
+        self._show_partial()
+        self.text.config(state='disabled')
+        self.text.see('end')
+
+    def _trim_top(self):
+        excess = (self.last_index - self.first_index) - self.max_lines
+        if excess > 0:
+            self.text.delete('1.0', f'{excess + 1}.0')
+            self.first_index += excess
+        return max(0, excess)
+
+    def _trim_bottom(self):
+        excess = (self.last_index - self.first_index) - self.max_lines
+        if excess > 0:
+            self.text.delete(f'{self.max_lines + 1}.0', 'end')
+            self.last_index -= excess
+        return max(0, excess)
+
+    def _on_yscroll(self, first, last):
+        if self._scrollbar_set:
+            self._scrollbar_set(first, last)
+        if not self._edge_check_scheduled:
+            self._edge_check_scheduled = True
+            self.text.after_idle(self._check_edges)
+
+    def _check_edges(self):
+        """Carga páginas del log al llegar a un borde de la ventana"""
+        self._edge_check_scheduled = False
+        if self.log is None:
+            return
+
+        top, bottom = self.text.yview()
+        at_end = bottom >= 0.999
+        has_newer = self.last_index < len(self.log)
+
+        if top <= 0.0 and self.first_index > 0:
+            self._load_older()
+        elif at_end and has_newer:
+            self._load_newer()
+        else:
+            self.following = at_end and not has_newer
+
+    def _load_older(self):
+        count = min(self.page_lines, self.first_index)
+        lines = self.log.read(self.first_index - count, self.first_index)
+
+        self.text.config(state='normal')
+        self._remove_partial()
+        self._insert('1.0', lines)
+        self.first_index -= count
+        self._trim_bottom()
+        self.text.config(state='disabled')
+
+        # Mantener a la vista la línea que estaba arriba
+        self.text.yview(f'{count + 1}.0')
+        self.following = False
+
+    def _load_newer(self):
+        count = min(self.page_lines, len(self.log) - self.last_index)
+        lines = self.log.read(self.last_index, self.last_index + count)
+        previous_last_line = self.last_index - self.first_index
+
+        self.text.config(state='normal')
+        self._remove_partial()
+        self._insert('end', lines)
+        self.last_index += count
+        removed = self._trim_top()
+        self.text.config(state='disabled')
+
+        # Mantener a la vista la línea que estaba al final
+        self.text.see(f'{max(1, previous_last_line - removed)}.0')
+        self.following = self.last_index >= len(self.log)
+        if self.following:
+            self.set_partial(self.partial_text)
+            self.text.see('end')
@@ -2,13 +2,35 @@ import whisper
 import pyttsx3
 import os
 import sys
+import argparse
+import time
 import numpy as np
 import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from audio_stream import get_audio_duration, stream_audio_file
 
-# Cargar modelo Whisper para transcripción
-print("Cargando modelo Whisper...")
-model = whisper.load_model("base")
-print("Modelo Whisper cargado.")
+SAMPLE_RATE = 16000
+MAX_SEGMENT_SECONDS = 30  # Una ventana de Whisper por segmento
+
+# Modelos Whisper cargados (se cargan al primer uso; en el pool, uno por proceso)
+_models = {}
+
+
+def get_model(model_size="base"):
+    """
+    Retorna el modelo Whisper, cargándolo la primera vez.
+
+    Args:
+        model_size: Tamaño del modelo (tiny, base, small, medium, large)
+
+    Returns:
+        Modelo Whisper
+    """
+    if model_size not in _models:
+        print(f"Cargando modelo Whisper '{model_size}'...")
+        _models[model_size] = whisper.load_model(model_size)
+        print("Modelo Whisper cargado.")
+    return _models[model_size]
 
 def list_files_of_audios(directory):
     """Lista todos los archivos de audio en el directorio"""
@@ -26,55 +48,34 @@ def list_files_of_audios(directory):
         print(f"Error listando archivos: {e}")
         return []
 
-def load_audio_with_soundfile(file_path):
-    """
-    Carga audio usando soundfile en lugar de FFmpeg.
-    Retorna audio en el formato esperado por Whisper (16kHz, mono, float32).
-    """
-    try:
-        # Leer el archivo de audio
-        audio, sample_rate = sf.read(file_path, dtype='float32')
-
-        # Convertir a mono si es estéreo
-        if len(audio.shape) > 1:
-            audio = audio.mean(axis=1)
-
-        # Resamplear a 16kHz si es necesario
-        if sample_rate != 16000:
-            print(f"Nota: Remuestreando de {sample_rate}Hz a 16000Hz...")
-            # Remuestreo simple usando interpolación lineal
-            duration = len(audio) / sample_rate
-            new_length = int(duration * 16000)
-            audio = np.interp(
-                np.linspace(0, len(audio), new_length),
-                np.arange(len(audio)),
-                audio
-            )
-
-        return audio
-    except Exception as e:
-        print(f"Error cargando audio con soundfile: {e}")
-        raise
-
 # Función para transcribir audio a texto
 def transcribe_and_translate(file_audio):
     print("Transcribiendo y traduciendo audio...")
 
     try:
-        # Cargar audio usando soundfile (sin necesidad de FFmpeg)
+        # Leer el archivo por bloques (soundfile, sin FFmpeg) y traducir segmento a segmento:
+        # la memoria no depende de la duración de la grabación
         print("Procesando archivo de audio...")
-        audio_data = load_audio_with_soundfile(file_audio)
-
-        # Transcribir el audio a inglés
-        result = model.transcribe(
-            audio_data,
-            task='translate',  # Traducir a inglés
-            language='es',     # Idioma fuente: español
-            fp16=False,        # Desactivar FP16 para compatibilidad CPU
-            verbose=False      # Reducir output de Whisper
-        )
+        sample_rate = sf.info(file_audio).samplerate
+        if sample_rate != SAMPLE_RATE:
+            print(f"Nota: Remuestreando de {sample_rate}Hz a {SAMPLE_RATE}Hz...")
+
+        texts = []
+        for _, segment_audio in iter_silence_segments(stream_audio_file(file_audio, SAMPLE_RATE)):
+            # Transcribir el segmento a inglés
+            result = get_model().transcribe(
+                segment_audio,
+                task='translate',  # Traducir a inglés
+                language='es',     # Idioma fuente: español
+                fp16=False,        # Desactivar FP16 para compatibilidad CPU
+                verbose=False,     # Reducir output de Whisper
+                condition_on_previous_text=False
+            )
+            text = result.get('text', '').strip()
+            if text:
+                texts.append(text)
 
-        original_text = result.get('text', '').strip()
+        original_text = " ".join(texts)
 
         if original_text:
             print(f"\nTexto transcrito y traducido: {original_text}\n")
@@ -91,6 +92,246 @@ def transcribe_and_translate(file_audio):
         print(traceback.format_exc())
         return None
 
+def iter_silence_segments(blocks, sample_rate=SAMPLE_RATE, max_segment_seconds=MAX_SEGMENT_SECONDS,
+                          max_region_windows=4):
+    """
+    Divide un stream de audio en segmentos cortados en silencios (Silero VAD).
+
+    Se acumula audio hasta max_segment_seconds y se corta en el medio del
+    último silencio de esa ventana. Si la voz ocupa toda la ventana, se
+    sigue leyendo (hasta max_region_windows ventanas) hasta encontrar el
+    fin de la región, que se corta en trozos iguales; una región más larga
+    que eso se corta en trozos iguales al final de la ventana ampliada.
+    Lo que sigue al corte pasa al próximo segmento, así que la memoria no
+    depende de la duración de la grabación. Las ventanas sin voz se descartan.
+
+    Args:
+        blocks: Iterable de arrays float32 mono (ej: stream_audio_file)
+        sample_rate: Frecuencia de muestreo
+        max_segment_seconds: Duración máxima de cada segmento
+        max_region_windows: Ventanas máximas que se leen buscando el fin de una región de voz
+
+    Yields:
+        (offset en muestras, audio del segmento), en orden
+    """
+    import torch
+    from silero_vad import load_silero_vad, get_speech_timestamps
+
+    vad_model = load_silero_vad()
+    max_samples = int(max_segment_seconds * sample_rate)
+    max_region_samples = max_samples * max_region_windows
+    margin = sample_rate  # Audio que se conserva al descartar silencio (voz que empieza en el borde)
+
+    def speech_regions(audio):
+        return get_speech_timestamps(torch.from_numpy(audio), vad_model, sampling_rate=sample_rate)
+
+    def next_cut(pending, final):
+        """
+        Próximos segmentos de pending (len >= max_samples).
+
+        Returns:
+            ([(inicio, fin)], muestras consumidas) o None si hace falta más audio
+        """
+        window = pending[:max_samples]
+        speech = speech_regions(window)
+        if not speech:
+            return [], max_samples - margin
+
+        # Cortes posibles: medio de cada silencio entre regiones de voz y del silencio final
+        cuts = [(a["end"] + b["start"]) // 2 for a, b in zip(speech, speech[1:])]
+        if speech[-1]["end"] < max_samples - margin // 4:
+            cuts.append((speech[-1]["end"] + max_samples) // 2)
+        if cuts:
+            cut = max(cuts)
+            return [(0, cut)], cut
+
+        # Voz continua en toda la ventana: buscar el fin de la región
+        if len(pending) < max_region_samples and not final:
+            return None
+        scan = pending[:max_region_samples]
+        speech = speech_regions(scan)
+        region_end = speech[0]["end"] if speech else len(scan)
+        if len(speech) > 1:
+            cut = (region_end + speech[1]["start"]) // 2
+        elif region_end < len(scan) - margin // 4:
+            cut = (region_end + len(scan)) // 2
+        else:
+            cut = len(scan)  # La región sigue: corte al final de la ventana ampliada
+
+        pieces = int(np.ceil(cut / max_samples))
+        bounds = np.linspace(0, cut, pieces + 1).astype(int)
+        return list(zip(bounds[:-1], bounds[1:])), cut
+
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0  # Posición absoluta de pending[0]
+
+    def consume(final):
+        nonlocal pending, offset
+        while len(pending) >= max_samples:
+            step = next_cut(pending, final)
+            if step is None:
+                return
+            segments, consumed = step
+            for start, end in segments:
+                yield offset + start, pending[start:end].copy()
+            pending = pending[consumed:]
+            offset += consumed
+
+    for block in blocks:
+        pending = np.concatenate([pending, block])
+        yield from consume(final=False)
+
+    yield from consume(final=True)
+    if len(pending) and speech_regions(pending):
+        yield offset, pending
+
+
+def _init_segment_worker(model_size, num_threads):
+    """Inicializa un proceso del pool: carga el modelo una sola vez"""
+    import torch
+    torch.set_num_threads(num_threads)
+    get_model(model_size)
+
+
+def _translate_segment(index, segment_audio, offset_seconds, model_size, language):
+    """
+    Traduce un segmento (se ejecuta en un proceso del pool).
+
+    Returns:
+        Tupla (index, lista de segmentos de Whisper con tiempos absolutos, error o None)
+    """
+    try:
+        result = get_model(model_size).transcribe(
+            segment_audio,
+            task='translate',
+            language=language,
+            fp16=False,
+            verbose=None,
+            condition_on_previous_text=False
+        )
+        segments = [
+            {"start": offset_seconds + seg["start"], "end": offset_seconds + seg["end"],
+             "text": seg["text"].strip()}
+            for seg in result.get("segments", []) if seg["text"].strip()
+        ]
+        return index, segments, None
+    except Exception as e:
+        return index, [], f"segmento {index}: {e}"
+
+
+def create_segment_pool(model_size="base", workers=None):
+    """
+    Crea el pool de procesos de traducción (cada proceso carga el modelo una vez).
+
+    Args:
+        model_size: Modelo Whisper
+        workers: Número de procesos (None = núcleos disponibles)
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    workers = workers or os.cpu_count() or 1
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_segment_worker,
+                               initargs=(model_size, num_threads))
+
+
+def translate_file_parallel(file_audio, model_size="base", language="es", workers=None,
+                            executor=None, max_in_flight=None, verbose=True):
+    """
+    Traduce una grabación larga en paralelo: la lee por bloques, la divide
+    en silencios y reparte los segmentos en un pool de procesos (cada
+    proceso carga el modelo una vez) a medida que se leen. Como máximo hay
+    2 segmentos por proceso en vuelo, así la memoria queda acotada.
+
+    Args:
+        file_audio: Ruta del archivo de audio
+        model_size: Modelo Whisper
+        language: Idioma de origen
+        workers: Número de procesos (None = núcleos disponibles)
+        executor: Pool compartido de create_segment_pool() (None = crear uno para este archivo)
+        max_in_flight: Segmentos enviados sin terminar (None = 2 por proceso)
+        verbose: Mostrar el progreso
+
+    Returns:
+        dict {"text": texto completo, "segments": [{"start", "end", "text"}, ...],
+              "errors": [segmentos que fallaron]}; con errores el texto está incompleto
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+
+    duration = get_audio_duration(file_audio)
+    if verbose:
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+        print(f"Traduciendo {duration / 60:.1f} min de audio | {workers} procesos x {num_threads} threads")
+
+    start_time = time.perf_counter()
+    by_index = {}
+    errors = []
+
+    def collect(done_futures):
+        for future in done_futures:
+            index, segments, error = future.result()
+            if error:
+                print(f"⚠️  {error}")
+                errors.append(error)
+            by_index[index] = segments
+        if verbose:
+            print(f"\r  {len(by_index)} segmentos traducidos", end="", flush=True)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = create_segment_pool(model_size, workers)
+    try:
+        in_flight = set()
+        segments_iter = iter_silence_segments(stream_audio_file(file_audio, SAMPLE_RATE))
+        for index, (offset, segment_audio) in enumerate(segments_iter):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight.add(executor.submit(_translate_segment, index, segment_audio,
+                                          offset / SAMPLE_RATE, model_size, language))
+        collect(wait(in_flight).done)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    if not by_index:
+        if verbose:
+            print("Advertencia: No se detectó voz en el audio.")
+        return {"text": "", "segments": [], "errors": errors}
+
+    if verbose:
+        elapsed = time.perf_counter() - start_time
+        print(f"\nTraducción terminada en {elapsed:.1f}s (RTF {elapsed / duration:.2f})")
+        if errors:
+            print(f"⚠️  {len(errors)} segmentos fallaron: la traducción está incompleta")
+
+    segments = [seg for index in sorted(by_index) for seg in by_index[index]]
+    return {"text": " ".join(seg["text"] for seg in segments), "segments": segments,
+            "errors": errors}
+
+
+def save_translation(result, output_path):
+    """
+    Guarda la traducción en texto plano (.txt) o subtítulos (.srt / .vtt).
+
+    Args:
+        result: Salida de translate_file_parallel()
+        output_path: Archivo de salida
+    """
+    if output_path.lower().endswith(('.srt', '.vtt')):
+        from subtitle_output import SubtitleWriter
+        writer = SubtitleWriter(output_path)
+        for seg in result["segments"]:
+            writer.write_cue(seg["start"], seg["end"], seg["text"])
+        writer.close()
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(result["text"] + "\n")
+    print(f"Traducción guardada en: {output_path}")
+
+
 # Función para convertir texto a voz
 def text_to_speech(text):
     print("Generando audio...")
@@ -121,8 +362,63 @@ def text_to_speech(text):
     except Exception as e:
         print(f"Error en TTS: {e}")
 
+def main_batch(argv):
+    """Modo por lotes (sin menú): traducción paralela de un archivo largo o de una carpeta vigilada"""
+    parser = argparse.ArgumentParser(description="Traducción de archivos largos en paralelo (Español → Inglés)")
+    parser.add_argument("file", nargs="?", help="Archivo de audio")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="Vigilar un directorio y traducir cada archivo nuevo (daemon)")
+    parser.add_argument("--formats", default="txt,srt",
+                        help="Con --watch: salidas junto a cada archivo (txt,srt,vtt; default: txt,srt)")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Con --watch: segundos entre revisiones del directorio (default: 2)")
+    parser.add_argument("--model", default="base", help="Modelo Whisper (default: base)")
+    parser.add_argument("--language", default="es", help="Idioma de origen (default: es)")
+    parser.add_argument("--workers", type=int, help="Procesos en paralelo (default: núcleos)")
+    parser.add_argument("--output", help="Guardar en .txt, .srt o .vtt")
+    parser.add_argument("--tts", action="store_true", help="Leer la traducción en voz alta al terminar")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            print(f"El directorio '{args.watch}' no existe. Saliendo.")
+            sys.exit(1)
+        from hot_folder import HotFolderDaemon
+        formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+        try:
+            daemon = HotFolderDaemon(args.watch, args.model, args.language, args.workers,
+                                     formats=formats, poll_interval=args.poll_interval)
+        except ValueError as e:
+            parser.error(str(e))
+        daemon.run()
+        return
+
+    if not args.file:
+        parser.error("indica un archivo de audio o --watch DIR")
+    if not os.path.isfile(args.file):
+        print(f"El archivo '{args.file}' no existe. Saliendo.")
+        sys.exit(1)
+
+    result = translate_file_parallel(args.file, args.model, args.language, args.workers)
+    if not result["text"]:
+        print("No se pudo obtener texto traducido.")
+        sys.exit(1)
+
+    if args.output:
+        save_translation(result, args.output)
+    else:
+        print(f"\nTexto transcrito y traducido: {result['text']}\n")
+    if args.tts:
+        text_to_speech(result["text"])
+
+
 # Funcion principal
 def main():
+    # Con argumentos: modo por lotes (paralelo); sin argumentos: menú interactivo
+    if len(sys.argv) > 1:
+        main_batch(sys.argv[1:])
+        return
+
     print("=" * 60)
     print("Bienvenido al traductor de voz (Español a Inglés)")
     print("=" * 60)
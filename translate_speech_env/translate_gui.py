@@ -7,10 +7,14 @@ from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import threading
 import queue
 from translate_realtime import RealtimeTranslator
-from voice_profile import VoiceProfile, get_default_profile_path
+from voice_profile import VoiceProfile
+from profile_store import ProfileStore
 from calibration_window import CalibrationWindow
+from translation_cache import TranslationCache, get_default_cache_path
+from transcript_store import TranscriptStore
+from ui_events import UIEventQueue
+from transcript_view import TranscriptView
 import sys
-import os
 
 
 class TranslatorGUI:
@@ -23,8 +27,10 @@ class TranslatorGUI:
         # Variables
         self.translator = None
         self.is_translating = False
-        self.output_queue = queue.Queue()
         self.voice_profile = None  # Perfil de voz del usuario
+        self.profile_store = ProfileStore()  # Índice de perfiles (voice_profiles/)
+        self.translation_cache = None  # Opcional (casilla "Historial"), se crea al primer uso
+        self.transcript_store = None   # Historial con búsqueda (transcripts/transcripts.db)
 
         # Configurar estilo
         self.setup_styles()
@@ -32,12 +38,12 @@ class TranslatorGUI:
         # Crear widgets
         self.create_widgets()
 
+        # Eventos del traductor: los threads despiertan al loop de Tk al publicar
+        self.ui_events = UIEventQueue(self.root, self.handle_ui_events)
+
         # Cargar o crear perfil al iniciar
         self.load_or_create_profile()
 
-        # Iniciar verificación de mensajes
-        self.check_output_queue()
-
     def setup_styles(self):
         """Configurar estilos visuales"""
         style = ttk.Style()
@@ -143,6 +149,56 @@ class TranslatorGUI:
                       bg='white',
                       font=('Segoe UI', 9)).pack(side='left', padx=5)
 
+        # Idioma de origen
+        tk.Label(config_frame,
+                text="Idioma:",
+                font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=2, column=0, sticky='w', pady=5)
+
+        self.language_var = tk.StringVar(value="es")
+        language_frame = tk.Frame(config_frame, bg='white')
+        language_frame.grid(row=2, column=1, sticky='w', padx=10)
+
+        tk.Radiobutton(language_frame,
+                      text="Español",
+                      variable=self.language_var,
+                      value="es",
+                      bg='white',
+                      font=('Segoe UI', 9)).pack(side='left', padx=5)
+
+        tk.Radiobutton(language_frame,
+                      text="Automático",
+                      variable=self.language_var,
+                      value="auto",
+                      bg='white',
+                      font=('Segoe UI', 9)).pack(side='left', padx=5)
+
+        # Resultados parciales (texto provisional mientras se habla)
+        tk.Label(config_frame,
+                text="Parciales:",
+                font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=3, column=0, sticky='w', pady=5)
+
+        self.partials_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame,
+                      text="Mostrar texto provisional mientras hablas",
+                      variable=self.partials_var,
+                      bg='white',
+                      font=('Segoe UI', 9)).grid(row=3, column=1, sticky='w', padx=15)
+
+        # Historial y caché de traducciones (desactivados por defecto)
+        tk.Label(config_frame,
+                text="Historial:",
+                font=('Segoe UI', 10, 'bold'),
+                bg='white').grid(row=4, column=0, sticky='w', pady=5)
+
+        self.history_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame,
+                      text="Guardar historial y usar caché de traducciones",
+                      variable=self.history_var,
+                      bg='white',
+                      font=('Segoe UI', 9)).grid(row=4, column=1, sticky='w', padx=15)
+
         # Separador
         ttk.Separator(self.root, orient='horizontal').pack(fill='x', pady=10)
 
@@ -249,6 +305,10 @@ class TranslatorGUI:
         self.output_text.tag_config('spanish', foreground='#1976D2', font=('Consolas', 10, 'bold'))
         self.output_text.tag_config('english', foreground='#388E3C', font=('Consolas', 10, 'bold'))
         self.output_text.tag_config('status', foreground='#757575', font=('Consolas', 9, 'italic'))
+        self.output_text.tag_config('partial', foreground='#9E9E9E', font=('Consolas', 10, 'italic'))
+
+        # Ventana acotada del widget; el historial completo va al log de sesión
+        self.transcript = TranscriptView(self.output_text)
 
         # Footer
         footer_frame = tk.Frame(self.root, bg='#f5f5f5', height=40)
@@ -263,14 +323,8 @@ class TranslatorGUI:
         self.stats_label.pack(pady=10)
 
     def append_output(self, text, tag=None):
-        """Agregar texto al área de salida"""
-        self.output_text.config(state='normal')
-        if tag:
-            self.output_text.insert('end', text + '\n', tag)
-        else:
-            self.output_text.insert('end', text + '\n')
-        self.output_text.see('end')
-        self.output_text.config(state='disabled')
+        """Agregar texto al área de salida (se inserta por lotes)"""
+        self.transcript.append(text, tag)
 
     def update_status(self, status, color):
         """Actualizar etiqueta de estado"""
@@ -288,15 +342,16 @@ class TranslatorGUI:
         # Obtener configuración
         push_to_talk = (self.mode_var.get() == "ptt")
         model_size = self.quality_var.get()
+        source_language = self.language_var.get()
+        partial_interval = 1.0 if self.partials_var.get() else None
+        use_history = self.history_var.get()
 
         # Deshabilitar controles
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
 
-        # Limpiar output
-        self.output_text.config(state='normal')
-        self.output_text.delete('1.0', 'end')
-        self.output_text.config(state='disabled')
+        # Limpiar output y empezar un log de sesión nuevo
+        self.transcript.start_session()
 
         # Mostrar/ocultar botón PTT
         if push_to_talk:
@@ -310,70 +365,95 @@ class TranslatorGUI:
 
         # Iniciar traductor en thread separado
         thread = threading.Thread(target=self.run_translator,
-                                 args=(model_size, push_to_talk),
+                                 args=(model_size, push_to_talk, source_language, partial_interval,
+                                       use_history),
                                  daemon=True)
         thread.start()
 
-    def run_translator(self, model_size, push_to_talk):
+    def run_translator(self, model_size, push_to_talk, source_language="es", partial_interval=None,
+                       use_history=False):
         """Ejecutar traductor en background"""
         try:
+            # Caché e historial solo si se activaron (la caché aproximada puede repetir traducciones)
+            if use_history and self.translation_cache is None:
+                self.translation_cache = TranslationCache(str(get_default_cache_path()))
+                self.transcript_store = TranscriptStore()
+
             # Crear traductor con callback personalizado y perfil de voz
             self.translator = TranslatorGUIAdapter(
                 model_size=model_size,
                 push_to_talk=push_to_talk,
                 gui_callback=self.on_translation,
-                voice_profile=self.voice_profile  # Pasar perfil de voz
+                source_language=source_language,
+                voice_profile=self.voice_profile,  # Pasar perfil de voz
+                translation_cache=self.translation_cache if use_history else None,
+                transcript_store=self.transcript_store if use_history else None,
+                partial_interval=partial_interval
             )
 
             self.translator.start()
 
         except Exception as e:
-            self.output_queue.put(('error', f"Error: {str(e)}"))
+            self.ui_events.put('error', f"Error: {str(e)}")
         finally:
-            self.output_queue.put(('finished', None))
+            if use_history and self.translation_cache:
+                self.ui_events.put('summary', self.translation_cache.get_summary())
+            self.ui_events.put('finished')
 
     def on_translation(self, event_type, data):
-        """Callback para eventos del traductor"""
-        self.output_queue.put((event_type, data))
-
-    def check_output_queue(self):
-        """Verificar cola de mensajes periódicamente"""
-        try:
-            while True:
-                event_type, data = self.output_queue.get_nowait()
-
-                if event_type == 'translation':
-                    self.append_output(f"→ {data}", 'english')
-                    if self.translator:
-                        self.update_stats(self.translator.translations_spoken)
-                    # Restaurar estado
-                    if self.mode_var.get() == "ptt":
-                        self.update_status("Esperando ESPACIO...", '#FF9800')
-                    else:
-                        self.update_status("Grabando...", '#4CAF50')
-
-                elif event_type == 'status':
-                    # Actualizar estado visual
-                    if '🎤 Grabando' in data:
-                        self.update_status("Grabando...", '#4CAF50')
-                    elif '⏸️ Procesando' in data:
-                        self.update_status("Procesando...", '#2196F3')
-                    elif '⚠️' in data:
-                        self.append_output(data, 'status')
-                    elif 'Procesando' in data:
-                        self.update_status("Procesando...", '#2196F3')
-
-                elif event_type == 'error':
-                    self.append_output(f"❌ Error: {data}", 'status')
-
-                elif event_type == 'finished':
-                    self.stop_translation()
-
-        except queue.Empty:
-            pass
-
-        # Volver a verificar en 100ms
-        self.root.after(100, self.check_output_queue)
+        """Callback para eventos del traductor (se llama desde sus threads)"""
+        self.ui_events.put(event_type, data)
+
+    def handle_ui_events(self, events):
+        """
+        Procesa en el thread de Tk un lote de eventos del traductor.
+
+        Los cambios de la etiqueta de estado se agrupan: solo se aplica el
+        último del lote.
+
+        Args:
+            events: Lista de (event_type, data) en orden de llegada
+        """
+        status = None
+        for event_type, data in events:
+            if event_type == 'partial':
+                self.transcript.set_partial(f"… {data}")
+
+            elif event_type == 'translation':
+                # El final reemplaza al parcial de la frase
+                self.transcript.set_partial(None)
+                self.append_output(f"→ {data}", 'english')
+                if self.translator:
+                    self.update_stats(self.translator.translations_spoken)
+                # Restaurar estado
+                if self.mode_var.get() == "ptt":
+                    status = ("Esperando ESPACIO...", '#FF9800')
+                else:
+                    status = ("Grabando...", '#4CAF50')
+
+            elif event_type == 'status':
+                # Actualizar estado visual
+                if '🎤 Grabando' in data:
+                    status = ("Grabando...", '#4CAF50')
+                elif '⏸️ Procesando' in data:
+                    status = ("Procesando...", '#2196F3')
+                elif '⚠️' in data or '🌐' in data:
+                    self.append_output(data, 'status')
+                elif 'Procesando' in data:
+                    status = ("Procesando...", '#2196F3')
+
+            elif event_type == 'error':
+                self.append_output(f"❌ Error: {data}", 'status')
+
+            elif event_type == 'summary':
+                self.append_output(data, 'status')
+
+            elif event_type == 'finished':
+                self.stop_translation()
+                status = None
+
+        if status and self.is_translating:
+            self.update_status(*status)
 
     def stop_translation(self):
         """Detener traducción"""
@@ -387,8 +467,7 @@ class TranslatorGUI:
             # Actualizar estadísticas del perfil si existe
             if self.voice_profile:
                 self.voice_profile.total_translations = self.translator.translations_spoken
-                profile_path = get_default_profile_path(self.voice_profile.user_name)
-                self.voice_profile.save(str(profile_path))
+                self.profile_store.save_profile(self.voice_profile)
             self.translator = None
 
         # Restaurar controles
@@ -397,26 +476,29 @@ class TranslatorGUI:
         self.ptt_button.pack_forget()
 
         self.update_status("Detenido", '#757575')
+        self.transcript.set_partial(None)
         self.append_output("--- Sesión terminada ---", 'status')
 
     def load_or_create_profile(self):
         """Carga perfil existente o pregunta si crear uno nuevo"""
+        # Sugerir el perfil usado más recientemente (desde el índice, sin abrir cada perfil)
+        recent = self.profile_store.list_profiles(sort_by="last_used")
+        default_name = recent[0]["user_name"] if recent else "Usuario"
+
         # Pedir nombre de usuario
         user_name = simpledialog.askstring(
             "Perfil de Usuario",
             "¿Cuál es tu nombre?",
-            initialvalue="Usuario"
+            initialvalue=default_name
         )
 
         if not user_name:
             user_name = "Usuario"
 
         # Buscar perfil existente
-        profile_path = get_default_profile_path(user_name)
-
-        if os.path.exists(profile_path):
+        if self.profile_store.get_entry(user_name):
             # Cargar perfil existente
-            self.voice_profile = VoiceProfile(user_name=user_name, profile_path=str(profile_path))
+            self.voice_profile = self.profile_store.load_profile(user_name)
             self.update_profile_display()
         else:
             # Preguntar si quiere calibrar ahora
@@ -450,7 +532,7 @@ class TranslatorGUI:
             user_name = self.voice_profile.user_name if self.voice_profile else "Usuario"
 
         # Abrir ventana de calibración
-        cal_window = CalibrationWindow(self.root, user_name=user_name)
+        cal_window = CalibrationWindow(self.root, user_name=user_name, profile_store=self.profile_store)
         self.root.wait_window(cal_window.window)
 
         # Obtener perfil creado
@@ -484,17 +566,25 @@ class TranslatorGUI:
 class TranslatorGUIAdapter(RealtimeTranslator):
     """Adaptador del traductor para trabajar con GUI"""
 
-    def __init__(self, model_size, push_to_talk, gui_callback, vad_enabled=True, voice_profile=None):
+    def __init__(self, model_size, push_to_talk, gui_callback, vad_enabled=True, voice_profile=None,
+                 draft_model_size=None, translation_cache=None, source_language="es",
+                 transcript_store=None, partial_interval=None):
         self.gui_callback = gui_callback
         super().__init__(model_size=model_size,
-                        source_language="es",
+                        source_language=source_language,
                         push_to_talk=push_to_talk,
                         vad_enabled=vad_enabled,
                         vad_threshold=0.5,
-                        voice_profile=voice_profile)
+                        voice_profile=voice_profile,
+                        draft_model_size=draft_model_size,
+                        translation_cache=translation_cache,
+                        transcript_store=transcript_store,
+                        partial_interval=partial_interval)
 
     def start(self):
         """Override para eliminar input() de terminal"""
+        self.open_session_resources()
+        self.begin_transcript_session()
         self.is_recording = True
 
         # Iniciar thread de TTS
@@ -507,6 +597,9 @@ class TranslatorGUIAdapter(RealtimeTranslator):
         processing_thread.daemon = True
         processing_thread.start()
 
+        # Resultados parciales (opcional)
+        partial_thread = self.start_partial_thread()
+
         # Iniciar keyboard listener si está en modo Push-to-Talk
         keyboard_thread = None
         if self.push_to_talk:
@@ -516,14 +609,7 @@ class TranslatorGUIAdapter(RealtimeTranslator):
 
         try:
             # Iniciar captura de audio
-            import sounddevice as sd
-
-            with sd.InputStream(
-                channels=1,
-                samplerate=self.sample_rate,
-                callback=self.audio_callback,
-                blocksize=int(self.sample_rate * 0.1)
-            ):
+            with self.audio_source.open(self.audio_callback):
                 # Mantener el programa corriendo mientras is_recording sea True
                 while self.is_recording:
                     import time
@@ -547,9 +633,16 @@ class TranslatorGUIAdapter(RealtimeTranslator):
             # Esperar a que los threads terminen
             processing_thread.join(timeout=5)
             tts_thread.join(timeout=5)
+            if partial_thread:
+                partial_thread.join(timeout=5)
             if keyboard_thread:
                 keyboard_thread.join(timeout=2)
 
+            self.end_transcript_session()
+            if self.translation_cache:
+                self.translation_cache.save()
+            self.close_session_resources()
+
     def keyboard_listener_gui(self):
         """Listener de teclado para GUI (sin prints)"""
         if not self.push_to_talk:
@@ -563,6 +656,7 @@ class TranslatorGUIAdapter(RealtimeTranslator):
                 self.space_pressed = True
                 # Limpiar buffer al empezar a grabar
                 self.buffer.clear()
+                self._utterance_id += 1
                 self.gui_callback('status', '🎤 Grabando...')
 
         def on_release():
@@ -577,22 +671,15 @@ class TranslatorGUIAdapter(RealtimeTranslator):
                     # Verificar que tenga al menos 1 segundo de audio
                     if len(chunk) >= self.sample_rate:
                         # Usar VAD mejorado para validar que contiene voz
-                        if self.has_speech(chunk):
-                            try:
-                                self.audio_queue.put(chunk, block=False)
-                            except queue.Full:
-                                try:
-                                    self.audio_queue.get_nowait()
-                                    self.audio_queue.put(chunk, block=False)
-                                except:
-                                    pass
-                        else:
+                        if not self.submit_chunk(chunk):
                             self.gui_callback('status', '⚠️ No se detectó voz clara')
                     else:
+                        self.metric_gated.inc()
                         self.gui_callback('status', '⚠️ Audio muy corto (min 1s)')
 
                     # Limpiar buffer
                     self.buffer.clear()
+                    self._utterance_id += 1
 
         # Configurar hooks para la barra espaciadora
         keyboard.on_press_key('space', lambda _: on_press())
@@ -607,12 +694,15 @@ class TranslatorGUIAdapter(RealtimeTranslator):
         """Override para enviar resultados a GUI"""
         while self.is_recording:
             try:
-                audio_chunk = self.audio_queue.get(timeout=1.0)
+                audio_chunk, timing = self.next_chunk(timeout=1.0)
 
                 if not self.is_recording:
                     break
 
-                self.chunks_processed += 1
+                with self.processing_lock:
+                    self.chunks_processed += 1
+                    self.active_chunks += 1
+                    self.is_processing = True
 
                 self.gui_callback('status', 'Procesando...')
 
@@ -620,45 +710,53 @@ class TranslatorGUIAdapter(RealtimeTranslator):
                     from translate_realtime import load_audio_from_array
                     import time
 
-                    # Si hay perfil de voz, aplicar ajustes personalizados primero
-                    if self.voice_profile and self.voice_profile.is_calibrated:
-                        audio_chunk = self.voice_profile.apply_to_audio(audio_chunk, self.sample_rate)
-
-                    # Preparar audio con mejoras (silence trimming + normalization)
+                    # Preparar audio (silence trimming; el AGC ya niveló el stream)
                     audio_prepared = load_audio_from_array(
                         audio_chunk,
                         self.sample_rate,
                         apply_silence_trim=True,
-                        apply_normalization=not (self.voice_profile and self.voice_profile.is_calibrated),  # Skip si profile ya normalizó
-                        silence_threshold_db=self.silence_threshold_db,
-                        target_rms_db=self.target_rms_db
+                        silence_threshold_db=self.silence_threshold_db
                     )
 
-                    result = self.model.transcribe(
-                        audio_prepared,
-                        task="translate",
-                        language=self.source_language,
-                        fp16=False,
-                        verbose=False,
-                        beam_size=1,
-                        best_of=1,
-                        temperature=0
-                    )
+                    result = self.transcribe_audio(audio_prepared)
 
                     translated_text = result["text"].strip()
 
                     if translated_text:
                         self.gui_callback('translation', translated_text)
-                        self.tts_queue.put(translated_text)
+                        timing["text_at"] = time.perf_counter()
+                        timing["audio_seconds"] = len(audio_chunk) / self.sample_rate
+                        self.record_translation(translated_text, timing, result)
+                        self.emit_subtitle(translated_text, timing)
+                        timing["tts_enqueued_at"] = time.perf_counter()
+                        self.tts_queue.put((translated_text, timing))
+                    else:
+                        self.metric_gated.inc()
 
                 except Exception as e:
                     self.gui_callback('error', str(e))
 
+                finally:
+                    self._chunk_done()
+
             except queue.Empty:
                 continue
             except Exception as e:
                 self.gui_callback('error', str(e))
 
+    def on_partial(self, text):
+        """Override para mostrar el resultado parcial en la GUI"""
+        self.gui_callback('partial', text)
+
+    def warn_overflow(self, message):
+        """Override para mostrar el aviso de desborde en la GUI"""
+        super().warn_overflow(message)
+        self.gui_callback('status', message)
+
+    def on_language_detected(self, language, probability):
+        """Override para mostrar el idioma detectado en la GUI"""
+        self.gui_callback('status', f'🌐 Idioma detectado: {language} ({probability*100:.0f}%)')
+
     def stop(self):
         """Detener traductor"""
         self.is_recording = False
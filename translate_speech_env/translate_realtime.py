@@ -1,18 +1,36 @@
 import whisper
-import sounddevice as sd
 import soundfile as sf
 import numpy as np
 import queue
 import threading
 import pyttsx3
 import time
+import copy
+import itertools
 from collections import deque
 import sys
-import pythoncom  # Para inicializar COM en Windows
+import json
+try:
+    import pythoncom  # Para inicializar COM en Windows
+except ImportError:
+    pythoncom = None  # Linux/macOS: pyttsx3 no necesita COM
 import keyboard  # Para detectar teclas (Push-to-Talk)
 import torch
 from silero_vad import load_silero_vad, read_audio, get_speech_timestamps
 from voice_profile import VoiceProfile, get_default_profile_path
+from speculative_decoding import SpeculativeDecoder
+from translation_cache import TranslationCache, get_default_cache_path
+from transcript_store import TranscriptStore
+from audio_gain import StreamingGainControl
+from noise_floor import NoiseFloorTracker
+from audio_sources import MicrophoneSource, create_audio_source
+from chunk_tracing import ChunkTracer
+from chunk_spill import ChunkSpill
+from metrics import MetricsRegistry, MetricsServer
+from subtitle_output import SubtitleSink
+from profile_store import ProfileStore
+from realtime_config import (DEFAULT_CONFIG, OVERFLOW_POLICIES, build_arg_parser, resolve_config, list_presets,
+                             get_preset_description)
 
 def trim_silence(audio_array, sample_rate=16000, silence_threshold_db=-40, min_silence_duration=0.3):
     """
@@ -100,67 +118,191 @@ def normalize_audio_rms(audio_array, target_rms_db=-20):
 
 
 def load_audio_from_array(audio_array, sample_rate=16000,
-                          apply_silence_trim=True, apply_normalization=True,
-                          silence_threshold_db=-40, target_rms_db=-20):
+                          apply_silence_trim=True, silence_threshold_db=-40):
     """
     Prepara array de audio para Whisper con mejoras de calidad.
 
+    El audio ya llega nivelado por el AGC del stream de captura
+    (StreamingGainControl), así que aquí solo se recortan silencios.
+
     Args:
-        audio_array: Array de audio desde sounddevice
+        audio_array: Array de audio nivelado desde el buffer de captura
         sample_rate: Frecuencia de muestreo
         apply_silence_trim: Si True, recorta silencios
-        apply_normalization: Si True, normaliza con RMS
         silence_threshold_db: Umbral para detección de silencio
-        target_rms_db: Nivel RMS objetivo
 
     Returns:
         Audio procesado listo para Whisper
     """
-    # Asegurar que es float32
-    audio_array = audio_array.astype(np.float32)
+    # Asegurar que es float32 (sin copiar si ya lo es)
+    audio_array = np.asarray(audio_array, dtype=np.float32)
 
-    # 1. Recortar silencios (mejora precisión de Whisper)
+    # Recortar silencios (mejora precisión de Whisper)
     if apply_silence_trim and len(audio_array) > sample_rate:  # Solo si >1 segundo
         audio_array = trim_silence(audio_array, sample_rate, silence_threshold_db)
 
-    # 2. Normalización RMS (volumen consistente)
-    if apply_normalization:
-        audio_array = normalize_audio_rms(audio_array, target_rms_db)
-    else:
-        # Normalización básica por picos (fallback)
-        max_val = np.abs(audio_array).max()
-        if max_val > 1.0:
-            audio_array = audio_array / max_val
-
     return audio_array
 
 
+def quantize_model(model):
+    """
+    Cuantiza dinámicamente (int8) las capas Linear de un modelo Whisper en CPU.
+
+    Whisper usa su propia subclase de nn.Linear, que quantize_dynamic no
+    reconoce; se convierte a nn.Linear (mismos parámetros) antes de cuantizar.
+
+    Args:
+        model: Modelo Whisper cargado
+
+    Returns:
+        Modelo cuantizado (o el original si está en GPU)
+    """
+    if model.device.type != "cpu":
+        print("⚠️  La cuantización int8 solo aplica en CPU; se usa el modelo sin cuantizar")
+        return model
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
 class RealtimeTranslator:
     def __init__(self, model_size="base", source_language="es", push_to_talk=False,
-                 vad_enabled=True, vad_threshold=0.5, voice_profile=None):
+                 vad_enabled=True, vad_threshold=0.5, voice_profile=None,
+                 draft_model_size=None, translation_cache=None, chunk_duration=3, overlap=0.25,
+                 quantization=None, workers=1, num_threads=None, queue_size=10, tts_rate=185,
+                 device=None, audio_source=None, tts_enabled=True, trace_path=None,
+                 metrics_port=None, overflow_policy="drop-oldest", overflow_timeout=0.5,
+                 spill_dir=None, transcript_store=None, subtitle_path=None, subtitle_port=None,
+                 partial_interval=None, partial_model="tiny", partial_budget=0.25):
         """
         Inicializa el traductor en tiempo real
 
         Args:
             model_size: Tamaño del modelo Whisper (tiny, base, small, medium, large)
-            source_language: Idioma de origen (es para español)
+            source_language: Idioma de origen (es para español, "auto" para detectarlo)
             push_to_talk: Si True, solo graba mientras se mantiene presionada la barra espaciadora
             vad_enabled: Si True, usa Voice Activity Detection para filtrar ruido
             vad_threshold: Umbral de confianza VAD (0.0-1.0, recomendado: 0.5)
             voice_profile: Perfil de voz personalizado (VoiceProfile) o None
+            draft_model_size: Modelo borrador para decodificación especulativa
+                              (ej: "tiny" con base/small) o None para desactivarla
+            translation_cache: Caché de traducciones (TranslationCache) o None
+            chunk_duration: Segundos de audio por chunk (modo continuo)
+            overlap: Fracción del chunk que se solapa con el siguiente
+            quantization: None o "int8" (cuantización dinámica de capas Linear, solo CPU)
+            workers: Número de threads de procesamiento (Whisper)
+            num_threads: Threads de PyTorch por inferencia (None = automático)
+            queue_size: Chunks pendientes máximos en audio_queue
+            tts_rate: Velocidad de voz TTS (palabras por minuto)
+            device: Dispositivo de entrada de sounddevice (índice, nombre o None)
+            audio_source: Fuente de audio (AudioSource); None = micrófono
+            tts_enabled: Si False, no se reproduce la traducción (ej: benchmarks sin audio)
+            trace_path: Archivo JSON donde guardar la traza por chunk (Chrome trace /
+                        Perfetto) o None para no trazar
+            metrics_port: Puerto local para exponer /metrics (Prometheus) o None
+            overflow_policy: Qué hacer con audio_queue llena:
+                             "drop-oldest" (descarta el más antiguo, prioriza lo reciente),
+                             "drop-newest" (descarta el nuevo),
+                             "block" (espera hasta overflow_timeout; frena la captura) o
+                             "spill" (guarda en disco y lo procesa después, sin perder voz)
+            overflow_timeout: Segundos máximos de espera con "block" antes de descartar
+            spill_dir: Directorio para "spill" (None = temporal)
+            transcript_store: Almacén de transcripciones (TranscriptStore) o None
+            subtitle_path: Archivo .srt/.vtt donde escribir subtítulos en vivo o None
+            subtitle_port: Puerto local del feed de subtítulos (SSE + overlay) o None
+            partial_interval: Segundos entre resultados parciales de la frase en curso
+                              (None = solo resultados finales)
+            partial_model: Modelo Whisper (barato) para los resultados parciales
+            partial_budget: Fracción máxima del tiempo que puede ocupar la decodificación parcial
         """
         print("Inicializando traductor en tiempo real...")
 
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
         # Cargar modelo Whisper
         self.model = whisper.load_model(model_size)
-        self.source_language = source_language
+        if quantization == "int8":
+            self.model = quantize_model(self.model)
+
+        # Idioma de origen: fijo o detectado automáticamente una vez por sesión
+        self.auto_language = (source_language == "auto")
+        self.source_language = None if self.auto_language else source_language
+        self.language_confidence_threshold = 0.8  # Probabilidad mínima para fijar el idioma
+        self.min_chunk_logprob = -1.0  # avg_logprob bajo este valor dispara re-detección
+        self.language_detections = 0
+        self.language_lock = threading.Lock()  # Varios workers detectan y fijan el idioma a la vez
+
+        # Decodificación especulativa (greedy sin timestamps, menos pasos del modelo grande;
+        # el texto puede diferir del de model.transcribe())
+        self.speculative_decoder = None
+        if draft_model_size and draft_model_size != model_size:
+            print(f"Cargando modelo borrador '{draft_model_size}' (decodificación especulativa)...")
+            draft_model = whisper.load_model(draft_model_size)
+            if quantization == "int8":
+                draft_model = quantize_model(draft_model)
+            self.speculative_decoder = SpeculativeDecoder(
+                self.model, draft_model, language=self.source_language, task="translate"
+            )
+
+        # Un modelo (y decoder) por worker: los hooks de kv-cache de Whisper no
+        # admiten dos decodificaciones simultáneas sobre el mismo modelo
+        self.model_pool = queue.Queue()
+        self.model_pool.put((self.model, self.speculative_decoder))
+        for _ in range(workers - 1):
+            replica = copy.deepcopy(self.model)
+            replica_decoder = None
+            if self.speculative_decoder:
+                replica_decoder = SpeculativeDecoder(
+                    replica, copy.deepcopy(self.speculative_decoder.draft_model),
+                    language=self.source_language, task="translate"
+                )
+            self.model_pool.put((replica, replica_decoder))
+
+        # Resultados parciales: modelo propio (no compite por model_pool con los finales)
+        self.partial_interval = partial_interval
+        self.partial_budget = partial_budget
+        self.min_partial_seconds = 1.0
+        self.partial_model = None
+        if partial_interval:
+            print(f"Cargando modelo '{partial_model}' para resultados parciales...")
+            self.partial_model = whisper.load_model(partial_model)
+            if quantization == "int8":
+                self.partial_model = quantize_model(self.partial_model)
+        self._buffer_version = 0   # Cambia con cada bloque agregado al buffer
+        self._utterance_id = 0     # Cambia cada vez que el buffer se envía o se descarta
+
+        self.translation_cache = translation_cache
+        self.model_size = model_size
+        # Modelo y modo de decodificación: parte de la clave de la caché de traducciones
+        self.decode_mode = model_size
+        if self.speculative_decoder:
+            self.decode_mode += f"+{draft_model_size}"
+        if quantization:
+            self.decode_mode += f"/{quantization}"
+
+        # Historial persistente de traducciones (una sesión por start())
+        self.transcript_store = transcript_store
+        self.transcript_session = None
+        self.session_started_at = time.perf_counter()
+
         self.push_to_talk = push_to_talk
         self.space_pressed = False  # Estado de la barra espaciadora
 
         # Configuración de audio
         self.sample_rate = 16000
-        self.chunk_duration = 3  # Procesar cada 3 segundos (reducido de 5)
+        self.device = device
+        self.audio_source = audio_source or MicrophoneSource(
+            self.sample_rate, int(self.sample_rate * 0.1), device  # Bloques de 100ms
+        )
+        self.chunk_duration = chunk_duration  # Segundos por chunk (3 por defecto)
         self.chunk_samples = int(self.sample_rate * self.chunk_duration)
+        self.overlap = overlap
+        self.workers = workers
+        self.tts_rate = tts_rate
 
         # Perfil de voz personalizado
         self.voice_profile = voice_profile
@@ -174,13 +316,18 @@ class RealtimeTranslator:
         if voice_profile and voice_profile.is_calibrated:
             print(f"✅ Cargando perfil de {voice_profile.user_name}")
             self.vad_threshold = voice_profile.vad_threshold
-            self.target_rms_db = voice_profile.target_rms_db
             self.min_speech_duration = voice_profile.min_speech_duration
             voice_profile.update_usage_stats()
         else:
             # Valores por defecto si no hay perfil
             self.vad_threshold = vad_threshold
-            self.target_rms_db = -20  # Nivel RMS objetivo para normalización
+
+        # AGC en el stream de captura (sembrado con el perfil; su setpoint es target_rms_db
+        # del perfil): los chunks llegan ya nivelados
+        self.gain_control = StreamingGainControl.from_profile(voice_profile, self.sample_rate)
+
+        # Piso de ruido adaptativo: ajusta umbral VAD y fallback de energía en tiempo real
+        self.noise_tracker = NoiseFloorTracker.from_profile(voice_profile, self.sample_rate, self.vad_threshold)
 
         # Cargar modelo VAD si está habilitado
         self.vad_model = None
@@ -195,14 +342,106 @@ class RealtimeTranslator:
                 self.vad_enabled = False
 
         # Buffer de audio con overlap
-        self.audio_queue = queue.Queue(maxsize=10)  # Limitar queue para evitar retraso
+        self.audio_queue = queue.Queue(maxsize=queue_size)  # Limitar queue para evitar retraso
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de desborde inválida: {overflow_policy}")
+        self.overflow_policy = overflow_policy
+        self.overflow_timeout = overflow_timeout
+        self.spill_dir = spill_dir
+        self.spill = None  # ChunkSpill de la sesión con la política "spill" (ver open_session_resources)
+        self._refill_lock = threading.Lock()
         self.tts_queue = queue.Queue()  # Cola separada para TTS
         self.buffer = deque(maxlen=self.chunk_samples * 2)
 
         # Motor TTS (inicializado en el thread de TTS)
+        self.tts_enabled = tts_enabled
         self.tts_voice_id = None
+        if tts_enabled:
+            self.tts_voice_id = self._select_tts_voice()
+
+        # Control de estado
+        self.is_recording = False
+        self.is_processing = False
+        self.processing_lock = threading.Lock()
+        self.active_chunks = 0  # Chunks en proceso (entre todos los workers)
+
+        # Contador de chunks procesados
+        self.chunks_processed = 0
+        self.translations_spoken = 0
+        self.dropped_chunks = 0  # Chunks descartados por cola llena
+        self.dropped_audio_seconds = 0.0
+        self.drop_warning_interval = 10.0  # Segundos sin descartes para volver a avisar
+        self._last_drop_at = None
+
+        # Medición de tiempos (para optimización)
+        self.show_timings = False  # Cambiar a True para ver tiempos detallados
+        # Tiempos por chunk (perf_counter): captura, texto y comienzo de TTS
+        self.chunk_timings = deque(maxlen=10000)
+        self._chunk_ids = itertools.count(1)
+        self.tracer = ChunkTracer(trace_path) if trace_path else None
+
+        # Métricas en vivo (opcionalmente expuestas en http://127.0.0.1:<puerto>/metrics)
+        self.metrics = MetricsRegistry()
+        self._init_metrics()
+        self.metrics_port = metrics_port
+        self.metrics_server = None  # Se abre en cada start() (ver open_session_resources)
+
+        # Subtítulos en vivo (archivo y/o feed para overlays)
+        self.subtitle_path = subtitle_path
+        self.subtitle_port = subtitle_port
+        self.subtitles = None  # SubtitleSink de la sesión (ver open_session_resources)
+
+        print("Traductor listo!\n")
 
-        # Seleccionar voz en inglés (hacerlo aquí para obtener el ID)
+    def _init_metrics(self):
+        """Registra contadores, gauges e histogramas del pipeline"""
+        m = self.metrics
+        self.metric_captured = m.counter("translator_chunks_captured_total",
+                                         "Chunks extraídos del buffer de captura")
+        self.metric_vad_rejected = m.counter("translator_chunks_vad_rejected_total",
+                                             "Chunks descartados por VAD (sin voz)")
+        self.metric_dropped = m.counter("translator_chunks_dropped_total",
+                                        "Chunks con voz descartados por audio_queue llena")
+        self.metric_dropped_seconds = m.counter("translator_dropped_audio_seconds_total",
+                                                "Segundos de audio con voz descartados por audio_queue llena")
+        self.metric_spilled = m.counter("translator_chunks_spilled_total",
+                                        "Chunks desbordados a disco (política spill)")
+        self.metric_gated = m.counter("translator_chunks_gated_total",
+                                      "Chunks que no llegan a TTS (PTT < 1s o traducción vacía)")
+        self.metric_spoken = m.counter("translator_translations_spoken_total",
+                                       "Traducciones reproducidas por TTS")
+        self.metric_partials = m.counter("translator_partials_total", "Resultados parciales mostrados")
+        self.metric_partials_skipped = m.counter("translator_partials_skipped_total",
+                                                 "Parciales omitidos para no demorar los finales")
+
+        m.gauge("translator_audio_queue_depth", "Chunks esperando en audio_queue",
+                function=self.audio_queue.qsize)
+        m.gauge("translator_tts_queue_depth", "Textos esperando en tts_queue",
+                function=self.tts_queue.qsize)
+        m.gauge("translator_spill_backlog", "Chunks desbordados a disco pendientes",
+                function=lambda: len(self.spill) if self.spill else 0)
+        m.gauge("translator_noise_floor_db", "Piso de ruido estimado (dB)",
+                function=lambda: self.noise_tracker.floor_db)
+        m.gauge("translator_vad_threshold", "Umbral Silero VAD actual",
+                function=lambda: self.noise_tracker.vad_threshold)
+
+        self.stage_histograms = {
+            stage: m.histogram("translator_stage_seconds", "Duración de cada etapa por chunk",
+                               {"stage": stage})
+            for stage in ("vad", "audio_queue", "prep", "whisper", "partial", "speech_to_text",
+                          "tts_queue", "tts_init", "playback")
+        }
+        self.metric_rtf = m.histogram("translator_rtf", "Real-time factor por chunk (prep + Whisper / audio)",
+                                      buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0))
+
+    @staticmethod
+    def _select_tts_voice():
+        """
+        Busca una voz en inglés del motor TTS.
+
+        Returns:
+            ID de la voz (o None si no hay voces)
+        """
         temp_engine = pyttsx3.init()
         voices = temp_engine.getProperty('voices')
 
@@ -224,42 +463,30 @@ class RealtimeTranslator:
                     english_voice = voice
 
         if english_voice:
-            self.tts_voice_id = english_voice.id
+            voice_id = english_voice.id
         else:
             # Si no encuentra voz en inglés, usar la primera disponible
-            self.tts_voice_id = voices[0].id if voices else None
+            voice_id = voices[0].id if voices else None
 
         temp_engine.stop()
         del temp_engine
+        return voice_id
 
-        # Control de estado
-        self.is_recording = False
-        self.is_processing = False
-        self.processing_lock = threading.Lock()
-
-        # Contador de chunks procesados
-        self.chunks_processed = 0
-        self.translations_spoken = 0
-
-        # Medición de tiempos (para optimización)
-        self.show_timings = False  # Cambiar a True para ver tiempos detallados
-
-        print("Traductor listo!\n")
-
-    def has_speech(self, audio_chunk):
+    def has_speech(self, audio_chunk, timing=None):
         """
         Detecta si un chunk de audio contiene voz humana usando Silero VAD.
 
         Args:
             audio_chunk: Array numpy con audio (float32)
+            timing: Registro del chunk (opcional); con voz detectada se le
+                    agrega speech_end_at, el instante en que terminó la voz
 
         Returns:
             True si se detecta voz, False si es silencio/ruido
         """
         if not self.vad_enabled or self.vad_model is None:
             # Fallback: detección simple de energía
-            audio_energy = np.abs(audio_chunk).mean()
-            return audio_energy > 0.01
+            return self._has_energy(audio_chunk)
 
         try:
             # Convertir a tensor para Silero VAD
@@ -269,7 +496,7 @@ class RealtimeTranslator:
             speech_timestamps = get_speech_timestamps(
                 audio_tensor,
                 self.vad_model,
-                threshold=self.vad_threshold,
+                threshold=self.noise_tracker.vad_threshold,
                 sampling_rate=self.sample_rate,
                 min_speech_duration_ms=int(self.min_speech_duration * 1000),
                 return_seconds=False
@@ -283,6 +510,10 @@ class RealtimeTranslator:
                 )
                 total_speech_duration = total_speech_samples / self.sample_rate
 
+                if timing is not None:
+                    trailing = len(audio_chunk) - speech_timestamps[-1]['end']
+                    timing["speech_end_at"] = timing["captured_at"] - self._audio_to_wall(trailing)
+
                 # Verificar que haya suficiente voz
                 return total_speech_duration >= self.min_speech_duration
 
@@ -292,8 +523,153 @@ class RealtimeTranslator:
             # Si VAD falla, usar fallback de energía
             if self.show_timings:
                 print(f"⚠️  VAD error (usando fallback): {e}")
-            audio_energy = np.abs(audio_chunk).mean()
-            return audio_energy > 0.01
+            return self._has_energy(audio_chunk)
+
+    def _audio_to_wall(self, num_samples):
+        """Segundos de reloj que tardan en llegar num_samples (según la velocidad de la fuente)"""
+        speed = getattr(self.audio_source, "speed", 1.0)
+        if speed <= 0:
+            return 0.0
+        return num_samples / self.sample_rate / speed
+
+    @staticmethod
+    def speech_end(timing):
+        """
+        Instante (perf_counter) del fin de voz de un chunk: el detectado por
+        el VAD o, sin él (fallback por energía), el de captura.
+        """
+        return timing.get("speech_end_at", timing["captured_at"])
+
+    def _has_energy(self, audio_chunk):
+        """
+        Fallback por energía con umbral adaptado al piso de ruido.
+
+        El piso se mide antes del AGC, así que el umbral se lleva al nivel
+        del chunk (ya nivelado) con la ganancia actual.
+        """
+        audio_energy = np.abs(audio_chunk).mean()
+        return audio_energy > self.noise_tracker.energy_threshold * self.gain_control.gain
+
+    def transcribe_audio(self, audio_prepared):
+        """
+        Transcribe y traduce un chunk de audio ya preparado.
+
+        Consulta primero la caché de traducciones (si existe). Usa
+        decodificación especulativa si hay modelo borrador y el chunk cabe en
+        una ventana de Whisper (30s); si no, model.transcribe().
+
+        En modo "auto" el idioma se detecta solo hasta tener una detección
+        confiable; después se reutiliza y únicamente se vuelve a detectar si
+        la confianza de un chunk cae por debajo de min_chunk_logprob.
+
+        Args:
+            audio_prepared: Audio float32 16kHz (salida de load_audio_from_array)
+
+        Returns:
+            dict con al menos la clave "text"
+        """
+        language = self.source_language
+        if language is None:
+            language = self.detect_language(audio_prepared)
+
+        key = None
+        if self.translation_cache is not None:
+            key = self.translation_cache.make_key(audio_prepared, self.sample_rate, language,
+                                                  self.decode_mode)
+            cached_text = self.translation_cache.get(key)
+            if cached_text is not None:
+                return {"text": cached_text, "cached": True}
+
+        result = self._run_whisper(audio_prepared, language)
+
+        # Idioma cacheado pero chunk con baja confianza: ¿cambió el idioma?
+        if (self.auto_language and language == self.source_language
+                and self._chunk_logprob(result) < self.min_chunk_logprob):
+            self.detect_language(audio_prepared)
+            if self.source_language != language:
+                language = self.source_language
+                result = self._run_whisper(audio_prepared, language)
+                if key is not None:
+                    key = self.translation_cache.make_key(audio_prepared, self.sample_rate, language,
+                                                          self.decode_mode)
+
+        if key is not None and result["text"].strip():
+            self.translation_cache.put(key, result["text"])
+        return result
+
+    def detect_language(self, audio_prepared):
+        """
+        Detecta el idioma de un chunk con Whisper.
+
+        Si la probabilidad supera language_confidence_threshold, el idioma
+        queda fijado para el resto de la sesión. Usa un modelo de model_pool:
+        otro worker puede estar decodificando con self.model, y los hooks
+        de kv-cache de Whisper se instalan sobre el propio modelo.
+
+        Args:
+            audio_prepared: Audio float32 16kHz
+
+        Returns:
+            Código del idioma más probable (ej: "es")
+        """
+        model, speculative_decoder = self.model_pool.get()
+        try:
+            mel = whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio_prepared),
+                n_mels=model.dims.n_mels
+            ).to(model.device)
+            _, probs = model.detect_language(mel)
+        finally:
+            self.model_pool.put((model, speculative_decoder))
+
+        language = max(probs, key=probs.get)
+        probability = probs[language]
+
+        changed = False
+        with self.language_lock:
+            self.language_detections += 1
+            if probability >= self.language_confidence_threshold and language != self.source_language:
+                self.source_language = language
+                changed = True
+        if changed:
+            self.on_language_detected(language, probability)
+
+        return language
+
+    def on_language_detected(self, language, probability):
+        """Notifica un cambio del idioma de la sesión"""
+        print(f"🌐 Idioma detectado: {language} ({probability*100:.0f}%)")
+
+    @staticmethod
+    def _chunk_logprob(result):
+        """avg_logprob de un resultado (0.0 si no está disponible, ej: caché)"""
+        if "avg_logprob" in result:
+            return result["avg_logprob"]
+        segments = result.get("segments") or []
+        if not segments:
+            return 0.0
+        return float(np.mean([seg["avg_logprob"] for seg in segments]))
+
+    def _run_whisper(self, audio_prepared, language):
+        """Ejecuta la inferencia de Whisper sobre un chunk preparado"""
+        model, speculative_decoder = self.model_pool.get()
+        try:
+            if speculative_decoder is not None and len(audio_prepared) <= whisper.audio.N_SAMPLES:
+                return speculative_decoder.decode(audio_prepared, language=language)
+
+            return model.transcribe(
+                audio_prepared,
+                task="translate",
+                language=language,
+                fp16=False,
+                verbose=False,
+                # Optimizaciones para velocidad
+                beam_size=1,  # Reducir de 5 (por defecto) a 1 para mayor velocidad
+                best_of=1,    # Tomar solo la mejor opción
+                temperature=0  # Greedy decoding (más rápido)
+            )
+        finally:
+            self.model_pool.put((model, speculative_decoder))
 
     def audio_callback(self, indata, frames, time_info, status):
         """
@@ -302,15 +678,22 @@ class RealtimeTranslator:
         if status:
             print(f"Estado de audio: {status}")
 
+        audio_data = indata.copy().flatten()
+
+        # Seguir el piso de ruido (también con Push-to-Talk suelto: son bloques sin voz)
+        self.noise_tracker.update(audio_data)
+        self.gain_control.noise_gate = self.noise_tracker.gate_rms
+
         # En modo Push-to-Talk, solo capturar si la barra espaciadora está presionada
         if self.push_to_talk and not self.space_pressed:
             return
 
-        # Convertir audio a formato adecuado
-        audio_data = indata.copy().flatten()
+        # Nivelar el audio (AGC)
+        audio_data = self.gain_control.process(audio_data)
 
         # Agregar al buffer
         self.buffer.extend(audio_data)
+        self._buffer_version += 1
 
         # En modo Push-to-Talk, NO procesar automáticamente
         # El procesamiento se hace al soltar la tecla
@@ -323,24 +706,194 @@ class RealtimeTranslator:
             chunk = np.array(list(self.buffer)[:self.chunk_samples])
 
             # Usar VAD mejorado para detectar voz (reemplaza threshold simple)
-            if self.has_speech(chunk):
-                try:
-                    self.audio_queue.put(chunk, block=False)
-                except queue.Full:
-                    # Descartar el chunk más antiguo silenciosamente
-                    try:
-                        self.audio_queue.get_nowait()
-                        self.audio_queue.put(chunk, block=False)
-                    except:
-                        pass
+            self.submit_chunk(chunk)
 
-            # Mantener overlap del 25% para continuidad
-            overlap = self.chunk_samples // 4
+            # Mantener overlap (25% por defecto) para continuidad
+            overlap = int(self.chunk_samples * self.overlap)
             self.buffer = deque(
                 list(self.buffer)[self.chunk_samples - overlap:],
                 maxlen=self.chunk_samples * 2
             )
+            self._utterance_id += 1
     
+    def submit_chunk(self, chunk):
+        """
+        Registra un chunk capturado, lo pasa por VAD y, si tiene voz, lo encola.
+
+        Args:
+            chunk: Array de audio del buffer
+
+        Returns:
+            True si se encoló, False si el VAD lo descartó
+        """
+        timing = self.new_chunk_timing(len(chunk))
+
+        vad_start = time.perf_counter()
+        speech = self.has_speech(chunk, timing)
+        vad_end = time.perf_counter()
+        self.stage_histograms["vad"].observe(vad_end - vad_start)
+        if self.tracer:
+            self.tracer.span("vad", timing["chunk_id"], vad_start, vad_end, speech=speech)
+
+        if not speech:
+            self.metric_vad_rejected.inc()
+            if self.tracer:
+                self.tracer.instant("vad_rejected", timing["chunk_id"])
+            return False
+
+        self.enqueue_chunk(chunk, timing)
+        return True
+
+    def new_chunk_timing(self, num_samples):
+        """
+        Crea el registro de un chunk recién capturado (ID + timestamps).
+
+        El mismo dict viaja con el chunk por audio_queue, el worker y
+        tts_queue, y termina en chunk_timings.
+
+        Args:
+            num_samples: Muestras del chunk
+
+        Returns:
+            dict con chunk_id y captured_at (perf_counter)
+        """
+        now = time.perf_counter()
+        timing = {"chunk_id": next(self._chunk_ids), "captured_at": now}
+        self.metric_captured.inc()
+        if self.tracer:
+            self.tracer.span("capture", timing["chunk_id"], now - num_samples / self.sample_rate, now,
+                             samples=num_samples)
+            self.tracer.flow(timing["chunk_id"], "start", now)
+        return timing
+
+    def enqueue_chunk(self, chunk, timing=None):
+        """
+        Encola un chunk con su registro de tiempos aplicando la política
+        de desborde si audio_queue está llena (ver overflow_policy).
+
+        Args:
+            chunk: Array de audio del buffer
+            timing: Registro de new_chunk_timing() (None = se crea aquí)
+
+        Returns:
+            True si el chunk quedó encolado o desbordado a disco, False si se descartó
+        """
+        timing = timing or self.new_chunk_timing(len(chunk))
+        timing["enqueued_at"] = time.perf_counter()
+        item = (chunk, timing)
+
+        # Con chunks ya en disco, los nuevos van detrás para mantener el orden
+        if self.spill is not None and len(self.spill):
+            self._spill_chunk(chunk, timing)
+            return True
+
+        try:
+            self.audio_queue.put(item, block=False)
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == "spill":
+            self._spill_chunk(chunk, timing)
+            return True
+
+        if self.overflow_policy == "block":
+            try:
+                self.audio_queue.put(item, timeout=self.overflow_timeout)
+                return True
+            except queue.Full:
+                self._record_drop(chunk, timing)
+                return False
+
+        if self.overflow_policy == "drop-oldest":
+            try:
+                dropped_chunk, dropped_timing = self.audio_queue.get_nowait()
+                self._record_drop(dropped_chunk, dropped_timing)
+            except queue.Empty:
+                pass
+            try:
+                self.audio_queue.put(item, block=False)
+                return True
+            except queue.Full:
+                pass
+
+        self._record_drop(chunk, timing)
+        return False
+
+    def _spill_chunk(self, chunk, timing):
+        """Guarda un chunk en disco hasta que haya lugar en audio_queue"""
+        self.spill.push(chunk, timing)
+        self.metric_spilled.inc()
+        if self.tracer:
+            self.tracer.instant("spilled", timing["chunk_id"])
+        if len(self.spill) == 1:
+            self.warn_overflow("⚠️  Cola de audio llena: desbordando chunks a disco (se procesarán con retraso)")
+
+    def _record_drop(self, chunk, timing):
+        """
+        Contabiliza un chunk con voz descartado y avisa cuando empiezan
+        los descartes (primer descarte tras drop_warning_interval sin ninguno).
+        """
+        seconds = len(chunk) / self.sample_rate
+        now = time.monotonic()
+        starting = self._last_drop_at is None or now - self._last_drop_at > self.drop_warning_interval
+        self._last_drop_at = now
+
+        self.dropped_chunks += 1
+        self.dropped_audio_seconds += seconds
+        self.metric_dropped.inc()
+        self.metric_dropped_seconds.inc(seconds)
+        if self.tracer:
+            self.tracer.instant("dropped", timing["chunk_id"], policy=self.overflow_policy)
+
+        if starting:
+            self.warn_overflow(f"⚠️  Cola de audio llena: descartando voz ({self.overflow_policy}); "
+                               f"{self.dropped_chunks} chunks / {self.dropped_audio_seconds:.1f}s perdidos en la sesión")
+
+    def warn_overflow(self, message):
+        """
+        Avisa de un desborde de audio_queue.
+
+        Args:
+            message: Texto del aviso
+        """
+        print(f"\n{message}\n")
+
+    def next_chunk(self, timeout=1.0):
+        """
+        Toma el siguiente chunk de audio_queue y rellena la cola desde
+        el desborde a disco si lo hay.
+
+        Args:
+            timeout: Segundos máximos de espera
+
+        Returns:
+            (chunk, timing)
+
+        Raises:
+            queue.Empty: Si no llegó ningún chunk en timeout segundos
+        """
+        try:
+            return self.audio_queue.get(timeout=timeout)
+        finally:
+            self._refill_from_spill()
+
+    def _refill_from_spill(self):
+        """Mueve chunks desbordados a audio_queue mientras haya lugar"""
+        spill = self.spill  # Referencia local: close_session_resources() lo pone en None
+        if spill is None:
+            return
+        with self._refill_lock:  # Un solo worker a la vez para no alterar el orden
+            while len(spill) and not self.audio_queue.full():
+                item = spill.pop()
+                if item is None:
+                    break
+                try:
+                    self.audio_queue.put(item, timeout=self.overflow_timeout)
+                except queue.Full:
+                    self._record_drop(*item)
+                    break
+
     def keyboard_listener(self):
         """
         Listener para detectar cuando se presiona/suelta la barra espaciadora
@@ -355,6 +908,7 @@ class RealtimeTranslator:
                 self.space_pressed = True
                 # Limpiar buffer al empezar a grabar
                 self.buffer.clear()
+                self._utterance_id += 1
                 print("🎤 Grabando... (mantén presionada la barra espaciadora)")
 
         def on_release():
@@ -369,22 +923,15 @@ class RealtimeTranslator:
                     # Verificar que tenga al menos 1 segundo de audio
                     if len(chunk) >= self.sample_rate:
                         # Usar VAD mejorado para validar que contiene voz
-                        if self.has_speech(chunk):
-                            try:
-                                self.audio_queue.put(chunk, block=False)
-                            except queue.Full:
-                                try:
-                                    self.audio_queue.get_nowait()
-                                    self.audio_queue.put(chunk, block=False)
-                                except:
-                                    pass
-                        else:
+                        if not self.submit_chunk(chunk):
                             print("⚠️  No se detectó voz clara (solo ruido/silencio)\n")
                     else:
+                        self.metric_gated.inc()
                         print("⚠️  Audio muy corto (min 1 segundo)\n")
 
                     # Limpiar buffer
                     self.buffer.clear()
+                    self._utterance_id += 1
 
         # Configurar hooks para la barra espaciadora
         keyboard.on_press_key('space', lambda _: on_press())
@@ -394,6 +941,100 @@ class RealtimeTranslator:
         while self.is_recording:
             time.sleep(0.1)
 
+    def decode_partial(self, audio):
+        """
+        Decodificación rápida (greedy, sin timestamps, una ventana) de la
+        frase en curso con el modelo de parciales.
+
+        Args:
+            audio: Audio float32 16kHz acumulado hasta ahora
+
+        Returns:
+            Texto traducido provisional
+        """
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio),
+            n_mels=self.partial_model.dims.n_mels
+        ).to(self.partial_model.device)
+        options = whisper.DecodingOptions(
+            task="translate",
+            language=self.source_language,
+            temperature=0.0,
+            without_timestamps=True,
+            fp16=False
+        )
+        return whisper.decode(self.partial_model, mel, options).text.strip()
+
+    def on_partial(self, text):
+        """
+        Muestra un resultado parcial (se reemplaza con el siguiente o con el final).
+
+        Args:
+            text: Texto provisional
+        """
+        print(f"\r… {text}", end="", flush=True)
+
+    def partial_worker(self):
+        """
+        Worker que decodifica periódicamente la frase en curso (buffer) y
+        publica resultados parciales. Los parciales nunca van a TTS.
+
+        Presupuesto: se omite el parcial si hay chunks finales esperando o
+        todos los workers están ocupados, y el intervalo se estira para que
+        la decodificación parcial no ocupe más de partial_budget del tiempo.
+        """
+        interval = self.partial_interval
+        last_version = None
+
+        while self.is_recording:
+            time.sleep(interval)
+
+            if self._buffer_version == last_version or (self.push_to_talk and not self.space_pressed):
+                continue
+
+            # Los finales tienen prioridad
+            if not self.audio_queue.empty() or self.active_chunks >= self.workers:
+                self.metric_partials_skipped.inc()
+                continue
+
+            utterance_id = self._utterance_id
+            last_version = self._buffer_version
+            try:
+                audio = np.array(list(self.buffer), dtype=np.float32)
+            except RuntimeError:
+                continue  # El callback modificó el buffer durante la copia
+
+            if len(audio) < self.sample_rate * self.min_partial_seconds or not self._has_energy(audio):
+                continue
+
+            start = time.perf_counter()
+            try:
+                text = self.decode_partial(audio)
+            except Exception as e:
+                print(f"Error en resultado parcial: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            self.stage_histograms["partial"].observe(elapsed)
+            interval = max(self.partial_interval, elapsed / self.partial_budget - elapsed)
+
+            # Descartar si la frase ya se envió a decodificación final
+            if text and self.is_recording and utterance_id == self._utterance_id:
+                self.metric_partials.inc()
+                self.on_partial(text)
+
+    def start_partial_thread(self):
+        """
+        Inicia el worker de resultados parciales si está habilitado.
+
+        Returns:
+            Thread iniciado o None
+        """
+        if self.partial_model is None:
+            return None
+        thread = threading.Thread(target=self.partial_worker, name="partial-worker", daemon=True)
+        thread.start()
+        return thread
+
     def tts_worker(self):
         """
         Worker thread dedicado para Text-to-Speech (no bloqueante)
@@ -401,15 +1042,22 @@ class RealtimeTranslator:
         """
         # Inicializar COM para este thread (necesario en Windows)
         try:
-            pythoncom.CoInitialize()
+            if pythoncom:
+                pythoncom.CoInitialize()
         except Exception as e:
             print(f"Error al inicializar COM: {e}")
             return
 
         while self.is_recording:
             try:
-                # Obtener texto para hablar
-                text = self.tts_queue.get(timeout=1.0)
+                # Obtener texto para hablar (y sus tiempos, si los hay)
+                text, timing = self.tts_queue.get(timeout=1.0)
+                chunk_id = timing["chunk_id"] if timing else None
+                if timing:
+                    self.stage_histograms["tts_queue"].observe(time.perf_counter() - timing["tts_enqueued_at"])
+                if self.tracer and timing:
+                    self.tracer.queue_span("tts_queue", chunk_id, timing["tts_enqueued_at"])
+                    self.tracer.flow(chunk_id, "step")
 
                 if text:
                     # Crear motor NUEVO para cada reproducción (más confiable)
@@ -418,18 +1066,31 @@ class RealtimeTranslator:
                         print(f"Reproduciendo...")
 
                         # Inicializar motor fresco
+                        init_start = time.perf_counter()
                         engine = pyttsx3.init()
-                        engine.setProperty('rate', 185)
+                        engine.setProperty('rate', self.tts_rate)
                         engine.setProperty('volume', 1.0)
 
                         if self.tts_voice_id:
                             engine.setProperty('voice', self.tts_voice_id)
 
                         # Reproducir
+                        playback_start = time.perf_counter()
+                        if timing is not None:
+                            timing["tts_at"] = playback_start
                         engine.say(text)
                         engine.runAndWait()
 
+                        playback_end = time.perf_counter()
+                        self.stage_histograms["tts_init"].observe(playback_start - init_start)
+                        self.stage_histograms["playback"].observe(playback_end - playback_start)
+                        if self.tracer:
+                            self.tracer.span("tts_init", chunk_id, init_start, playback_start)
+                            self.tracer.span("playback", chunk_id, playback_start, playback_end, chars=len(text))
+                            self.tracer.flow(chunk_id, "end")
+
                         self.translations_spoken += 1
+                        self.metric_spoken.inc()
 
                         # Limpiar motor inmediatamente
                         try:
@@ -458,7 +1119,8 @@ class RealtimeTranslator:
 
         # Limpiar COM
         try:
-            pythoncom.CoUninitialize()
+            if pythoncom:
+                pythoncom.CoUninitialize()
         except:
             pass
 
@@ -469,12 +1131,20 @@ class RealtimeTranslator:
         while self.is_recording:
             try:
                 # Obtener chunk de audio (timeout de 1 segundo)
-                audio_chunk = self.audio_queue.get(timeout=1.0)
+                audio_chunk, timing = self.next_chunk(timeout=1.0)
+                chunk_id = timing["chunk_id"]
+                self.stage_histograms["audio_queue"].observe(time.perf_counter() - timing["enqueued_at"])
+                if self.tracer:
+                    self.tracer.queue_span("audio_queue", chunk_id, timing["enqueued_at"])
+                    self.tracer.flow(chunk_id, "step")
 
                 if not self.is_recording:
                     break
 
-                self.chunks_processed += 1
+                with self.processing_lock:
+                    self.chunks_processed += 1
+                    self.active_chunks += 1
+                    self.is_processing = True
 
                 if self.show_timings:
                     total_start = time.time()
@@ -483,53 +1153,65 @@ class RealtimeTranslator:
 
                 # Transcribir y traducir con Whisper
                 try:
-                    # Preparar audio con mejoras: silence trimming + RMS normalization
-                    prep_start = time.time()
-
-                    # Si hay perfil de voz, aplicar ajustes personalizados primero
-                    if self.voice_profile and self.voice_profile.is_calibrated:
-                        audio_chunk = self.voice_profile.apply_to_audio(audio_chunk, self.sample_rate)
+                    # Preparar audio: silence trimming (el AGC ya niveló el stream)
+                    prep_start = time.perf_counter()
 
                     audio_prepared = load_audio_from_array(
                         audio_chunk,
                         self.sample_rate,
                         apply_silence_trim=True,
-                        apply_normalization=not (self.voice_profile and self.voice_profile.is_calibrated),  # Skip si profile ya normalizó
-                        silence_threshold_db=self.silence_threshold_db,
-                        target_rms_db=self.target_rms_db
+                        silence_threshold_db=self.silence_threshold_db
                     )
-                    prep_time = time.time() - prep_start
+                    whisper_start = time.perf_counter()
+                    prep_time = whisper_start - prep_start
 
                     # Transcribir
-                    whisper_start = time.time()
-                    result = self.model.transcribe(
-                        audio_prepared,
-                        task="translate",
-                        language=self.source_language,
-                        fp16=False,
-                        verbose=False,
-                        # Optimizaciones para velocidad
-                        beam_size=1,  # Reducir de 5 (por defecto) a 1 para mayor velocidad
-                        best_of=1,    # Tomar solo la mejor opción
-                        temperature=0  # Greedy decoding (más rápido)
-                    )
-                    whisper_time = time.time() - whisper_start
+                    result = self.transcribe_audio(audio_prepared)
+                    whisper_end = time.perf_counter()
+                    whisper_time = whisper_end - whisper_start
 
                     translated_text = result["text"].strip()
 
+                    timing.update({
+                        "audio_seconds": len(audio_chunk) / self.sample_rate,
+                        "prep_seconds": prep_time,
+                        "whisper_seconds": whisper_time,
+                        "text_at": whisper_end if translated_text else None,
+                        "tts_at": None
+                    })
+                    self.chunk_timings.append(timing)
+                    self.observe_chunk_timing(timing)
+
+                    if self.tracer:
+                        self.tracer.span("prep", chunk_id, prep_start, whisper_start,
+                                         seconds=len(audio_prepared) / self.sample_rate)
+                        self.tracer.span("whisper", chunk_id, whisper_start, whisper_end,
+                                         text=translated_text[:80])
+
                     if translated_text:
                         print(f"→ {translated_text}")
+                        self.record_translation(translated_text, timing, result)
+                        self.emit_subtitle(translated_text, timing)
 
                         if self.show_timings:
                             total_time = time.time() - total_start
                             print(f"⏱️  Prep: {prep_time*1000:.0f}ms | Whisper: {whisper_time*1000:.0f}ms | Total: {total_time*1000:.0f}ms")
 
                         # Enviar a TTS sin bloquear
-                        self.tts_queue.put(translated_text)
+                        if self.tts_enabled:
+                            timing["tts_enqueued_at"] = time.perf_counter()
+                            self.tts_queue.put((translated_text, timing))
+                        elif self.tracer:
+                            self.tracer.flow(chunk_id, "end")
+                    else:
+                        self.metric_gated.inc()
 
                 except Exception as e:
                     print(f"Error al procesar: {e}")
 
+                finally:
+                    self._chunk_done()
+
             except queue.Empty:
                 # No hay audio en la cola, continuar esperando
                 continue
@@ -537,9 +1219,170 @@ class RealtimeTranslator:
             except Exception as e:
                 print(f"Error: {e}")
     
-    def start(self):
+    def begin_transcript_session(self):
+        """Marca el inicio de la sesión y la registra en el almacén de transcripciones"""
+        self.session_started_at = time.perf_counter()
+        if self.transcript_store is None:
+            return
+        self.transcript_session = self.transcript_store.start_session(
+            profile=self.voice_profile.user_name if self.voice_profile else None,
+            model=self.model_size,
+            language=self.source_language or "auto",
+            source=self.audio_source.describe()
+        )
+
+    def end_transcript_session(self):
+        """Cierra la sesión del almacén (escribe las traducciones pendientes)"""
+        if self.transcript_store is None or self.transcript_session is None:
+            return
+        self.transcript_store.end_session(self.transcript_session)
+        print(f"Transcripción guardada (sesión #{self.transcript_session})")
+        self.transcript_session = None
+
+    def chunk_offsets(self, timing):
+        """
+        Intervalo del audio de un chunk relativo al inicio de la sesión.
+
+        Args:
+            timing: Registro del chunk (captured_at y, si se conoce, audio_seconds)
+
+        Returns:
+            (inicio, fin) en segundos
+        """
+        end = timing["captured_at"] - self.session_started_at
+        audio_seconds = timing.get("audio_seconds") or self.chunk_duration
+        return max(0.0, end - audio_seconds), end
+
+    def emit_subtitle(self, text, timing):
+        """
+        Publica una traducción confirmada como subtítulo (archivo y/o feed).
+
+        Args:
+            text: Texto traducido
+            timing: Registro del chunk
+        """
+        subtitles = self.subtitles  # Referencia local: close_session_resources() lo pone en None
+        if subtitles is None:
+            return
+        start, end = self.chunk_offsets(timing)
+        subtitles.emit(text, start, end, produced_at=timing.get("text_at"))
+
+    def record_translation(self, text, timing, result):
+        """
+        Guarda una traducción confirmada en el almacén de transcripciones.
+
+        Args:
+            text: Texto traducido
+            timing: Registro del chunk (captured_at, chunk_id, text_at)
+            result: Resultado de transcribe_audio() (para la confianza)
+        """
+        if self.transcript_store is None or self.transcript_session is None:
+            return
+
+        start_offset, end_offset = self.chunk_offsets(timing)
+        text_at = timing.get("text_at")
+        confidence = None
+        if not result.get("cached"):
+            confidence = float(np.exp(self._chunk_logprob(result)))
+
+        self.transcript_store.add_translation(
+            self.transcript_session, text,
+            start_offset=start_offset,
+            end_offset=end_offset,
+            chunk_id=timing["chunk_id"],
+            language=self.source_language,
+            latency=text_at - timing["captured_at"] if text_at else None,
+            confidence=confidence
+        )
+
+    def observe_chunk_timing(self, timing):
+        """
+        Registra en los histogramas los tiempos de un chunk ya transcrito.
+
+        Args:
+            timing: Registro del chunk con prep/whisper_seconds y text_at
+        """
+        self.stage_histograms["prep"].observe(timing["prep_seconds"])
+        self.stage_histograms["whisper"].observe(timing["whisper_seconds"])
+        if timing["text_at"] is not None:
+            self.stage_histograms["speech_to_text"].observe(timing["text_at"] - self.speech_end(timing))
+        if timing["audio_seconds"] > 0:
+            self.metric_rtf.observe((timing["prep_seconds"] + timing["whisper_seconds"]) / timing["audio_seconds"])
+
+    def _chunk_done(self):
+        """Marca un chunk como terminado (llamar una vez por chunk tomado de la cola)"""
+        with self.processing_lock:
+            self.active_chunks -= 1
+            self.is_processing = self.active_chunks > 0
+
+    def flush_buffer(self):
+        """
+        Envía a procesar el audio que queda en el buffer (menos de un chunk),
+        ej: al terminar una fuente de archivo. Requiere al menos 1 segundo.
+        """
+        if self.push_to_talk or len(self.buffer) < self.sample_rate:
+            return
+
+        chunk = np.array(list(self.buffer))
+        self.buffer.clear()
+        self.submit_chunk(chunk)
+
+    def wait_until_idle(self, timeout=None):
+        """
+        Espera a que las colas de audio y TTS se vacíen y ningún worker esté procesando.
+
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            True si quedó inactivo, False si venció el timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        idle_checks = 0
+        while idle_checks < 2:  # Dos lecturas seguidas: cubre el instante entre get() y el contador
+            spilled = len(self.spill) if self.spill else 0
+            if self.audio_queue.empty() and not spilled and self.active_chunks == 0 and self.tts_queue.empty():
+                idle_checks += 1
+            else:
+                idle_checks = 0
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def open_session_resources(self):
+        """
+        Abre los recursos que viven mientras dura una sesión (un start()):
+        el servidor de métricas, el desborde a disco y los subtítulos.
+        """
+        if self.overflow_policy == "spill" and self.spill is None:
+            self.spill = ChunkSpill(self.spill_dir)
+        if (self.subtitle_path or self.subtitle_port) and self.subtitles is None:
+            self.subtitles = SubtitleSink(self.subtitle_path, self.subtitle_port, registry=self.metrics)
+            if self.subtitles.url:
+                print(f"✓ Overlay de subtítulos en {self.subtitles.url}")
+        if self.metrics_port and self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port).start()
+            print(f"✓ Métricas en http://127.0.0.1:{self.metrics_port}/metrics")
+
+    def close_session_resources(self):
+        """Cierra lo abierto por open_session_resources() (llamar al terminar start())"""
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.spill is not None:
+            self.spill.close()  # Borra el directorio temporal
+            self.spill = None
+        if self.subtitles is not None:
+            self.subtitles.close()  # Cierra el archivo y libera el puerto del feed
+            self.subtitles = None
+
+    def start(self, wait_for_enter=True):
         """
         Inicia la captura y traducción en tiempo real
+
+        Args:
+            wait_for_enter: Si True, espera ENTER antes de grabar (modo interactivo)
         """
         print("\n" + "="*60)
         print("TRADUCTOR EN TIEMPO REAL - ESPAÑOL → INGLÉS")
@@ -562,19 +1405,30 @@ class RealtimeTranslator:
         print("\nPresiona Ctrl+C para detener\n")
         print("="*60)
 
-        input("Presiona ENTER para comenzar...")
+        if wait_for_enter:
+            input("Presiona ENTER para comenzar...")
 
+        self.open_session_resources()
+        self.begin_transcript_session()
         self.is_recording = True
 
         # Iniciar thread de TTS
-        tts_thread = threading.Thread(target=self.tts_worker)
-        tts_thread.daemon = True
-        tts_thread.start()
-
-        # Iniciar thread de procesamiento
-        processing_thread = threading.Thread(target=self.process_audio_worker)
-        processing_thread.daemon = True
-        processing_thread.start()
+        tts_thread = None
+        if self.tts_enabled:
+            tts_thread = threading.Thread(target=self.tts_worker)
+            tts_thread.daemon = True
+            tts_thread.start()
+
+        # Iniciar threads de procesamiento
+        processing_threads = []
+        for _ in range(self.workers):
+            processing_thread = threading.Thread(target=self.process_audio_worker)
+            processing_thread.daemon = True
+            processing_thread.start()
+            processing_threads.append(processing_thread)
+
+        # Resultados parciales (opcional)
+        partial_thread = self.start_partial_thread()
 
         # Iniciar keyboard listener si está en modo Push-to-Talk
         keyboard_thread = None
@@ -590,18 +1444,19 @@ class RealtimeTranslator:
                 print("LISTO - Presiona ESPACIO para hablar")
             else:
                 print("GRABANDO - Empieza a hablar en español")
+            print(f"Fuente: {self.audio_source.describe()}")
             print("="*60 + "\n")
-            
-            with sd.InputStream(
-                channels=1,
-                samplerate=self.sample_rate,
-                callback=self.audio_callback,
-                blocksize=int(self.sample_rate * 0.1)  # Bloques de 100ms
-            ):
-                # Mantener el programa corriendo
-                while self.is_recording:
+
+            with self.audio_source.open(self.audio_callback):
+                # Mantener el programa corriendo (las fuentes de archivo terminan solas)
+                while self.is_recording and not self.audio_source.finished:
                     time.sleep(0.1)
-                    
+
+            # Fuente agotada: procesar lo que queda antes de cerrar
+            if self.is_recording:
+                self.flush_buffer()
+                self.wait_until_idle()
+
         except KeyboardInterrupt:
             print("\n\nDeteniendo...")
         
@@ -619,33 +1474,128 @@ class RealtimeTranslator:
                     pass
 
             # Esperar a que los threads terminen
-            processing_thread.join(timeout=5)
-            tts_thread.join(timeout=5)
+            for processing_thread in processing_threads:
+                processing_thread.join(timeout=5)
+            if tts_thread:
+                tts_thread.join(timeout=5)
+            if partial_thread:
+                partial_thread.join(timeout=5)
             if keyboard_thread:
                 keyboard_thread.join(timeout=2)
 
             print(f"\n{'='*60}")
             print(f"Sesión terminada")
             print(f"Traducciones: {self.translations_spoken}")
+            self.end_transcript_session()
+            if self.subtitles:
+                print(self.subtitles.get_summary())
+            print(self.noise_tracker.get_summary())
+            if self.dropped_chunks:
+                print(f"Chunks con voz descartados (cola llena): {self.dropped_chunks} "
+                      f"({self.dropped_audio_seconds:.1f}s de audio)")
+            if self.spill is not None:
+                pending = self.spill.clear()
+                print(f"Chunks desbordados a disco: {self.spill.total_spilled}"
+                      + (f" ({pending} sin procesar)" if pending else ""))
+            if self.tracer:
+                events = self.tracer.save()
+                print(f"Traza guardada en {self.tracer.trace_path} ({events} eventos)")
+            if self.translation_cache:
+                self.translation_cache.save()
+                print(self.translation_cache.get_summary())
             print(f"{'='*60}")
+            self.close_session_resources()
 
 
-def main():
+def create_translator(config):
     """
-    Función principal
+    Crea un RealtimeTranslator a partir de un dict de configuración.
+
+    Args:
+        config: dict con las claves de realtime_config.DEFAULT_CONFIG
+
+    Returns:
+        RealtimeTranslator listo para start()
     """
+    voice_profile = None
+    if config["profile"]:
+        voice_profile = ProfileStore().load_profile(config["profile"])
+        if voice_profile is None:
+            print(f"⚠️  No existe perfil para '{config['profile']}', se usan valores por defecto")
+
+    translation_cache = None
+    if config["cache"]:
+        translation_cache = TranslationCache(str(get_default_cache_path()))
+
+    transcript_store = None
+    if config["transcript_db"]:
+        transcript_store = TranscriptStore(config["transcript_db"])
+
+    translator = RealtimeTranslator(
+        model_size=config["model"],
+        source_language=config["language"],
+        push_to_talk=config["push_to_talk"],
+        vad_enabled=config["vad"],
+        vad_threshold=config["vad_threshold"],
+        voice_profile=voice_profile,
+        draft_model_size=config["draft_model"],
+        translation_cache=translation_cache,
+        chunk_duration=config["chunk_duration"],
+        overlap=config["overlap"],
+        quantization=config["quantization"],
+        workers=config["workers"],
+        num_threads=config["threads"],
+        queue_size=config["queue_size"],
+        tts_rate=config["tts_rate"],
+        tts_enabled=config["tts"],
+        trace_path=config["trace"],
+        metrics_port=config["metrics_port"],
+        overflow_policy=config["overflow_policy"],
+        overflow_timeout=config["overflow_timeout"],
+        spill_dir=config["spill_dir"],
+        transcript_store=transcript_store,
+        subtitle_path=config["subtitles"],
+        subtitle_port=config["subtitle_port"],
+        partial_interval=config["partial_interval"],
+        partial_model=config["partial_model"],
+        partial_budget=config["partial_budget"],
+        device=config["device"],
+        audio_source=create_audio_source(config["source"], 16000, 1600, config["device"],
+                                         config["replay_speed"])
+    )
+    translator.show_timings = config["show_timings"]
+    return translator
+
+
+def interactive_config():
+    """
+    Menú interactivo (ejecución sin argumentos).
+
+    Returns:
+        dict de configuración (valores por defecto + respuestas del usuario)
+    """
+    config = dict(DEFAULT_CONFIG)
+
     print("\n" + "="*60)
     print("TRADUCTOR DE VOZ EN TIEMPO REAL")
     print("Español → Inglés")
     print("="*60)
 
+    # Idioma de origen
+    print("\nIDIOMA DE ORIGEN:")
+    print("  1. Español")
+    print("  2. Automático (reuniones bilingües) 🌐")
+
+    language_choice = input("\nSelecciona (1-2, Enter=Español): ").strip()
+    config["language"] = "auto" if language_choice == "2" else "es"
+
     # Configuración de modo
     print("\nMODO DE GRABACIÓN:")
     print("  1. Continuo (graba automáticamente)")
     print("  2. Push-to-Talk (mantén ESPACIO para hablar) 🎮")
 
     recording_mode = input("\nSelecciona (1-2, Enter=Continuo): ").strip()
-    push_to_talk = (recording_mode == "2")
+    config["push_to_talk"] = (recording_mode == "2")
 
     # Configuración de modelo
     print("\nCALIDAD:")
@@ -657,30 +1607,66 @@ def main():
 
     # Configuración según modo
     if mode_choice == "1":
-        model_size = "tiny"
+        config["model"] = "tiny"
     elif mode_choice == "3":
-        model_size = "small"
+        config["model"] = "small"
     else:
-        model_size = "base"
+        config["model"] = "base"
+
+    # Decodificación especulativa: tiny propone tokens, base/small los verifica
+    if config["model"] != "tiny":
+        print("\n¿Usar decodificación especulativa con Tiny? (más rápido en CPU; sin timestamps, el texto puede variar)")
+        speculative_input = input("(s/n, Enter=No): ").strip().lower()
+        if speculative_input == 's':
+            config["draft_model"] = "tiny"
+
+    # Caché de traducciones para frases repetidas
+    print("\n¿Usar caché de traducciones? (evita re-traducir frases repetidas)")
+    cache_input = input("(s/n, Enter=No): ").strip().lower()
+    config["cache"] = (cache_input == 's')
 
     # Opción para mostrar tiempos (debug)
     print("\n¿Mostrar tiempos de procesamiento? (para optimización)")
     show_timings_input = input("(s/n, Enter=No): ").strip().lower()
-    show_timings = (show_timings_input == 's')
+    config["show_timings"] = (show_timings_input == 's')
 
-    # Crear traductor
-    translator = RealtimeTranslator(
-        model_size=model_size,
-        source_language="es",
-        push_to_talk=push_to_talk
-    )
+    return config
+
+
+def main():
+    """
+    Función principal
 
-    # Configurar medición de tiempos
-    translator.show_timings = show_timings
+    Sin argumentos muestra el menú interactivo; con argumentos (flags,
+    --preset o --config) arranca sin ninguna pregunta.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args()
+
+    if args.list_presets:
+        for name in list_presets():
+            print(f"  {name:<14}{get_preset_description(name)}")
+        return
+
+    interactive = len(sys.argv) == 1
+    if interactive:
+        config = interactive_config()
+    else:
+        try:
+            config = resolve_config(args)
+        except (ValueError, OSError) as e:
+            parser.error(str(e))
+
+    if args.print_config:
+        print(json.dumps(config, indent=2, ensure_ascii=False))
+        return
+
+    # Crear traductor
+    translator = create_translator(config)
 
     # Iniciar
     try:
-        translator.start()
+        translator.start(wait_for_enter=interactive)
     except Exception as e:
         print(f"\nError: {e}")
 
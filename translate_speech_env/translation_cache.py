@@ -0,0 +1,345 @@
+"""
+Caché de traducciones direccionada por contenido
+Evita repetir la inferencia de Whisper para frases que el operador
+dice una y otra vez ("¿Me escuchan?", "Un momento por favor").
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, deque, namedtuple
+from pathlib import Path
+import numpy as np
+
+
+# Clave de un chunk: hash exacto + huella binaria para búsqueda aproximada.
+# model identifica modelo y modo de decodificación: solo se reutilizan
+# traducciones producidas por la misma configuración.
+AudioKey = namedtuple("AudioKey", ["digest", "bits", "duration", "language", "model"])
+
+
+def audio_fingerprint(audio, sample_rate=16000, n_bands=16, n_frames=32):
+    """
+    Calcula una huella robusta del audio a partir de energías log-mel.
+
+    El audio se divide en frames de 25ms, se agrupa la energía en bandas
+    mel (100-4000 Hz) y el eje temporal se reduce a n_frames segmentos.
+    Cada celda se cuantiza a 1 bit: si su log-energía supera la mediana
+    de su banda. Al comparar contra la mediana la huella es independiente
+    del volumen.
+
+    Args:
+        audio: Array de audio (float32, mono)
+        sample_rate: Frecuencia de muestreo
+        n_bands: Número de bandas mel
+        n_frames: Número de segmentos temporales
+
+    Returns:
+        Array uint8 con los bits empaquetados (n_frames * n_bands bits)
+    """
+    audio = np.asarray(audio, dtype=np.float32).flatten()
+
+    frame_length = int(sample_rate * 0.025)
+    hop_length = int(sample_rate * 0.010)
+    n_fft = 512
+
+    if len(audio) < frame_length:
+        audio = np.pad(audio, (0, frame_length - len(audio)))
+
+    n = 1 + (len(audio) - frame_length) // hop_length
+    indices = np.arange(frame_length)[None, :] + hop_length * np.arange(n)[:, None]
+    frames = audio[indices] * np.hanning(frame_length).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2
+
+    # Bordes de bandas equiespaciados en escala mel
+    mel_edges = np.linspace(2595 * np.log10(1 + 100 / 700), 2595 * np.log10(1 + 4000 / 700), n_bands + 1)
+    hz_edges = 700 * (10 ** (mel_edges / 2595) - 1)
+    bins = np.round(hz_edges / sample_rate * n_fft).astype(int)
+    bins = np.maximum(bins, np.arange(len(bins)) + bins[0])  # Al menos 1 bin por banda
+
+    cumulative = np.concatenate([np.zeros((n, 1)), np.cumsum(power, axis=1)], axis=1)
+    band_energy = cumulative[:, bins[1:]] - cumulative[:, bins[:-1]]
+    log_energy = np.log(band_energy + 1e-10)
+
+    # Reducir el eje temporal a n_frames segmentos (tolera pequeñas diferencias de duración)
+    segments = np.array_split(np.arange(n), min(n_frames, n))
+    reduced = np.array([log_energy[s].mean(axis=0) for s in segments])
+    if len(reduced) < n_frames:
+        reduced = np.pad(reduced, ((0, n_frames - len(reduced)), (0, 0)), mode='edge')
+
+    bits = reduced > np.median(reduced, axis=0)
+
+    return np.packbits(bits.flatten())
+
+
+class TranslationCache:
+    """
+    Caché LRU de traducciones con búsqueda exacta y aproximada.
+
+    La búsqueda exacta usa el hash de la huella; la aproximada compara la
+    huella con las entradas del mismo idioma y modelo por distancia de
+    Hamming y acepta la más parecida si supera similarity_threshold.
+    """
+
+    # Umbrales para los que se reporta el hit rate hipotético
+    REPORT_THRESHOLDS = (0.80, 0.85, 0.90, 0.95)
+
+    def __init__(self, cache_path=None, max_entries=2000, similarity_threshold=0.85,
+                 max_duration_diff=0.25):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_path: Archivo JSON para persistir la caché (None = solo memoria)
+            max_entries: Número máximo de entradas (se descarta la menos usada)
+            similarity_threshold: Similitud mínima (0-1) para un acierto aproximado
+            max_duration_diff: Diferencia relativa de duración máxima entre chunks
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.max_duration_diff = max_duration_diff
+
+        self.entries = OrderedDict()  # digest -> dict
+        self._lock = threading.Lock()
+        self._matrix_cache = {}  # (language, model) -> (digests, bits matrix, durations)
+
+        # Estadísticas
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.best_similarities = deque(maxlen=10000)
+
+        if cache_path and os.path.exists(cache_path):
+            self.load(cache_path)
+
+    def make_key(self, audio, sample_rate=16000, language="es", model="base"):
+        """
+        Construye la clave de caché para un chunk de audio.
+
+        Args:
+            audio: Array de audio
+            sample_rate: Frecuencia de muestreo
+            language: Idioma de origen
+            model: Modelo y modo de decodificación (ej: "small", "base+tiny", "tiny/int8")
+
+        Returns:
+            AudioKey
+        """
+        bits = audio_fingerprint(audio, sample_rate)
+        digest = hashlib.sha1(
+            bits.tobytes() + language.encode('utf-8') + b'\0' + model.encode('utf-8')
+        ).hexdigest()
+        return AudioKey(digest, bits, len(audio) / sample_rate, language, model)
+
+    def _candidates(self, language, model):
+        """Matriz de huellas del idioma y modelo (se reconstruye solo si cambió la caché)"""
+        if (language, model) not in self._matrix_cache:
+            digests = [d for d, e in self.entries.items()
+                       if e["language"] == language and e["model"] == model]
+            if digests:
+                bits = np.stack([self.entries[d]["bits"] for d in digests])
+                durations = np.array([self.entries[d]["duration"] for d in digests])
+            else:
+                bits, durations = None, None
+            self._matrix_cache[(language, model)] = (digests, bits, durations)
+        return self._matrix_cache[(language, model)]
+
+    def get(self, key):
+        """
+        Busca la traducción de un chunk.
+
+        Args:
+            key: AudioKey de make_key()
+
+        Returns:
+            Texto traducido o None si no hay acierto
+        """
+        with self._lock:
+            self.lookups += 1
+
+            if key.digest in self.entries:
+                self.exact_hits += 1
+                self.best_similarities.append(1.0)
+                return self._touch(key.digest)
+
+            digests, bits, durations = self._candidates(key.language, key.model)
+            if not digests:
+                self.best_similarities.append(0.0)
+                return None
+
+            n_bits = len(key.bits) * 8
+            distances = np.unpackbits(np.bitwise_xor(bits, key.bits), axis=1).sum(axis=1)
+            similarities = 1.0 - distances / n_bits
+
+            # Descartar chunks con duración muy distinta
+            duration_diff = np.abs(durations - key.duration) / max(key.duration, 1e-6)
+            similarities[duration_diff > self.max_duration_diff] = 0.0
+
+            best = int(np.argmax(similarities))
+            best_similarity = float(similarities[best])
+            self.best_similarities.append(best_similarity)
+
+            if best_similarity >= self.similarity_threshold:
+                self.near_hits += 1
+                return self._touch(digests[best])
+
+            return None
+
+    def _touch(self, digest):
+        """Marca una entrada como usada recientemente y retorna su texto"""
+        entry = self.entries[digest]
+        entry["hits"] += 1
+        self.entries.move_to_end(digest)
+        return entry["text"]
+
+    def put(self, key, text):
+        """
+        Guarda la traducción de un chunk.
+
+        Args:
+            key: AudioKey de make_key()
+            text: Texto traducido
+        """
+        with self._lock:
+            self.entries[key.digest] = {
+                "bits": key.bits,
+                "duration": key.duration,
+                "language": key.language,
+                "model": key.model,
+                "text": text,
+                "hits": 0
+            }
+            self.entries.move_to_end(key.digest)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+            self._matrix_cache.clear()
+
+    @property
+    def hit_rate(self):
+        """Fracción de búsquedas resueltas por la caché"""
+        if self.lookups == 0:
+            return 0.0
+        return (self.exact_hits + self.near_hits) / self.lookups
+
+    def get_stats(self):
+        """
+        Retorna estadísticas de la caché.
+
+        Returns:
+            dict con búsquedas, aciertos y hit rate por umbral
+        """
+        with self._lock:
+            similarities = np.array(self.best_similarities)
+            threshold_rates = {
+                f"{t:.2f}": float(np.mean(similarities >= t)) if len(similarities) else 0.0
+                for t in self.REPORT_THRESHOLDS
+            }
+            return {
+                "entries": len(self.entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "hit_rate": self.hit_rate,
+                "similarity_threshold": self.similarity_threshold,
+                "hit_rate_by_threshold": threshold_rates
+            }
+
+    def get_summary(self):
+        """
+        Retorna resumen de la caché como string.
+
+        Returns:
+            str con hit rate actual y el que se obtendría con otros umbrales
+        """
+        stats = self.get_stats()
+        lines = [
+            f"Caché de traducciones: {stats['entries']} entradas",
+            f"  • Búsquedas: {stats['lookups']} "
+            f"(exactos: {stats['exact_hits']}, aproximados: {stats['near_hits']})",
+            f"  • Hit rate: {stats['hit_rate']*100:.1f}% (umbral {stats['similarity_threshold']:.2f})"
+        ]
+        for threshold, rate in stats["hit_rate_by_threshold"].items():
+            lines.append(f"  • Con umbral {threshold}: {rate*100:.1f}%")
+        return "\n".join(lines)
+
+    def save(self, filepath=None):
+        """
+        Guarda la caché a disco (escritura atómica).
+
+        Args:
+            filepath: Ruta del archivo (None = cache_path)
+        """
+        filepath = filepath or self.cache_path
+        if not filepath:
+            return
+
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            data = {
+                "version": 2,
+                "entries": [
+                    {
+                        "digest": digest,
+                        "bits": entry["bits"].tobytes().hex(),
+                        "duration": float(entry["duration"]),
+                        "language": entry["language"],
+                        "model": entry["model"],
+                        "text": entry["text"],
+                        "hits": int(entry["hits"])
+                    }
+                    for digest, entry in self.entries.items()
+                ]
+            }
+
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+
+    def load(self, filepath):
+        """
+        Carga la caché desde disco.
+
+        Args:
+            filepath: Ruta del archivo de caché
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            with self._lock:
+                self.entries.clear()
+                # Las entradas sin modelo (versión 1) no se sabe qué modelo las produjo
+                items = [item for item in data.get("entries", []) if item.get("model")]
+                for item in items[-self.max_entries:]:
+                    self.entries[item["digest"]] = {
+                        "bits": np.frombuffer(bytes.fromhex(item["bits"]), dtype=np.uint8),
+                        "duration": item["duration"],
+                        "language": item["language"],
+                        "model": item["model"],
+                        "text": item["text"],
+                        "hits": item.get("hits", 0)
+                    }
+                self._matrix_cache.clear()
+
+            return True
+
+        except Exception as e:
+            print(f"⚠️  No se pudo cargar la caché de traducciones: {e}")
+            return False
+
+
+def get_default_cache_path():
+    """
+    Retorna ruta por defecto para la caché de traducciones.
+
+    Returns:
+        Path al archivo de caché
+    """
+    cache_dir = Path(__file__).parent / "cache"
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir / "translation_cache.json"
@@ -0,0 +1,107 @@
+"""
+Cola de eventos thread-safe para la interfaz Tk
+Los threads de trabajo (traductor, grabación) publican eventos con put()
+y despiertan el loop de Tk con un evento virtual, en vez de que la GUI
+consulte la cola cada 100ms. El loop procesa todo lo pendiente en un
+solo lote y puede quedarse solo con el último evento de los tipos
+"coalescibles" (ej: nivel de audio).
+
+Si Tcl no fue compilado con soporte de threads (event_generate desde otro
+thread no es seguro), se vuelve al sondeo periódico.
+"""
+import queue
+import threading
+import tkinter as tk
+
+VIRTUAL_EVENT = "<<UIEventsPending>>"
+
+
+class UIEventQueue:
+    """Puente entre threads de trabajo y el loop de Tk"""
+
+    def __init__(self, widget, handler, coalesce=(), poll_interval_ms=100):
+        """
+        Inicializa la cola y enlaza el evento virtual.
+
+        Args:
+            widget: Widget Tk (ventana) que recibe el evento virtual
+            handler: Función llamada en el thread de Tk con la lista de
+                     eventos (event_type, data) pendientes, en orden
+            coalesce: Tipos de evento de los que solo interesa el último del lote
+            poll_interval_ms: Intervalo de sondeo si Tcl no soporta threads
+        """
+        self.widget = widget
+        self.handler = handler
+        self.coalesce = set(coalesce)
+        self.poll_interval_ms = poll_interval_ms
+
+        self._queue = queue.Queue()
+        self._wake_pending = False
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.threaded = bool(widget.tk.eval("info exists tcl_platform(threaded)") == "1")
+        widget.bind(VIRTUAL_EVENT, self._drain, add="+")
+        if not self.threaded:
+            self._poll()
+
+    def put(self, event_type, data=None):
+        """
+        Publica un evento (seguro desde cualquier thread).
+
+        Args:
+            event_type: Tipo de evento
+            data: Datos del evento
+        """
+        self._queue.put((event_type, data))
+        if not self.threaded:
+            return
+
+        with self._lock:
+            if self._wake_pending or self._closed:
+                return
+            self._wake_pending = True
+
+        try:
+            self.widget.event_generate(VIRTUAL_EVENT, when="tail")
+        except (tk.TclError, RuntimeError):
+            # Ventana destruida o loop de Tk detenido
+            with self._lock:
+                self._wake_pending = False
+
+    def close(self):
+        """Deja de despertar al loop (llamar antes de destruir el widget)"""
+        with self._lock:
+            self._closed = True
+
+    def _take_batch(self):
+        """Vacía la cola y aplica el coalescing"""
+        with self._lock:
+            self._wake_pending = False
+
+        events = []
+        try:
+            while True:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if self.coalesce:
+            last_index = {event_type: i for i, (event_type, _) in enumerate(events)
+                          if event_type in self.coalesce}
+            events = [event for i, event in enumerate(events)
+                      if event[0] not in self.coalesce or last_index[event[0]] == i]
+        return events
+
+    def _drain(self, event=None):
+        """Entrega el lote pendiente al handler (en el thread de Tk)"""
+        events = self._take_batch()
+        if events:
+            self.handler(events)
+
+    def _poll(self):
+        """Sondeo periódico de la cola cuando Tcl no soporta threads"""
+        if self._closed:
+            return
+        self._drain()
+        self.widget.after(self.poll_interval_ms, self._poll)
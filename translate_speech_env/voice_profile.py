@@ -8,7 +8,6 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-import soundfile as sf
 
 
 class VoiceProfile:
@@ -56,7 +55,11 @@ class VoiceProfile:
         self.min_speech_duration = 0.5  # segundos
 
         # Metadata de calibración
-        self.calibration_data = []
+        # Las muestras viven en un archivo columnar aparte y se cargan solo al usarse
+        self._calibration_data = []
+        self._samples_path = None
+        self._samples_dirty = False
+        self._num_samples = 0
         self.is_calibrated = False
         self.calibration_quality = 0.0  # 0-1
 
@@ -69,6 +72,35 @@ class VoiceProfile:
         if profile_path and os.path.exists(profile_path):
             self.load(profile_path)
 
+    @property
+    def calibration_data(self):
+        """
+        Muestras de calibración (lista de dicts).
+
+        Se leen del archivo de muestras la primera vez que se accede. Leerlas
+        no obliga a reescribir el archivo: para modificarlas usar
+        add_calibration_characteristics(), remove_last_calibration_sample()
+        o asignar la lista completa.
+        """
+        if self._calibration_data is None:
+            if self._samples_path and os.path.exists(self._samples_path):
+                self._calibration_data = self._read_samples(self._samples_path)
+            else:
+                self._calibration_data = []
+        return self._calibration_data
+
+    @calibration_data.setter
+    def calibration_data(self, samples):
+        self._calibration_data = list(samples)
+        self._samples_dirty = True
+
+    @property
+    def num_samples(self):
+        """Número de muestras de calibración (sin cargarlas)"""
+        if self._calibration_data is not None:
+            return len(self._calibration_data)
+        return self._num_samples
+
     def analyze_audio(self, audio_samples, sample_rate=16000, phrase_text=""):
         """
         Analiza un chunk de audio y extrae características.
@@ -84,80 +116,101 @@ class VoiceProfile:
         if len(audio_samples) == 0:
             return None
 
-        # Asegurar que es float32 y 1D
-        audio = audio_samples.astype(np.float32).flatten()
-
-        # 1. RMS (Root Mean Square) - Nivel de volumen
-        rms = np.sqrt(np.mean(audio ** 2))
-        rms_db = 20 * np.log10(rms + 1e-10)  # Evitar log(0)
-
-        # 2. Energía promedio
-        energy = np.mean(np.abs(audio))
-
-        # 3. Rango dinámico (diferencia entre pico y valle)
-        peak = np.max(np.abs(audio))
-        trough = np.min(np.abs(audio[np.abs(audio) > 0.01]))  # Ignorar silencio
-        dynamic_range_db = 20 * np.log10((peak + 1e-10) / (trough + 1e-10))
-
-        # 4. Pitch (frecuencia fundamental) usando autocorrelación
-        pitch_hz = self._estimate_pitch(audio, sample_rate)
-
-        # 5. Duración del audio
-        duration = len(audio) / sample_rate
-
-        # 6. Zero Crossing Rate (indicador de contenido de frecuencia)
-        zero_crossings = np.sum(np.abs(np.diff(np.sign(audio)))) / 2
-        zcr = zero_crossings / len(audio)
-
-        characteristics = {
-            "rms": rms,
-            "rms_db": rms_db,
-            "energy": energy,
-            "dynamic_range_db": dynamic_range_db,
-            "pitch_hz": pitch_hz,
-            "duration": duration,
-            "zero_crossing_rate": zcr,
-            "sample_rate": sample_rate,
-            "phrase_text": phrase_text,
-            "quality_score": self._calculate_quality_score(rms, energy, duration)
-        }
-
-        return characteristics
+        # Mismo cálculo que la calibración en streaming, con un único bloque
+        accumulator = AudioFeatureAccumulator(self, sample_rate)
+        accumulator.update(audio_samples)
+        return accumulator.characteristics(phrase_text)
 
-    def _estimate_pitch(self, audio, sample_rate):
+    def estimate_pitch_contour(self, audio, sample_rate=16000, frame_duration=0.04, hop_duration=0.01,
+                               min_rms=None):
         """
-        Estima pitch (F0) usando autocorrelación.
+        Estima el contorno de pitch (F0) frame a frame.
+
+        Usa autocorrelación por FFT en frames de 40ms (O(n log n) en lugar
+        de la autocorrelación completa O(n²)), solo sobre frames con voz:
+        energía suficiente y pico de autocorrelación claro. El periodo se
+        refina con interpolación parabólica alrededor del pico.
 
         Args:
             audio: Array de audio
             sample_rate: Frecuencia de muestreo
+            frame_duration: Duración de cada frame (segundos)
+            hop_duration: Salto entre frames (segundos)
+            min_rms: RMS mínimo de un frame con voz (None = relativo al frame más fuerte)
 
         Returns:
-            Pitch estimado en Hz
+            Array con pitch en Hz por frame (0.0 en frames sin voz)
         """
         # Rango de pitch esperado para voz humana: 80-400 Hz
         min_pitch = 80
         max_pitch = 400
 
-        # Calcular autocorrelación
-        correlation = np.correlate(audio, audio, mode='full')
-        correlation = correlation[len(correlation) // 2:]
-
-        # Encontrar pico en rango de pitch esperado
+        frame_length = int(sample_rate * frame_duration)
+        hop_length = int(sample_rate * hop_duration)
         min_period = int(sample_rate / max_pitch)
         max_period = int(sample_rate / min_pitch)
 
-        if max_period >= len(correlation):
-            return 150.0  # Default si no se puede calcular
+        audio = np.asarray(audio, dtype=np.float32).flatten()
+        if len(audio) < frame_length or max_period + 1 >= frame_length:
+            return np.zeros(0, dtype=np.float32)
+
+        frames = np.lib.stride_tricks.sliding_window_view(audio, frame_length)[::hop_length]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        contour = np.zeros(len(frames), dtype=np.float32)
+
+        # Frames con voz: energía sobre el umbral de silencio y relativa al máximo
+        frame_rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        if min_rms is None:
+            min_rms = max(0.01, 0.1 * frame_rms.max())
+        voiced = frame_rms > min_rms
+        if not voiced.any():
+            return contour
+
+        # Autocorrelación por FFT (zero-padding a >= 2N para evitar aliasing circular)
+        n_fft = 1 << int(np.ceil(np.log2(2 * frame_length)))
+        spectrum = np.fft.rfft(frames[voiced], n_fft)
+        correlation = np.fft.irfft(np.abs(spectrum) ** 2, n_fft)[:, :max_period + 2]
+        correlation /= correlation[:, :1] + 1e-10
+
+        # Pico en el rango de periodos válido
+        rows = np.arange(len(correlation))
+        peak_idx = np.argmax(correlation[:, min_period:max_period + 1], axis=1) + min_period
+        strength = correlation[rows, peak_idx]
+
+        # Interpolación parabólica del pico
+        left = correlation[rows, peak_idx - 1]
+        right = correlation[rows, peak_idx + 1]
+        denominator = left - 2 * strength + right
+        offset = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / denominator, 0.0)
+        period = peak_idx + np.clip(offset, -0.5, 0.5)
+
+        # Descartar frames sin periodicidad clara (ruido, consonantes sordas)
+        periodic = strength > 0.3
+        pitch = np.where(periodic, sample_rate / period, 0.0)
+
+        contour[np.flatnonzero(voiced)] = pitch
+        return contour
+
+    def _estimate_pitch(self, audio, sample_rate, contour=None):
+        """
+        Estima pitch (F0) como la mediana del contorno en frames con voz.
 
-        # Buscar máximo en rango válido
-        peak_idx = np.argmax(correlation[min_period:max_period]) + min_period
+        Args:
+            audio: Array de audio
+            sample_rate: Frecuencia de muestreo
+            contour: Contorno ya calculado (opcional)
 
-        if peak_idx > 0:
-            pitch = sample_rate / peak_idx
-            return float(pitch)
+        Returns:
+            Pitch estimado en Hz
+        """
+        if contour is None:
+            contour = self.estimate_pitch_contour(audio, sample_rate)
 
-        return 150.0  # Default
+        voiced_pitch = contour[contour > 0]
+        if len(voiced_pitch) == 0:
+            return 150.0  # Default si no se puede calcular
+
+        return float(np.median(voiced_pitch))
 
     def _calculate_quality_score(self, rms, energy, duration):
         """
@@ -203,18 +256,44 @@ class VoiceProfile:
         Returns:
             Características extraídas
         """
-        phrase_text = self.CALIBRATION_PHRASES[phrase_id].format(
-            user_name=self.user_name
-        )
+        characteristics = self.analyze_audio(audio_samples, sample_rate, self.get_phrase_text(phrase_id))
+        return self.add_calibration_characteristics(characteristics, phrase_id)
 
-        characteristics = self.analyze_audio(audio_samples, sample_rate, phrase_text)
+    def add_calibration_characteristics(self, characteristics, phrase_id=0):
+        """
+        Agrega una muestra de calibración ya analizada
+        (ej: con AudioFeatureAccumulator durante la grabación).
 
+        Args:
+            characteristics: dict de analyze_audio() / AudioFeatureAccumulator
+            phrase_id: ID de la frase (0-9)
+
+        Returns:
+            Características agregadas
+        """
         if characteristics:
             characteristics["phrase_id"] = phrase_id
             self.calibration_data.append(characteristics)
+            self._samples_dirty = True
 
         return characteristics
 
+    def remove_last_calibration_sample(self):
+        """
+        Descarta la última muestra de calibración (ej: al repetir una frase).
+
+        Returns:
+            La muestra descartada o None si no había muestras
+        """
+        if not self.calibration_data:
+            return None
+        self._samples_dirty = True
+        return self.calibration_data.pop()
+
+    def get_phrase_text(self, phrase_id):
+        """Texto de la frase de calibración para este usuario"""
+        return self.CALIBRATION_PHRASES[phrase_id].format(user_name=self.user_name)
+
     def finalize_calibration(self):
         """
         Finaliza calibración y calcula parámetros optimizados.
@@ -268,7 +347,7 @@ class VoiceProfile:
         self.created_at = datetime.now().isoformat()
 
         print(f"\n✅ Calibración completada:")
-        print(f"   - RMS objetivo: {self.target_rms_db:.1f} dB")
+        print(f"   - RMS objetivo (AGC): {self.target_rms_db:.1f} dB")
         print(f"   - Pitch promedio: {self.avg_pitch:.0f} Hz")
         print(f"   - Rango pitch: {self.pitch_range[0]:.0f}-{self.pitch_range[1]:.0f} Hz")
         print(f"   - Threshold VAD: {self.vad_threshold:.2f}")
@@ -276,65 +355,33 @@ class VoiceProfile:
 
         return True
 
-    def apply_to_audio(self, audio_chunk, sample_rate=16000):
-        """
-        Aplica ajustes personalizados a un chunk de audio.
-
-        Args:
-            audio_chunk: Array numpy con audio
-            sample_rate: Frecuencia de muestreo
-
-        Returns:
-            Audio ajustado
-        """
-        if not self.is_calibrated:
-            return audio_chunk  # Sin cambios si no está calibrado
-
-        audio = audio_chunk.astype(np.float32).flatten()
-
-        # Normalización RMS personalizada
-        current_rms = np.sqrt(np.mean(audio ** 2))
-
-        if current_rms > 1e-10:  # Evitar división por cero
-            # Calcular ganancia para alcanzar RMS objetivo
-            target_rms_linear = 10 ** (self.target_rms_db / 20.0)
-            gain = target_rms_linear / current_rms
-
-            # Limitar ganancia para evitar distorsión
-            gain = min(gain, 10.0)  # Máximo +20dB
-
-            # Aplicar ganancia
-            audio = audio * gain
-
-            # Clip suave
-            audio = np.clip(audio, -1.0, 1.0)
-
-        return audio
-
     def save(self, filepath):
         """
         Guarda perfil a archivo JSON.
 
+        El JSON solo contiene los campos de uso frecuente (perfil de audio,
+        VAD, estadísticas). Las muestras de calibración se guardan en un
+        archivo columnar .npz aparte, que solo se reescribe si cambiaron.
+        Ambas escrituras son atómicas (archivo temporal + reemplazo).
+
         Args:
             filepath: Ruta donde guardar el perfil
         """
         # Crear directorio si no existe
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
 
-        # Convertir tipos NumPy a tipos nativos de Python
-        def convert_to_native(obj):
-            """Convierte tipos NumPy a tipos nativos de Python"""
-            if isinstance(obj, (np.integer, np.int32, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float32, np.float64)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {k: convert_to_native(v) for k, v in obj.items()}
-            elif isinstance(obj, (list, tuple)):
-                return [convert_to_native(item) for item in obj]
-            return obj
+        samples_path = get_samples_path(filepath)
+
+        # Guardar en otra ruta: las muestras deben copiarse aunque no hayan cambiado
+        if self._samples_path is None or Path(self._samples_path) != samples_path:
+            if self.num_samples > 0:
+                self.calibration_data  # Fuerza la carga diferida
+                self._samples_dirty = True
+
+        if self._samples_dirty and self._calibration_data:
+            self._write_samples(samples_path, self._calibration_data)
+            self._samples_path = samples_path
+        self._samples_dirty = False
 
         profile_data = {
             "user_name": self.user_name,
@@ -357,9 +404,9 @@ class VoiceProfile:
             },
 
             "calibration_metadata": {
-                "num_samples": len(self.calibration_data),
+                "num_samples": self.num_samples,
                 "quality_score": float(self.calibration_quality),
-                "samples": convert_to_native(self.calibration_data)
+                "samples_file": samples_path.name if self.num_samples else None
             },
 
             "usage_stats": {
@@ -369,11 +416,66 @@ class VoiceProfile:
             }
         }
 
-        with open(filepath, 'w', encoding='utf-8') as f:
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(profile_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
 
         print(f"✅ Perfil guardado en: {filepath}")
 
+    @staticmethod
+    def _write_samples(samples_path, samples):
+        """
+        Guarda las muestras como columnas (un array por característica).
+
+        Args:
+            samples_path: Ruta del archivo .npz
+            samples: Lista de dicts de características
+        """
+        keys = []
+        for sample in samples:
+            keys.extend(k for k in sample if k not in keys)
+
+        columns = {}
+        for key in keys:
+            values = [sample.get(key) for sample in samples]
+            present = [v for v in values if v is not None]
+            if present and all(isinstance(v, str) for v in present):
+                columns[key] = np.array(["" if v is None else v for v in values], dtype=str)
+            elif present and all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values):
+                columns[key] = np.array(values, dtype=np.int64)
+            else:
+                columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        tmp_path = Path(samples_path).with_name(Path(samples_path).name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, samples_path)
+
+    @staticmethod
+    def _read_samples(samples_path):
+        """
+        Lee las muestras guardadas por _write_samples.
+
+        Returns:
+            Lista de dicts de características
+        """
+        with np.load(samples_path, allow_pickle=False) as data:
+            columns = {key: data[key] for key in data.files}
+
+        if not columns:
+            return []
+
+        num_rows = len(next(iter(columns.values())))
+        return [
+            {
+                key: column[i].item()
+                for key, column in columns.items()
+                if not (column.dtype.kind == 'f' and np.isnan(column[i]))
+            }
+            for i in range(num_rows)
+        ]
+
     def load(self, filepath):
         """
         Carga perfil desde archivo JSON.
@@ -412,7 +514,17 @@ class VoiceProfile:
             # Metadata de calibración
             cal_meta = data.get("calibration_metadata", {})
             self.calibration_quality = cal_meta.get("quality_score", 0.0)
-            self.calibration_data = cal_meta.get("samples", [])
+            self._num_samples = cal_meta.get("num_samples", 0)
+            if "samples" in cal_meta:
+                # Formato 1.0: muestras dentro del JSON (se migran en el próximo save)
+                self._calibration_data = cal_meta["samples"]
+                self._samples_path = None
+                self._samples_dirty = True
+            else:
+                samples_file = cal_meta.get("samples_file")
+                self._calibration_data = None  # Carga diferida
+                self._samples_path = Path(filepath).with_name(samples_file) if samples_file else None
+                self._samples_dirty = False
 
             # Estadísticas
             stats = data.get("usage_stats", {})
@@ -450,7 +562,7 @@ Perfil de Voz: {self.user_name}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Calibrado: Sí
 Calidad: {self.calibration_quality*100:.0f}%
-Muestras: {len(self.calibration_data)}
+Muestras: {self.num_samples}
 
 Características:
   • RMS: {self.target_rms_db:.1f} dB
@@ -464,6 +576,179 @@ Uso:
         return summary.strip()
 
 
+class AudioFeatureAccumulator:
+    """
+    Extrae las características de VoiceProfile.analyze_audio de forma
+    incremental, bloque a bloque (ej: 100ms desde el callback de grabación).
+
+    Mantiene sumas de RMS/energía, pico, valle, cruces por cero y un
+    histograma de pitch, por lo que la calidad de la muestra está
+    disponible en todo momento y al terminar la grabación no hay que
+    concatenar ni re-analizar el audio.
+    """
+
+    # Histograma de pitch: bins de 1 Hz en el rango de voz (80-400 Hz)
+    PITCH_BINS = np.arange(80.0, 401.0, 1.0)
+
+    def __init__(self, profile, sample_rate=16000):
+        """
+        Inicializa el acumulador.
+
+        Args:
+            profile: VoiceProfile (aporta el tracker de pitch y el score de calidad)
+            sample_rate: Frecuencia de muestreo
+        """
+        self.profile = profile
+        self.sample_rate = sample_rate
+
+        self.num_samples = 0
+        self.sum_squares = 0.0
+        self.sum_abs = 0.0
+        self.peak = 0.0
+        self.trough = np.inf  # Mínimo |x| por encima del umbral de silencio
+        self.zero_crossings = 0.0
+        self._last_sign = None
+
+        # Pitch: frames de 40ms que cruzan bloques (se guarda la cola del bloque anterior)
+        self.frame_length = int(sample_rate * 0.04)
+        self.hop_length = int(sample_rate * 0.01)
+        self._pitch_tail = np.zeros(0, dtype=np.float32)
+        self._max_frame_rms = 0.0
+        self.pitch_histogram = np.zeros(len(self.PITCH_BINS) - 1, dtype=np.int64)
+        self.pitch_frames = 0
+        self.voiced_frames = 0
+
+    def update(self, block):
+        """
+        Agrega un bloque de audio.
+
+        Args:
+            block: Array de audio (float32, cualquier forma; se aplana)
+        """
+        audio = np.asarray(block, dtype=np.float32).flatten()
+        if len(audio) == 0:
+            return
+
+        # 1-3. RMS, energía, pico y valle
+        self.num_samples += len(audio)
+        self.sum_squares += float(np.dot(audio, audio))
+        magnitude = np.abs(audio)
+        self.sum_abs += float(magnitude.sum())
+        self.peak = max(self.peak, float(magnitude.max()))
+        above_silence = magnitude[magnitude > 0.01]  # Ignorar silencio
+        if len(above_silence):
+            self.trough = min(self.trough, float(above_silence.min()))
+
+        # 6. Zero Crossing Rate (continuidad con el último signo del bloque anterior)
+        signs = np.sign(audio)
+        if self._last_sign is not None:
+            signs = np.concatenate([[self._last_sign], signs])
+        self.zero_crossings += float(np.sum(np.abs(np.diff(signs)))) / 2
+        self._last_sign = signs[-1]
+
+        # 4. Pitch sobre los frames completos disponibles
+        pending = np.concatenate([self._pitch_tail, audio])
+        if len(pending) < self.frame_length:
+            self._pitch_tail = pending
+            return
+
+        n_frames = 1 + (len(pending) - self.frame_length) // self.hop_length
+        frames = np.lib.stride_tricks.sliding_window_view(pending, self.frame_length)[::self.hop_length]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        self._max_frame_rms = max(self._max_frame_rms, float(np.sqrt(np.mean(frames ** 2, axis=1)).max()))
+
+        contour = self.profile.estimate_pitch_contour(
+            pending[:(n_frames - 1) * self.hop_length + self.frame_length],
+            self.sample_rate,
+            min_rms=max(0.01, 0.1 * self._max_frame_rms)
+        )
+        voiced_pitch = contour[contour > 0]
+        self.pitch_frames += len(contour)
+        self.voiced_frames += len(voiced_pitch)
+        self.pitch_histogram += np.histogram(voiced_pitch, bins=self.PITCH_BINS)[0]
+
+        self._pitch_tail = pending[n_frames * self.hop_length:]
+
+    @property
+    def duration(self):
+        """Duración acumulada en segundos"""
+        return self.num_samples / self.sample_rate
+
+    @property
+    def rms(self):
+        """RMS acumulado"""
+        if self.num_samples == 0:
+            return 0.0
+        return float(np.sqrt(self.sum_squares / self.num_samples))
+
+    @property
+    def energy(self):
+        """Energía promedio acumulada"""
+        if self.num_samples == 0:
+            return 0.0
+        return self.sum_abs / self.num_samples
+
+    def pitch_hz(self):
+        """Mediana del pitch a partir del histograma (150 Hz si no hay voz)"""
+        if self.voiced_frames == 0:
+            return 150.0
+
+        cumulative = np.cumsum(self.pitch_histogram)
+        half = self.voiced_frames / 2
+        idx = int(np.searchsorted(cumulative, half))
+        below = cumulative[idx - 1] if idx > 0 else 0
+        fraction = (half - below) / max(self.pitch_histogram[idx], 1)
+        return float(self.PITCH_BINS[idx] + fraction)
+
+    def quality_score(self):
+        """Score de calidad (0-1) con lo grabado hasta ahora"""
+        return self.profile._calculate_quality_score(self.rms, self.energy, self.duration)
+
+    def characteristics(self, phrase_text=""):
+        """
+        Retorna las características acumuladas.
+
+        Args:
+            phrase_text: Texto de la frase (para metadata)
+
+        Returns:
+            dict con el mismo formato que VoiceProfile.analyze_audio()
+        """
+        if self.num_samples == 0:
+            return None
+
+        rms = self.rms
+        trough = self.trough if np.isfinite(self.trough) else self.peak
+
+        return {
+            "rms": rms,
+            "rms_db": 20 * np.log10(rms + 1e-10),  # Evitar log(0)
+            "energy": self.energy,
+            "dynamic_range_db": 20 * np.log10((self.peak + 1e-10) / (trough + 1e-10)),
+            "pitch_hz": self.pitch_hz(),
+            "voiced_ratio": self.voiced_frames / self.pitch_frames if self.pitch_frames else 0.0,
+            "duration": self.duration,
+            "zero_crossing_rate": self.zero_crossings / self.num_samples,
+            "sample_rate": self.sample_rate,
+            "phrase_text": phrase_text,
+            "quality_score": self.quality_score()
+        }
+
+
+def get_samples_path(profile_path):
+    """
+    Retorna la ruta del archivo de muestras de calibración de un perfil.
+
+    Args:
+        profile_path: Ruta del JSON del perfil
+
+    Returns:
+        Path al archivo .npz (ej: marlon_profile.samples.npz)
+    """
+    profile_path = Path(profile_path)
+    return profile_path.with_name(f"{profile_path.stem}.samples.npz")
+
+
 def get_default_profile_path(user_name):
     """
     Retorna ruta por defecto para guardar perfil.
@@ -475,11 +760,26 @@ def get_default_profile_path(user_name):
         Path al archivo de perfil
     """
     # Crear directorio de perfiles si no existe
-    profiles_dir = Path(__file__).parent / "voice_profiles"
+    profiles_dir = get_profiles_dir()
     profiles_dir.mkdir(exist_ok=True)
 
-    # Sanitizar nombre de usuario para nombre de archivo
-    safe_name = "".join(c for c in user_name if c.isalnum() or c in (' ', '-', '_')).strip()
-    safe_name = safe_name.replace(' ', '_').lower()
+    return profiles_dir / f"{get_safe_profile_name(user_name)}_profile.json"
 
-    return profiles_dir / f"{safe_name}_profile.json"
+
+def get_profiles_dir():
+    """Directorio por defecto de los perfiles de voz"""
+    return Path(__file__).parent / "voice_profiles"
+
+
+def get_safe_profile_name(user_name):
+    """
+    Sanitiza el nombre de usuario para usarlo en nombres de archivo.
+
+    Args:
+        user_name: Nombre del usuario
+
+    Returns:
+        str (ej: "Marlon Suarez" -> "marlon_suarez")
+    """
+    safe_name = "".join(c for c in user_name if c.isalnum() or c in (' ', '-', '_')).strip()
+    return safe_name.replace(' ', '_').lower()